@@ -42,17 +42,34 @@ def run_migrations_online() -> None:
 
     Neste cenário, criamos um Engine e associamos uma conexão ao contexto.
     """
+    # Permite que uma conexão externa (ex.: nos testes) seja usada no lugar do engine do projeto
+    conexao_externa = config.attributes.get("connection")
+    if conexao_externa is not None:
+        executar_migracoes(conexao_externa)
+        return
+
     connectable = engine  # Usa o engine configurado no projeto
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,  # Detecta alterações nos tipos de colunas
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        executar_migracoes(connection)
+
+
+def ignorar_busca(name, type_, parent_names) -> bool:
+    """Deixa o índice FTS5 (tarefa_fts e suas tabelas internas) fora do autogenerate."""
+    return not (type_ == "table" and name.startswith("tarefa_fts"))
+
+
+def executar_migracoes(connection) -> None:
+    """Configura o contexto com a conexão informada e executa as migrações."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,  # Detecta alterações nos tipos de colunas
+        include_name=ignorar_busca,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 # Executa a função correta com base no modo de execução (offline ou online)
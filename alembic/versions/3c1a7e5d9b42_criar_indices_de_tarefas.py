@@ -0,0 +1,33 @@
+"""Criar índices da tabela de tarefas
+
+Revision ID: 3c1a7e5d9b42
+Revises: f09b3b209f8d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1a7e5d9b42'
+down_revision: Union[str, None] = 'f09b3b209f8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (estado, id) também atende consultas filtradas apenas por estado
+    op.create_index('ix_tarefa_estado_id', 'tarefa', ['estado', 'id'])
+    op.create_index('ix_tarefa_data_criacao', 'tarefa', ['data_criacao'])
+    op.create_index('ix_tarefa_titulo', 'tarefa', ['titulo'])
+    op.create_index('ix_tarefa_titulo_normalizado', 'tarefa', [sa.text('lower(trim(titulo))')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tarefa_titulo_normalizado', table_name='tarefa')
+    op.drop_index('ix_tarefa_titulo', table_name='tarefa')
+    op.drop_index('ix_tarefa_data_criacao', table_name='tarefa')
+    op.drop_index('ix_tarefa_estado_id', table_name='tarefa')
@@ -0,0 +1,52 @@
+"""Criar resumo de tarefas (estados e dias) mantido por gatilhos
+
+Revision ID: 5b8f2c6d3e17
+Revises: 7e2d4b8a1c05
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.estatisticas import GATILHOS_RESUMO, RECALCULAR_RESUMO
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8f2c6d3e17'
+down_revision: Union[str, None] = '7e2d4b8a1c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resumoestado',
+        sa.Column('estado', sa.Enum('pendente', 'em_andamento', 'concluida', name='estadotarefa'), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('estado'),
+    )
+    op.create_table(
+        'resumodia',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('criadas', sa.Integer(), nullable=False),
+        sa.Column('atualizadas', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dia'),
+    )
+
+    # Gatilhos em tarefa e preenchimento inicial com as tarefas já existentes
+    if op.get_bind().dialect.name == 'sqlite':
+        for sql in GATILHOS_RESUMO.values():
+            op.execute(text(sql))
+        for sql in RECALCULAR_RESUMO:
+            op.execute(text(sql))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for nome in GATILHOS_RESUMO:
+            op.execute(text(f'DROP TRIGGER IF EXISTS {nome}'))
+    op.drop_table('resumodia')
+    op.drop_table('resumoestado')
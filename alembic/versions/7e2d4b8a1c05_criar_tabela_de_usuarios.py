@@ -0,0 +1,46 @@
+"""Criar tabela de usuários
+
+Revision ID: 7e2d4b8a1c05
+Revises: 3c1a7e5d9b42
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2d4b8a1c05'
+down_revision: Union[str, None] = '3c1a7e5d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    usuario = op.create_table(
+        'usuario',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('disabled', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_usuario_username', 'usuario', ['username'], unique=True)
+
+    # Usuário de demonstração com o hash bcrypt de "senha123" já calculado
+    op.bulk_insert(usuario, [{
+        'username': 'usuario1',
+        'full_name': 'Usuario Um',
+        'email': 'usuario1@example.com',
+        'hashed_password': '$2b$12$0kN1mlE7aVZAAopJ9V7vV.lVXixVu/Gv62ztyL4SEqVktV/NgHIpy',
+        'disabled': False,
+    }])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usuario_username', table_name='usuario')
+    op.drop_table('usuario')
@@ -0,0 +1,37 @@
+"""Criar índice de busca textual (FTS5) em titulo e descricao
+
+Revision ID: 9d4a6e2f8b31
+Revises: 5b8f2c6d3e17
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.busca import CONFIGURAR_RANK, CRIAR_TABELA_BUSCA, GATILHOS_BUSCA, RECONSTRUIR_BUSCA
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6e2f8b31'
+down_revision: Union[str, None] = '5b8f2c6d3e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tabela virtual, gatilhos em tarefa e indexação das tarefas já existentes
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(text(CRIAR_TABELA_BUSCA))
+        op.execute(text(CONFIGURAR_RANK))
+        for sql in GATILHOS_BUSCA.values():
+            op.execute(text(sql))
+        op.execute(text(RECONSTRUIR_BUSCA))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for nome in GATILHOS_BUSCA:
+            op.execute(text(f'DROP TRIGGER IF EXISTS {nome}'))
+        op.execute(text('DROP TABLE IF EXISTS tarefa_fts'))
@@ -0,0 +1,45 @@
+"""Criar log de alterações das tarefas mantido por gatilhos
+
+Revision ID: c4e8a1d7f259
+Revises: 9d4a6e2f8b31
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.alteracoes import GATILHOS_ALTERACOES
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1d7f259'
+down_revision: Union[str, None] = '9d4a6e2f8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alteracaotarefa',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tarefa_id', sa.Integer(), nullable=False),
+        sa.Column('operacao', sa.String(), nullable=False),
+        sa.Column('data', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True,
+    )
+
+    # Gatilhos em tarefa (o log começa vazio: as tarefas já existentes não geram alterações)
+    if op.get_bind().dialect.name == 'sqlite':
+        for sql in GATILHOS_ALTERACOES.values():
+            op.execute(text(sql))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for nome in GATILHOS_ALTERACOES:
+            op.execute(text(f'DROP TRIGGER IF EXISTS {nome}'))
+    op.drop_table('alteracaotarefa')
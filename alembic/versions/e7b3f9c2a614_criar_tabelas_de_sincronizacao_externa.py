@@ -0,0 +1,43 @@
+"""Criar tabelas da sincronização externa (vínculos com a origem e ETags)
+
+Revision ID: e7b3f9c2a614
+Revises: c4e8a1d7f259
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f9c2a614'
+down_revision: Union[str, None] = 'c4e8a1d7f259'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tarefaexterna',
+        sa.Column('id_externo', sa.Integer(), nullable=False),
+        sa.Column('tarefa_id', sa.Integer(), nullable=False),
+        sa.Column('hash', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id_externo'),
+    )
+    op.create_index('ix_tarefaexterna_tarefa_id', 'tarefaexterna', ['tarefa_id'], unique=True)
+    op.create_table(
+        'sincronizacaoexterna',
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('itens', sa.Integer(), nullable=False),
+        sa.Column('data', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('url'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sincronizacaoexterna')
+    op.drop_index('ix_tarefaexterna_tarefa_id', table_name='tarefaexterna')
+    op.drop_table('tarefaexterna')
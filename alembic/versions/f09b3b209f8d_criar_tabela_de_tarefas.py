@@ -20,11 +20,20 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.create_table(
+        'tarefa',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('titulo', sa.String(length=255), nullable=False),
+        sa.Column('descricao', sa.String(), nullable=True),
+        sa.Column('estado', sa.Enum('pendente', 'em_andamento', 'concluida', name='estadotarefa'), nullable=False),
+        sa.Column('data_criacao', sa.DateTime(), nullable=False),
+        sa.Column('data_atualizacao', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
-    pass
+    op.drop_table('tarefa')
     # ### end Alembic commands ###
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+import orjson
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from app.metricas import registrar_medidor
+from app.models import AlteracaoTarefa
+
+# Segundos entre as leituras do log quando nenhum endpoint deste processo avisou (escritas de outros workers e scripts)
+ALTERACOES_INTERVALO = float(os.getenv("ALTERACOES_INTERVALO", "1"))
+# Alterações recentes mantidas em memória: assinantes em dia leem daqui, sem consultar o banco
+ALTERACOES_MEMORIA = int(os.getenv("ALTERACOES_MEMORIA", "1000"))
+# Alterações mantidas no banco para a retomada de clientes desconectados; as mais antigas são descartadas
+ALTERACOES_RETENCAO = int(os.getenv("ALTERACOES_RETENCAO", "100000"))
+# Segundos sem alterações até enviar um comentário no SSE, para manter a conexão aberta em proxies
+ALTERACOES_HEARTBEAT = float(os.getenv("ALTERACOES_HEARTBEAT", "15"))
+
+LIMITE_LEITURA = 1000  # Alterações lidas do banco por consulta
+INTERVALO_LIMPEZA = 60  # Segundos entre os descartes de alterações antigas
+
+# Gatilhos que registram no log cada escrita na tabela de tarefas
+GATILHOS_ALTERACOES = {
+    "tarefa_alteracao_insert": """
+        CREATE TRIGGER tarefa_alteracao_insert AFTER INSERT ON tarefa BEGIN
+            INSERT INTO alteracaotarefa (tarefa_id, operacao, data)
+                VALUES (NEW.id, 'criada', strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """,
+    "tarefa_alteracao_update": """
+        CREATE TRIGGER tarefa_alteracao_update AFTER UPDATE ON tarefa BEGIN
+            INSERT INTO alteracaotarefa (tarefa_id, operacao, data)
+                VALUES (NEW.id, 'atualizada', strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """,
+    "tarefa_alteracao_delete": """
+        CREATE TRIGGER tarefa_alteracao_delete AFTER DELETE ON tarefa BEGIN
+            INSERT INTO alteracaotarefa (tarefa_id, operacao, data)
+                VALUES (OLD.id, 'removida', strftime('%Y-%m-%d %H:%M:%f', 'now'));
+        END
+    """,
+}
+
+
+# Cria os gatilhos do log que ainda não existem (o log começa vazio: não há histórico a recalcular)
+def instalar_alteracoes(conn):
+    if conn.dialect.name != "sqlite":
+        return  # Os gatilhos usam a sintaxe do SQLite
+    existentes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    for nome, sql in GATILHOS_ALTERACOES.items():
+        if nome not in existentes:
+            conn.execute(text(sql))
+
+
+# Converte as linhas do log no formato enviado aos clientes
+def linhas_para_alteracoes(linhas) -> list[dict]:
+    return [
+        {"id": id, "tarefa_id": tarefa_id, "operacao": operacao, "data": data.isoformat()}
+        for id, tarefa_id, operacao, data in linhas
+    ]
+
+
+def ler_alteracoes(engine, desde: int, limite: int = LIMITE_LEITURA) -> list[dict]:
+    colunas = (AlteracaoTarefa.id, AlteracaoTarefa.tarefa_id, AlteracaoTarefa.operacao, AlteracaoTarefa.data)
+    with engine.connect() as conn:
+        linhas = conn.execute(
+            select(*colunas).where(AlteracaoTarefa.id > desde).order_by(AlteracaoTarefa.id).limit(limite)
+        ).all()
+    return linhas_para_alteracoes(linhas)
+
+
+# Menor e maior id ainda guardados no log (None se estiver vazio)
+def limites_alteracoes(engine) -> tuple:
+    with engine.connect() as conn:
+        return tuple(conn.execute(select(func.min(AlteracaoTarefa.id), func.max(AlteracaoTarefa.id))).one())
+
+
+def descartar_alteracoes_antigas(engine, ultimo_id: int, retencao: int = ALTERACOES_RETENCAO):
+    with engine.begin() as conn:
+        conn.execute(delete(AlteracaoTarefa).where(AlteracaoTarefa.id <= ultimo_id - retencao))
+
+
+# Difusão das alterações para os assinantes deste processo: uma única tarefa lê o log e acorda todos de uma vez.
+# A memória é limitada (últimas ALTERACOES_MEMORIA alterações) independentemente da quantidade de assinantes,
+# e cada assinante parado custa apenas uma corrotina esperando um asyncio.Event
+class Difusor:
+    def __init__(self, memoria: int = ALTERACOES_MEMORIA):
+        self.recentes: deque = deque(maxlen=memoria)
+        self.ultimo_id = 0
+        self.coberto_desde: Optional[int] = None  # A memória tem todas as alterações depois deste id
+        self.assinantes = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._sinal: Optional[asyncio.Event] = None  # Avisos das escritas deste processo
+        self._nova: Optional[asyncio.Event] = None  # Trocado a cada publicação; acorda quem está esperando
+
+    @property
+    def engine(self):
+        from app.database import engine  # Importado no uso: app.database importa este módulo
+        return engine
+
+    # Inicia a tarefa de leitura no event loop atual (na primeira assinatura, ou se o loop mudou)
+    def iniciar(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not self._tarefa.done():
+            return
+        self._loop = loop
+        self._sinal, self._nova = asyncio.Event(), asyncio.Event()
+        self.recentes.clear()
+        self.coberto_desde = None
+        self._tarefa = loop.create_task(self._acompanhar())
+
+    def encerrar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._loop = self._tarefa = None
+
+    # Avisa que houve escrita; pode ser chamada do event loop ou das threads do threadpool
+    def sinalizar(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # Ninguém assinando: a próxima assinatura lê o log do banco
+        loop.call_soon_threadsafe(self._sinal.set)
+
+    async def _acompanhar(self):
+        self.ultimo_id = self.coberto_desde = (await run_in_threadpool(limites_alteracoes, self.engine))[1] or 0
+        ultima_limpeza = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._sinal.wait(), ALTERACOES_INTERVALO)
+            except asyncio.TimeoutError:
+                pass
+            self._sinal.clear()
+            try:
+                novas = await run_in_threadpool(ler_alteracoes, self.engine, self.ultimo_id)
+                if time.monotonic() - ultima_limpeza > INTERVALO_LIMPEZA:
+                    await run_in_threadpool(descartar_alteracoes_antigas, self.engine, self.ultimo_id)
+                    ultima_limpeza = time.monotonic()
+            except SQLAlchemyError:
+                continue  # Ex.: banco ocupado; tenta de novo no próximo intervalo
+            if novas:
+                self.publicar(novas)
+                if len(novas) == LIMITE_LEITURA:
+                    self._sinal.set()  # Ainda há alterações no log: lê o próximo bloco sem esperar
+
+    def publicar(self, novas: list[dict]):
+        self.recentes.extend(novas)
+        self.ultimo_id = novas[-1]["id"]
+        if len(self.recentes) == self.recentes.maxlen:
+            self.coberto_desde = max(self.coberto_desde, self.recentes[0]["id"] - 1)  # As mais antigas saíram
+        nova, self._nova = self._nova, asyncio.Event()
+        nova.set()
+
+    # Alterações depois de "desde": da memória se o assinante está em dia, senão do banco
+    async def ler(self, desde: int) -> list[dict]:
+        if self.coberto_desde is not None and desde >= self.coberto_desde:
+            itens = []
+            for alteracao in reversed(self.recentes):  # Só percorre as alterações que o assinante ainda não viu
+                if alteracao["id"] <= desde:
+                    break
+                itens.append(alteracao)
+            return itens[::-1][:LIMITE_LEITURA]
+        primeiro, _ = await run_in_threadpool(limites_alteracoes, self.engine)
+        if primeiro is not None and desde < primeiro - 1:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"Alterações anteriores a {primeiro} foram descartadas; recarregue as tarefas e use o ultimo_id atual",
+            )
+        return await run_in_threadpool(ler_alteracoes, self.engine, desde)
+
+    # Id da alteração mais recente (ponto de partida de quem não informou "since")
+    async def atual(self) -> int:
+        self.iniciar()
+        if self.coberto_desde is not None:
+            return self.ultimo_id
+        return (await run_in_threadpool(limites_alteracoes, self.engine))[1] or 0
+
+    # Long-poll: retorna as alterações depois de "desde" assim que existirem, ou [] após "espera" segundos
+    async def esperar(self, desde: int, espera: float) -> list[dict]:
+        self.iniciar()
+        nova = self._nova  # Obtido antes da leitura para não perder uma publicação feita durante ela
+        itens = await self.ler(desde)
+        if itens or espera <= 0:
+            return itens
+        try:
+            await asyncio.wait_for(nova.wait(), espera)
+        except asyncio.TimeoutError:
+            return []
+        return await self.ler(desde)
+
+    # Corpo do SSE: um evento por alteração (id = posição para o Last-Event-ID) e comentários de heartbeat
+    async def fluxo(self, desde: int) -> AsyncIterator[str]:
+        self.assinantes += 1
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                itens = await self.esperar(desde, ALTERACOES_HEARTBEAT)
+                if not itens:
+                    yield ": ping\n\n"
+                    continue
+                yield "".join(
+                    f"id: {item['id']}\nevent: {item['operacao']}\ndata: {orjson.dumps(item).decode()}\n\n"
+                    for item in itens
+                )
+                desde = itens[-1]["id"]
+        finally:
+            self.assinantes -= 1
+
+
+difusor = Difusor()
+registrar_medidor(
+    "changes_subscribers", "gauge", "Conexões SSE abertas em GET /tarefas/changes", lambda: difusor.assinantes
+)
@@ -1,8 +1,19 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+import anyio
+import asyncio
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from app.metricas import DURACAO_BCRYPT, registrar_medidor
 
 load_dotenv()
 
@@ -12,18 +23,74 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+# Custo do bcrypt e pool de processos dedicado à verificação de senhas no /login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))  # 0 = usa o threadpool
+LOGIN_MAX_FILA = int(os.getenv("LOGIN_MAX_FILA", "64"))  # Verificações simultâneas antes de responder 503
 
+# Cache de tokens já validados (quantidade máxima e tempo máximo em segundos, limitado ao "exp" do token)
+TOKEN_CACHE_MAX = int(os.getenv("TOKEN_CACHE_MAX", "10000"))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300"))
 
-# Criptografia para senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Esquema de autenticação usado pelos endpoints protegidos
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+# Criptografia para senhas (criada no primeiro uso, e não ao importar o módulo)
+@lru_cache(maxsize=None)
+def obter_contexto_senhas() -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # Função para verificar a senha
 def verificar_senha(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return obter_contexto_senhas().verify(plain_password, hashed_password)
+
+# Pool criado sob demanda e quantidade de verificações em andamento
+_pool_senhas = None
+_verificacoes_pendentes = 0
+
+def _obter_pool_senhas():
+    global _pool_senhas
+    if _pool_senhas is None:
+        _pool_senhas = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS)
+    return _pool_senhas
+
+# Função para verificar a senha fora do event loop, em um pool de processos limitado
+async def verificar_senha_async(plain_password, hashed_password):
+    global _verificacoes_pendentes
+    if _verificacoes_pendentes >= LOGIN_MAX_FILA:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitas tentativas de login simultâneas, tente novamente",
+            headers={"Retry-After": "1"},
+        )
+    _verificacoes_pendentes += 1
+    inicio = time.perf_counter()
+    try:
+        if BCRYPT_WORKERS == 0:
+            return await anyio.to_thread.run_sync(verificar_senha, plain_password, hashed_password)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_obter_pool_senhas(), verificar_senha, plain_password, hashed_password)
+    finally:
+        _verificacoes_pendentes -= 1
+        DURACAO_BCRYPT.observar(time.perf_counter() - inicio)
+
+registrar_medidor(
+    "login_verifications_pending", "gauge", "Verificações de senha em andamento no /login",
+    lambda: _verificacoes_pendentes,
+)
+
+# Função para encerrar o pool de processos (chamada no fim do lifespan)
+def encerrar_pool_senhas():
+    global _pool_senhas
+    if _pool_senhas is not None:
+        _pool_senhas.shutdown(cancel_futures=True)
+        _pool_senhas = None
 
 # Função para gerar o hash da senha
 def gerar_hash_senha(password):
-    return pwd_context.hash(password)
+    return obter_contexto_senhas().hash(password)
 
 # Função para criar o token JWT
 def criar_token_acesso(dados: dict):
@@ -40,3 +107,44 @@ def validar_token_acesso(token: str):
         return payload
     except JWTError:
         return None
+
+
+# sha256 do token -> (payload, momento em que a entrada expira)
+_tokens_validados: OrderedDict = OrderedDict()
+_trava_tokens = threading.Lock()
+
+# Função para validar o token JWT reaproveitando validações anteriores do mesmo token
+def validar_token_acesso_cache(token: str):
+    chave = hashlib.sha256(token.encode()).digest()
+    agora = time.time()
+    with _trava_tokens:
+        item = _tokens_validados.get(chave)
+        if item is not None:
+            payload, expira_em = item
+            if expira_em > agora:
+                _tokens_validados.move_to_end(chave)
+                return payload
+            del _tokens_validados[chave]
+
+    payload = validar_token_acesso(token)
+    if payload is None:
+        return None  # Tokens inválidos não entram no cache
+
+    # A entrada nunca sobrevive ao "exp" do token
+    expira_em = min(payload.get("exp", agora), agora + TOKEN_CACHE_TTL)
+    with _trava_tokens:
+        _tokens_validados[chave] = (payload, expira_em)
+        while len(_tokens_validados) > TOKEN_CACHE_MAX:
+            _tokens_validados.popitem(last=False)
+    return payload
+
+# Dependência dos endpoints protegidos: valida o token e retorna o usuário (campo "sub")
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
+    payload = validar_token_acesso_cache(token)
+    if payload is None or "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido ou expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload["sub"]
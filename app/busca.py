@@ -0,0 +1,97 @@
+import re
+from typing import Optional
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import column, table, text, tuple_
+from sqlmodel import select
+from app.models import Tarefa
+from app.paginacao import codificar_cursor, cursor_invalido, ler_cursor
+from app.serializacao import CAMPOS_TAREFA
+
+# Índice de texto (FTS5) sobre titulo e descricao, com o conteúdo lido da própria tabela de tarefas;
+# remove_diacritics faz "relatorio" encontrar "relatório"
+CRIAR_TABELA_BUSCA = """
+    CREATE VIRTUAL TABLE tarefa_fts USING fts5(
+        titulo, descricao, content='tarefa', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+# Ordenação por relevância (bm25): palavras no título pesam mais que na descrição
+CONFIGURAR_RANK = "INSERT INTO tarefa_fts (tarefa_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"
+
+# Gatilhos que mantêm o índice igual à tabela de tarefas em todas as formas de escrita
+GATILHOS_BUSCA = {
+    "tarefa_fts_insert": """
+        CREATE TRIGGER tarefa_fts_insert AFTER INSERT ON tarefa BEGIN
+            INSERT INTO tarefa_fts (rowid, titulo, descricao) VALUES (NEW.id, NEW.titulo, NEW.descricao);
+        END
+    """,
+    "tarefa_fts_update": """
+        CREATE TRIGGER tarefa_fts_update AFTER UPDATE OF titulo, descricao ON tarefa BEGIN
+            INSERT INTO tarefa_fts (tarefa_fts, rowid, titulo, descricao)
+                VALUES ('delete', OLD.id, OLD.titulo, OLD.descricao);
+            INSERT INTO tarefa_fts (rowid, titulo, descricao) VALUES (NEW.id, NEW.titulo, NEW.descricao);
+        END
+    """,
+    "tarefa_fts_delete": """
+        CREATE TRIGGER tarefa_fts_delete AFTER DELETE ON tarefa BEGIN
+            INSERT INTO tarefa_fts (tarefa_fts, rowid, titulo, descricao)
+                VALUES ('delete', OLD.id, OLD.titulo, OLD.descricao);
+        END
+    """,
+}
+
+# Reconstrói o índice a partir das tarefas existentes
+RECONSTRUIR_BUSCA = "INSERT INTO tarefa_fts (tarefa_fts) VALUES ('rebuild')"
+
+tarefa_fts = table("tarefa_fts", column("rowid"), column("rank"), column("tarefa_fts"))
+
+
+# Cria o índice de busca e os gatilhos que faltam; se algo foi criado, reconstrói o índice
+def instalar_busca(conn):
+    if conn.dialect.name != "sqlite":
+        return  # FTS5 é específico do SQLite
+    existentes = set(conn.execute(text("SELECT name FROM sqlite_master")).scalars())
+    faltando = [nome for nome in ["tarefa_fts", *GATILHOS_BUSCA] if nome not in existentes]
+    if not faltando:
+        return
+    if "tarefa_fts" in faltando:
+        conn.execute(text(CRIAR_TABELA_BUSCA))
+        conn.execute(text(CONFIGURAR_RANK))
+    for nome in faltando[faltando[0] == "tarefa_fts":]:
+        conn.execute(text(GATILHOS_BUSCA[nome]))
+    conn.execute(text(RECONSTRUIR_BUSCA))
+
+
+# Converte o texto do usuário em uma consulta FTS5 segura: cada palavra entre aspas, todas obrigatórias
+def termos_busca(q: str) -> str:
+    return " ".join(f'"{palavra}"' for palavra in re.findall(r"\w+", q))
+
+
+# Consulta da busca ordenada por relevância, com filtro por estado e paginação por (rank, id)
+def consulta_busca(termos: str, estado: Optional[str], cursor: Optional[str], limit: int):
+    query = (
+        select(*(getattr(Tarefa, campo) for campo in CAMPOS_TAREFA), tarefa_fts.c.rank)
+        .join_from(tarefa_fts, Tarefa, Tarefa.id == tarefa_fts.c.rowid)
+        .where(tarefa_fts.c.tarefa_fts.match(termos))
+    )
+    if estado:
+        query = query.where(Tarefa.estado == estado)
+    dados = ler_cursor(cursor)
+    if dados is not None:
+        try:
+            posicao = (float(dados["rank"]), int(dados["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise cursor_invalido()
+        query = query.where(tuple_(tarefa_fts.c.rank, Tarefa.id) > posicao)
+    # Busca um item a mais para saber se existe uma próxima página
+    return query.order_by(tarefa_fts.c.rank, Tarefa.id).limit(limit + 1)
+
+
+# Monta a página da busca (sem a coluna rank, que só entra no cursor)
+def responder_busca(linhas: list, limit: int) -> ORJSONResponse:
+    proximo_cursor = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo_cursor = codificar_cursor(linhas[-1].id, rank=linhas[-1].rank)
+    itens = [dict(zip(CAMPOS_TAREFA, linha)) for linha in linhas]  # O rank é a última coluna e fica de fora
+    return ORJSONResponse({"items": itens, "next_cursor": proximo_cursor})
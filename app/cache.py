@@ -0,0 +1,408 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+from inspect import Parameter, Signature, isawaitable, iscoroutinefunction
+from typing import Iterable, Optional, Tuple
+import anyio
+from fastapi.concurrency import run_in_threadpool
+from fastapi.dependencies.utils import get_typed_return_annotation, get_typed_signature
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+from fastapi_cache.coder import Coder, JsonCoder
+from fastapi_cache.types import Backend
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+from app.metricas import registrar_medidor
+
+# Segundos, após o TTL, em que a entrada vencida ainda é servida enquanto uma única consulta a renova
+# em segundo plano (stale-while-revalidate); 0 = desligado
+CACHE_TTL_OBSOLETO = int(os.getenv("CACHE_TTL_OBSOLETO", "0"))
+# Falhas simultâneas na mesma chave aguardam uma única consulta (single-flight)
+CACHE_AGRUPAR = os.getenv("CACHE_AGRUPAR", "true").lower() == "true"
+
+PREFIXO = "fastapi-cache"
+NAMESPACE = "tarefas"
+
+# Seleção do backend: "memoria" (LRU limitado, por processo) ou "redis" (compartilhado entre workers)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+
+# TTLs em segundos. Com o Redis, as versões trocadas nas escritas valem para todos os workers e os TTLs
+# podem ser longos. Com o cache em memória, cada worker só vê as próprias escritas (e nenhum vê as de scripts
+# fora da API): o TTL curto limita por quanto tempo uma leitura pode ficar atrasada
+TTL_PADRAO = "3600" if CACHE_BACKEND == "redis" else "60"
+CACHE_TTL_TAREFA = int(os.getenv("CACHE_TTL_TAREFA", TTL_PADRAO))
+CACHE_TTL_LISTA = int(os.getenv("CACHE_TTL_LISTA", TTL_PADRAO))
+CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+logger = logging.getLogger(__name__)
+
+# Requisições que aguardaram a consulta de outra, respostas servidas vencidas e renovações em segundo plano
+AGRUPAMENTO = {"agrupadas": 0, "obsoletas": 0, "renovacoes": 0}
+
+
+# Backend em memória com limite de entradas e de bytes, descartando as entradas usadas há mais tempo (LRU)
+class BackendLRU(Backend):
+    def __init__(self, max_entradas: int = CACHE_MAX_ENTRADAS, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.remocoes = 0  # Entradas descartadas por limite ou expiração
+        self._dados: OrderedDict = OrderedDict()  # chave -> (valor, expira_em)
+
+    @property
+    def entradas(self) -> int:
+        return len(self._dados)
+
+    @staticmethod
+    def _tamanho(key: str, value) -> int:
+        return len(key) + len(value)
+
+    def _remover(self, key: str):
+        valor, _ = self._dados.pop(key)
+        self.bytes -= self._tamanho(key, valor)
+
+    def _buscar(self, key: str):
+        item = self._dados.get(key)
+        if item is None:
+            return None
+        valor, expira_em = item
+        if expira_em is not None and expira_em <= time.monotonic():
+            self._remover(key)
+            self.remocoes += 1
+            return None
+        self._dados.move_to_end(key)  # Marca como usada recentemente
+        return item
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        item = self._buscar(key)
+        if item is None:
+            return 0, None
+        valor, expira_em = item
+        ttl = -1 if expira_em is None else int(expira_em - time.monotonic())
+        return ttl, valor
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._buscar(key)
+        return None if item is None else item[0]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        if key in self._dados:
+            self._remover(key)
+        tamanho = self._tamanho(key, value)
+        if tamanho > self.max_bytes:
+            return  # Valor maior que o cache inteiro: não é armazenado
+        expira_em = time.monotonic() + expire if expire else None
+        self._dados[key] = (value, expira_em)
+        self.bytes += tamanho
+        # Descarta as entradas menos usadas até voltar aos limites
+        while len(self._dados) > self.max_entradas or self.bytes > self.max_bytes:
+            self._remover(next(iter(self._dados)))
+            self.remocoes += 1
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            chaves = [chave for chave in self._dados if chave.startswith(namespace)]
+        else:
+            chaves = [key] if key in self._dados else []
+        for chave in chaves:
+            self._remover(chave)
+        return len(chaves)
+
+
+# Backend que repassa as operações ao backend real e conta acertos, falhas e remoções
+class BackendComEstatisticas(Backend):
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        ttl, valor = await self.backend.get_with_ttl(key)
+        if valor is None:
+            self.falhas += 1
+        else:
+            self.acertos += 1
+        return ttl, valor
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await self.backend.set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        removidas = await self.backend.clear(namespace, key)
+        self.remocoes += removidas
+        return removidas
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.falhas
+        estatisticas = {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            # Remoções explícitas somadas aos descartes feitos pelo próprio backend (LRU/expiração)
+            "remocoes": self.remocoes + getattr(self.backend, "remocoes", 0),
+            "taxa_acerto": self.acertos / total if total else 0.0,
+            **AGRUPAMENTO,
+        }
+        if isinstance(self.backend, BackendLRU):
+            estatisticas["entradas"] = self.backend.entradas
+            estatisticas["bytes"] = self.backend.bytes
+        return estatisticas
+
+
+# Coder que guarda o corpo JSON final e, nos acertos, devolve uma Response pronta
+# (sem decodificar o JSON nem revalidar pelo response_model)
+class CoderResposta(JsonCoder):
+    @classmethod
+    def encode(cls, value) -> bytes:
+        if isinstance(value, JSONResponse):
+            return value.body
+        # Objetos do modelo: o mesmo JSON que o FastAPI geraria a partir do response_model
+        return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode()
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_=None) -> Response:
+        return Response(content=value, media_type="application/json")
+
+
+# Cria o backend configurado em CACHE_BACKEND
+def criar_backend_cache() -> Backend:
+    if CACHE_BACKEND == "redis":
+        # Dependências opcionais, necessárias apenas com o cache compartilhado
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+        return RedisBackend(aioredis.from_url(REDIS_URL))
+    return BackendLRU()
+
+
+# Função para inicializar o cache da aplicação (usada no lifespan e nos testes)
+def configurar_cache():
+    backend = BackendComEstatisticas(criar_backend_cache())
+    FastAPICache.init(backend, prefix=PREFIXO)
+    # Contadores do /metrics, lidos do backend atual apenas na coleta
+    registrar_medidor("cache_hits_total", "counter", "Acertos do cache", lambda: backend.acertos)
+    registrar_medidor("cache_misses_total", "counter", "Falhas do cache", lambda: backend.falhas)
+    registrar_medidor(
+        "cache_coalesced_total", "counter", "Falhas que aguardaram a consulta já em andamento na mesma chave",
+        lambda: AGRUPAMENTO["agrupadas"],
+    )
+    registrar_medidor(
+        "cache_stale_total", "counter", "Respostas servidas vencidas durante a renovação",
+        lambda: AGRUPAMENTO["obsoletas"],
+    )
+
+
+# Consultas em andamento por chave do cache (uma por chave em cada event loop)
+_consultas: dict[str, asyncio.Task] = {}
+
+
+# Retorna a consulta em andamento da chave ou inicia uma nova; a tarefa sai do dicionário ao terminar
+def _consulta_unica(chave: str, consultar) -> Tuple[asyncio.Task, bool]:
+    tarefa = _consultas.get(chave)
+    loop = asyncio.get_running_loop()
+    if tarefa is not None and not tarefa.done() and tarefa.get_loop() is loop:
+        return tarefa, False
+    tarefa = loop.create_task(consultar())
+    _consultas[chave] = tarefa
+
+    def concluir(feita: asyncio.Task):
+        if _consultas.get(chave) is feita:
+            del _consultas[chave]
+        if not feita.cancelled() and feita.exception() is not None:
+            logger.debug("Consulta da chave '%s' falhou", chave, exc_info=feita.exception())
+
+    tarefa.add_done_callback(concluir)
+    return tarefa, True
+
+
+# Parâmetro da função com a mesma anotação (Request/Response) ou, se não houver, o parâmetro a injetar
+def _localizar_parametro(assinatura: Signature, parametro: Parameter, injetar: list[Parameter]) -> Parameter:
+    existente = next((p for p in assinatura.parameters.values() if p.annotation is parametro.annotation), None)
+    if existente is None:
+        injetar.append(parametro)
+        return parametro
+    return existente
+
+
+# Assinatura com os parâmetros injetados antes de um eventual **kwargs (lida pelo FastAPI nas dependências)
+def _incluir_parametros(assinatura: Signature, *extras: Parameter) -> Signature:
+    parametros = list(assinatura.parameters.values())
+    variaveis = [p for p in parametros if p.kind is Parameter.VAR_KEYWORD]
+    fixos = [p for p in parametros if p.kind is not Parameter.VAR_KEYWORD]
+    return assinatura.replace(parameters=[*fixos, *extras, *variaveis])
+
+
+# Como no fastapi-cache: sem cache se desligado, fora de GET ou com Cache-Control: no-store
+def _sem_cache(request: Optional[Request]) -> bool:
+    if not FastAPICache.get_enable():
+        return True
+    if request is None:
+        return False
+    return request.method != "GET" or request.headers.get("Cache-Control") == "no-store"
+
+
+# Decorator equivalente ao @cache do fastapi-cache, com a consulta única por chave (single-flight) nas falhas
+# e, com "obsoleto" > 0, a entrada vencida servida enquanto é renovada em segundo plano.
+# A entrada é gravada com TTL expire + obsoleto: restando menos de "obsoleto" segundos, ela está vencida
+def cache_agrupado(
+    expire: int,
+    namespace: str = "",
+    key_builder=None,
+    coder: Optional[type[Coder]] = None,
+    obsoleto: Optional[int] = None,
+    agrupar: Optional[bool] = None,
+):
+    parametro_request = Parameter("__fastapi_cache_request", Parameter.KEYWORD_ONLY, annotation=Request)
+    parametro_response = Parameter("__fastapi_cache_response", Parameter.KEYWORD_ONLY, annotation=Response)
+
+    def decorator(func):
+        assinatura = get_typed_signature(func)
+        injetar: list[Parameter] = []
+        request_param = _localizar_parametro(assinatura, parametro_request, injetar)
+        response_param = _localizar_parametro(assinatura, parametro_response, injetar)
+        tipo_retorno = get_typed_return_annotation(func)
+
+        async def executar(*args, **kwargs):
+            kwargs.pop(parametro_request.name, None)
+            kwargs.pop(parametro_response.name, None)
+            if iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+            return await run_in_threadpool(func, *args, **kwargs)
+
+        @wraps(func)
+        async def interna(*args, **kwargs):
+            copia = kwargs.copy()
+            request: Optional[Request] = copia.pop(request_param.name, None)
+            response: Optional[Response] = copia.pop(response_param.name, None)
+            if _sem_cache(request):
+                return await executar(*args, **kwargs)
+
+            codificador = coder or FastAPICache.get_coder()
+            backend = FastAPICache.get_backend()
+            cabecalho_status = FastAPICache.get_cache_status_header()
+            janela = CACHE_TTL_OBSOLETO if obsoleto is None else obsoleto
+            construtor = key_builder or FastAPICache.get_key_builder()
+            chave = construtor(
+                func, f"{FastAPICache.get_prefix()}:{namespace}",
+                request=request, response=response, args=args, kwargs=copia,
+            )
+            if isawaitable(chave):
+                chave = await chave
+
+            try:
+                ttl, valor = await backend.get_with_ttl(chave)
+            except Exception:
+                logger.warning("Erro ao ler a chave '%s' do cache", chave, exc_info=True)
+                ttl, valor = 0, None
+            if request is not None and request.headers.get("Cache-Control") == "no-cache":
+                valor = None
+
+            # Executa a função uma vez e grava o valor codificado, que é repassado a todos que aguardam
+            async def consultar() -> bytes:
+                resultado = await executar(*args, **kwargs)
+                codificado = codificador.encode(resultado)
+                try:
+                    await backend.set(chave, codificado, expire + janela)
+                except Exception:
+                    logger.warning("Erro ao gravar a chave '%s' no cache", chave, exc_info=True)
+                return codificado
+
+            if valor is None:
+                if not (CACHE_AGRUPAR if agrupar is None else agrupar):
+                    valor = await consultar()
+                else:
+                    tarefa, nova = _consulta_unica(chave, consultar)
+                    if not nova:
+                        AGRUPAMENTO["agrupadas"] += 1
+                    # shield: a desconexão de um cliente não cancela a consulta aguardada pelos demais
+                    valor = await asyncio.shield(tarefa)
+                estado, ttl = "MISS", expire
+            elif janela and 0 <= ttl < janela:
+                # Vencida: responde com o valor guardado e deixa uma única renovação em segundo plano
+                _, nova = _consulta_unica(chave, consultar)
+                AGRUPAMENTO["obsoletas"] += 1
+                AGRUPAMENTO["renovacoes"] += nova
+                estado, ttl = "STALE", 0
+            else:
+                estado, ttl = "HIT", ttl - janela if ttl > 0 else ttl
+
+            if response is not None:
+                etag = f"W/{hash(valor)}"
+                response.headers.update({"Cache-Control": f"max-age={ttl}", "ETag": etag, cabecalho_status: estado})
+                if estado != "MISS" and request is not None and request.headers.get("if-none-match") == etag:
+                    response.status_code = HTTP_304_NOT_MODIFIED
+                    return response
+            return codificador.decode_as_type(valor, type_=tipo_retorno)
+
+        interna.__signature__ = _incluir_parametros(assinatura, *injetar)
+        return interna
+
+    return decorator
+
+
+# Chave onde fica a versão atual de um grupo de entradas (a lista ou uma tarefa)
+def chave_versao(*partes) -> str:
+    return ":".join([FastAPICache.get_prefix(), NAMESPACE, "versao", *map(str, partes)])
+
+
+# Gera e grava uma nova versão: as entradas gravadas com a versão anterior deixam de ser lidas
+async def nova_versao(chave: str) -> str:
+    versao = str(time.time_ns())
+    # A versão dura o mesmo que as entradas: ao vencer, uma nova versão também muda o ETag das listagens,
+    # então um 304 atrasado fica limitado ao TTL
+    await FastAPICache.get_backend().set(chave, versao, max(CACHE_TTL_TAREFA, CACHE_TTL_LISTA))
+    return versao
+
+
+async def obter_versao(chave: str) -> str:
+    versao = await FastAPICache.get_backend().get(chave)
+    if versao is None:
+        # Versão ausente (nunca criada ou expirada): começa uma nova para não reaproveitar entradas antigas
+        return await nova_versao(chave)
+    return versao.decode() if isinstance(versao, bytes) else versao
+
+
+# Monta a chave do cache de GET /tarefas/{id}; o usuário não entra na chave pois os dados são os mesmos para todos
+async def chave_tarefa(func, namespace: str = "", *, request=None, response=None, args, kwargs) -> str:
+    id = kwargs["id"]
+    versao = await obter_versao(chave_versao("tarefa", id))
+    return f"{namespace}:tarefa:{id}:{versao}"
+
+
+# Monta a chave do cache de GET /tarefas a partir dos filtros e da versão atual da lista
+async def chave_lista(func, namespace: str = "", *, request=None, response=None, args, kwargs) -> str:
+    parametros = sorted((nome, valor) for nome, valor in kwargs.items() if nome != "usuario")
+    resumo = hashlib.md5(repr(parametros).encode()).hexdigest()
+    versao = await obter_versao(chave_versao("lista"))
+    return f"{namespace}:lista:{versao}:{resumo}"
+
+
+# Invalida as tarefas alteradas e todas as listagens, trocando suas versões
+async def invalidar_tarefas(ids: Iterable[int] = ()):
+    for id in ids:
+        await nova_versao(chave_versao("tarefa", id))
+    await nova_versao(chave_versao("lista"))
+
+
+# Invalida a tarefa alterada (se houver) e todas as listagens
+async def invalidar_tarefa(id: Optional[int] = None):
+    await invalidar_tarefas([] if id is None else [id])
+
+
+# Versões para os endpoints síncronos, que rodam no threadpool fora do event loop
+def invalidar_tarefa_sync(id: Optional[int] = None):
+    anyio.from_thread.run(invalidar_tarefa, id)
+
+
+def invalidar_tarefas_sync(ids: Iterable[int] = ()):
+    anyio.from_thread.run(invalidar_tarefas, ids)
@@ -0,0 +1,203 @@
+import os
+import zlib
+from typing import Optional
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # Dependência opcional: sem ela, só gzip
+    brotli = None
+try:
+    import msgpack
+except ImportError:  # Dependência opcional: sem ela, Accept: application/msgpack recebe JSON
+    msgpack = None
+
+# Compressão das respostas (gzip ou brotli, conforme o Accept-Encoding do cliente)
+COMPRESSAO_ATIVA = os.getenv("COMPRESSAO_ATIVA", "true").lower() == "true"
+COMPRESSAO_MINIMO = int(os.getenv("COMPRESSAO_MINIMO", "1024"))  # Bytes; respostas menores saem sem compressão
+COMPRESSAO_NIVEL_GZIP = int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))  # 1 (rápido) a 9 (menor)
+COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))  # 0 (rápido) a 11 (menor)
+
+# Tipos que valem a compressão; text/event-stream fica de fora para cada evento sair na hora
+TIPOS_COMPRIMIVEIS = ("application/json", "application/x-ndjson", "application/msgpack", "text/csv", "text/plain")
+TIPO_MSGPACK = "application/msgpack"
+
+
+# Codificações aceitas pelo cliente com q > 0 (ex.: "gzip, br;q=0.8" -> {"gzip": 1.0, "br": 0.8})
+def codificacoes_aceitas(cabecalho: str) -> dict:
+    aceitas = {}
+    for item in cabecalho.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                continue
+        if nome and q > 0:
+            aceitas[nome.strip().lower()] = q
+    return aceitas
+
+
+# Escolhe brotli (se instalado) ou gzip entre as codificações aceitas, pela preferência do cliente
+def escolher_codificacao(cabecalho: str) -> Optional[str]:
+    aceitas = codificacoes_aceitas(cabecalho)
+    disponiveis = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidatas = [(aceitas.get(nome, aceitas.get("*", 0)), -ordem, nome) for ordem, nome in enumerate(disponiveis)]
+    q, _, nome = max(candidatas)
+    return nome if q > 0 else None
+
+
+# Compressor incremental com a mesma interface para os dois formatos
+class Compressor:
+    def __init__(self, codificacao: str, nivel_gzip: int = COMPRESSAO_NIVEL_GZIP,
+                 nivel_brotli: int = COMPRESSAO_NIVEL_BROTLI):
+        if codificacao == "br":
+            self._brotli = brotli.Compressor(quality=nivel_brotli)
+        else:
+            self._brotli = None
+            self._gzip = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)  # wbits 31: cabeçalho gzip
+
+    def comprimir(self, dados: bytes) -> bytes:
+        return self._brotli.process(dados) if self._brotli else self._gzip.compress(dados)
+
+    def finalizar(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._gzip.flush()
+
+
+# Sufixos que os middlewares acrescentam ao ETag forte de cada representação (JSON, gzip, brotli, MessagePack)
+SUFIXOS_ETAG = ("-gzip", "-br", "-msgpack")
+
+
+# Um ETag forte vale para uma sequência de bytes: cada representação recebe o seu ('"abc"' -> '"abc-gzip"')
+def marcar_etag(headers: MutableHeaders, sufixo: str):
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/") and etag.endswith('"'):
+        headers["ETag"] = f'{etag[:-1]}-{sufixo}"'
+
+
+# ETag sem os sufixos de representação, para comparar o If-None-Match com o ETag calculado pela API
+def etag_base(etag: str) -> str:
+    while etag.endswith('"') and etag[:-1].endswith(SUFIXOS_ETAG):
+        etag = etag[:-1].rsplit("-", 1)[0] + '"'
+    return etag
+
+
+def comprimivel(headers: MutableHeaders) -> bool:
+    tipo = headers.get("content-type", "")
+    return "content-encoding" not in headers and tipo.startswith(TIPOS_COMPRIMIVEIS)
+
+
+# Middleware ASGI de compressão: respostas de um bloco só a partir de "minimo" bytes; respostas em fluxo
+# (exportações) são comprimidas aos poucos, sem Content-Length
+class MiddlewareCompressao:
+    def __init__(self, app, minimo: int = COMPRESSAO_MINIMO, nivel_gzip: int = COMPRESSAO_NIVEL_GZIP,
+                 nivel_brotli: int = COMPRESSAO_NIVEL_BROTLI):
+        self.app = app
+        self.minimo = minimo
+        self.niveis = {"nivel_gzip": nivel_gzip, "nivel_brotli": nivel_brotli}
+
+    async def __call__(self, scope, receive, send):
+        codificacao = None
+        if scope["type"] == "http" and COMPRESSAO_ATIVA:
+            codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None  # http.response.start guardado até o primeiro bloco do corpo
+        compressor: Optional[Compressor] = None
+
+        async def enviar(mensagem):
+            nonlocal inicio, compressor
+            if mensagem["type"] == "http.response.start":
+                inicio = mensagem
+                return
+            if mensagem["type"] != "http.response.body":
+                await send(mensagem)
+                return
+
+            corpo, mais = mensagem.get("body", b""), mensagem.get("more_body", False)
+            if inicio is not None:
+                headers = MutableHeaders(scope=inicio)
+                if comprimivel(headers) and (mais or len(corpo) >= self.minimo):
+                    compressor = Compressor(codificacao, **self.niveis)
+                    headers["Content-Encoding"] = codificacao
+                    headers.add_vary_header("Accept-Encoding")
+                    marcar_etag(headers, codificacao)
+                    if "content-length" in headers:
+                        del headers["Content-Length"]
+                    if not mais:
+                        # Resposta inteira já disponível: comprimida de uma vez, com Content-Length
+                        corpo = compressor.comprimir(corpo) + compressor.finalizar()
+                        headers["Content-Length"] = str(len(corpo))
+                        compressor = None
+                        await send(inicio)
+                        inicio = None
+                        await send({"type": "http.response.body", "body": corpo})
+                        return
+                elif comprimivel(headers):
+                    headers.add_vary_header("Accept-Encoding")
+                await send(inicio)
+                inicio = None
+
+            if compressor is None:
+                await send(mensagem)
+                return
+            dados = compressor.comprimir(corpo)
+            if not mais:
+                dados += compressor.finalizar()
+            if dados or not mais:
+                await send({"type": "http.response.body", "body": dados, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
+        if inicio is not None:  # Resposta sem corpo
+            await send(inicio)
+
+
+# O cliente pediu MessagePack no Accept (e o pacote está instalado)
+def aceita_msgpack(scope) -> bool:
+    aceito = Headers(scope=scope).get("accept", "")
+    return msgpack is not None and (TIPO_MSGPACK in aceito or "application/x-msgpack" in aceito)
+
+
+# Middleware ASGI que converte as respostas JSON de /tarefas em MessagePack quando o Accept pede.
+# A conversão é feita na saída para valer também para os bytes JSON guardados no cache
+class MiddlewareMsgpack:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/tarefas") or not aceita_msgpack(scope):
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+
+        async def enviar(mensagem):
+            nonlocal inicio
+            if mensagem["type"] == "http.response.start":
+                headers = MutableHeaders(scope=mensagem)
+                headers.add_vary_header("Accept")
+                sem_corpo = mensagem["status"] in (204, 304)
+                if not sem_corpo and headers.get("content-type", "").startswith("application/json"):
+                    inicio = mensagem  # Aguarda o corpo para converter
+                    return
+            elif mensagem["type"] == "http.response.body" and inicio is not None:
+                if mensagem.get("more_body", False):
+                    # Corpo JSON em partes (não acontece com JSONResponse): segue como JSON
+                    await send(inicio)
+                    inicio = None
+                else:
+                    corpo = msgpack.packb(orjson.loads(mensagem.get("body", b"") or b"null"))
+                    headers = MutableHeaders(scope=inicio)
+                    headers["Content-Type"] = TIPO_MSGPACK
+                    headers["Content-Length"] = str(len(corpo))
+                    marcar_etag(headers, "msgpack")
+                    await send(inicio)
+                    inicio = None
+                    mensagem = {"type": "http.response.body", "body": corpo}
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
+from sqlmodel import select
+from app.auth import get_current_user
+from app.cache import chave_versao, obter_versao
+from app.codificacao import etag_base
+from app.models import Tarefa
+
+
+# Colunas lidas pelas dependências condicionais de GET /tarefas/{id}: o ETag depende do conteúdo da tarefa
+def consulta_validadores(id: int):
+    return select(
+        Tarefa.titulo, Tarefa.descricao, Tarefa.estado, Tarefa.data_criacao, Tarefa.data_atualizacao
+    ).where(Tarefa.id == id)
+
+
+# ETag forte de uma tarefa: hash das colunas, então muda a cada alteração mesmo que a data de atualização
+# venha repetida do cliente ou a escrita seja feita fora da API
+def etag_tarefa(id: int, linha) -> str:
+    return '"' + hashlib.md5(repr((id, *linha)).encode()).hexdigest() + '"'
+
+
+# ETag de uma listagem: versão atual da coleção (trocada a cada escrita) combinada com os parâmetros da consulta
+def etag_lista(versao: str, request: Request) -> str:
+    parametros = sorted(request.query_params.multi_items())
+    return '"' + hashlib.md5(f"{versao}:{parametros!r}".encode()).hexdigest() + '"'
+
+
+# A versão da coleção é o instante (em ns) da última escrita, então também serve como Last-Modified
+def data_versao(versao: str) -> datetime:
+    return datetime.fromtimestamp(int(versao) / 1_000_000_000, timezone.utc)
+
+
+# As datas do banco são UTC sem fuso
+def em_utc(data: datetime) -> datetime:
+    return data.replace(tzinfo=timezone.utc) if data.tzinfo is None else data.astimezone(timezone.utc)
+
+
+# O Last-Modified tem precisão de segundos: uma escrita no mesmo segundo não mudaria a data. Só é enviado (e
+# comparado com If-Modified-Since) quando a última alteração tem mais de 1 s; antes disso vale apenas o ETag
+def data_estavel(ultima_modificacao: datetime) -> bool:
+    return em_utc(ultima_modificacao) < datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+def cabecalhos_validacao(etag: str, ultima_modificacao: datetime) -> dict:
+    if not data_estavel(ultima_modificacao):
+        return {"ETag": etag}
+    return {"ETag": etag, "Last-Modified": format_datetime(em_utc(ultima_modificacao), usegmt=True)}
+
+
+# ETag do If-None-Match que corresponde à versão atual, com o sufixo da representação que o cliente guardou
+def etag_correspondente(request: Request, etag: str) -> Optional[str]:
+    for valor in request.headers.get("if-none-match", "").split(","):
+        valor = valor.strip().removeprefix("W/")
+        if valor == "*" or etag_base(valor) == etag:
+            return valor
+    return None
+
+
+# Compara os validadores enviados pelo cliente; If-None-Match tem precedência sobre If-Modified-Since
+def nao_modificado(request: Request, etag: str, ultima_modificacao: datetime) -> bool:
+    if request.headers.get("if-none-match") is not None:
+        return etag_correspondente(request, etag) is not None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and data_estavel(ultima_modificacao):
+        try:
+            data = em_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False  # Data inválida: o cabeçalho é ignorado
+        # O cabeçalho HTTP tem precisão de segundos
+        return em_utc(ultima_modificacao).replace(microsecond=0) <= data
+    return False
+
+
+# Guarda os validadores para o middleware e responde 304, sem executar o endpoint, se o cliente já tem a versão atual
+def verificar_condicional(request: Request, etag: str, ultima_modificacao: datetime):
+    request.state.validadores = cabecalhos_validacao(etag, ultima_modificacao)
+    if nao_modificado(request, etag, ultima_modificacao):
+        headers = dict(request.state.validadores)
+        correspondente = etag_correspondente(request, etag)
+        if correspondente not in (None, "*"):
+            headers["ETag"] = correspondente  # O 304 repete o ETag da representação que o cliente tem
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+# Dependência de GET /tarefas: usa apenas a versão da coleção guardada no cache, sem consultar o banco
+async def condicional_lista(request: Request, usuario: str = Depends(get_current_user)):
+    versao = await obter_versao(chave_versao("lista"))
+    verificar_condicional(request, etag_lista(versao, request), data_versao(versao))
+
+
+# Usada pelas dependências de GET /tarefas/{id}, que leem apenas as colunas da consulta_validadores
+def verificar_condicional_tarefa(request: Request, id: int, linha):
+    if linha is not None:  # Tarefa inexistente: o endpoint responde 404
+        verificar_condicional(request, etag_tarefa(id, linha), linha.data_atualizacao)
@@ -1,6 +1,14 @@
 from dotenv import load_dotenv
 import os
-from sqlmodel import SQLModel, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models import Usuario
+from app.estatisticas import instalar_resumo
+from app.busca import instalar_busca
+from app.alteracoes import instalar_alteracoes
+from app.metricas import instrumentar_engine
 
 # Carregar o arquivo .env
 load_dotenv()
@@ -9,9 +17,91 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Configuração do engine e do pool de conexões (todas opcionais no .env)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # Log do SQL desligado por padrão
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Segundos até reciclar uma conexão
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# PRAGMAs aplicados em cada nova conexão SQLite
+PRAGMAS_SQLITE = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),  # Leitores não bloqueiam o escritor
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # Seguro com WAL e com menos fsyncs
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # Milissegundos
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),  # Bytes
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),  # Negativo = KiB
+}
+
+# Drivers assíncronos aceitos no DATABASE_URL e o driver síncrono equivalente
+DRIVERS_ASYNC = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql",
+}
+
+
+# Registra os PRAGMAs para serem executados sempre que o pool abrir uma conexão
+def aplicar_pragmas_sqlite(engine_sync, pragmas: dict):
+    @event.listens_for(engine_sync, "connect")
+    def executar_pragmas(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+
+# Função para criar o engine (síncrono ou assíncrono) com as configurações de pool e PRAGMAs
+def criar_engine(url, assincrono: bool = False, pragmas: dict = PRAGMAS_SQLITE):
+    url = make_url(url)
+    opcoes = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    sqlite = url.get_backend_name() == "sqlite"
+    # Bancos SQLite em memória usam um pool de conexão única, sem tamanho configurável
+    if not (sqlite and url.database in (None, "", ":memory:")):
+        opcoes.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+    if assincrono:
+        novo_engine = create_async_engine(url, **opcoes)
+        engine_sync = novo_engine.sync_engine
+    else:
+        novo_engine = engine_sync = create_engine(url, **opcoes)
+
+    if sqlite and pragmas:
+        aplicar_pragmas_sqlite(engine_sync, pragmas)
+    instrumentar_engine(engine_sync)  # Contagem e duração das consultas no /metrics
+    return novo_engine
+
+
+# Com um driver assíncrono (ex.: sqlite+aiosqlite:///./tarefas.db) os endpoints de tarefas usam async def
+url = make_url(DATABASE_URL)
+MODO_ASYNC = url.drivername in DRIVERS_ASYNC
+
+if MODO_ASYNC:
+    async_engine = criar_engine(url, assincrono=True)
+    # O engine síncrono continua disponível para o Alembic, scripts e login
+    url = url.set(drivername=DRIVERS_ASYNC[url.drivername])
+else:
+    async_engine = None
+
 # Configurar o banco de dados
-engine = create_engine(DATABASE_URL, echo=True)
+engine = criar_engine(url)
+
+# Usuário de demonstração, com o hash bcrypt de "senha123" já calculado (evita um bcrypt a cada inicialização)
+USUARIO_PADRAO = {
+    "username": "usuario1",
+    "full_name": "Usuario Um",
+    "email": "usuario1@example.com",
+    "hashed_password": "$2b$12$0kN1mlE7aVZAAopJ9V7vV.lVXixVu/Gv62ztyL4SEqVktV/NgHIpy",
+    "disabled": False,
+}
 
 # Função para inicializar o banco de dados
 def init_db():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        instalar_resumo(conn)  # Gatilhos do resumo usado por GET /tarefas/stats
+        instalar_busca(conn)  # Índice FTS5 usado por GET /tarefas/search
+        instalar_alteracoes(conn)  # Log de alterações usado por GET /tarefas/changes
+    with Session(engine) as session:
+        if not session.exec(select(Usuario).where(Usuario.username == USUARIO_PADRAO["username"])).first():
+            session.add(Usuario(**USUARIO_PADRAO))
+            session.commit()
@@ -0,0 +1,76 @@
+import os
+from typing import Optional
+from sqlalchemy import Column, Integer, MetaData, Table, delete, exists, func, insert, select
+from app.models import Tarefa
+
+# Quantidade de tarefas removidas por transação (transações curtas não seguram a escrita do SQLite por muito tempo)
+DEDUP_TAMANHO_LOTE = int(os.getenv("DEDUP_TAMANHO_LOTE", "10000"))
+
+# Tabela temporária (por conexão) com cada tarefa duplicada e a tarefa que será mantida no lugar dela
+duplicadas = Table(
+    "tarefa_duplicada",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("manter", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+# Expressão SQL que define quando duas tarefas são iguais; a forma normalizada é a do índice ix_tarefa_titulo_normalizado
+def chave_titulo(normalizar: bool):
+    return func.lower(func.trim(Tarefa.titulo)) if normalizar else Tarefa.titulo
+
+
+# Relatório das duplicatas (modo dry-run): grupos com mais de uma tarefa, dos maiores para os menores
+def relatorio_duplicatas(conn, normalizar: bool = False, limite: Optional[int] = None) -> dict:
+    chave = chave_titulo(normalizar)
+    quantidade = func.count(Tarefa.id)
+    grupos = conn.execute(
+        select(func.min(Tarefa.titulo), quantidade, func.min(Tarefa.id))
+        .group_by(chave)
+        .having(quantidade > 1)
+        .order_by(quantidade.desc(), func.min(Tarefa.id))
+    ).all()
+    return {
+        "grupos": len(grupos),
+        "removiveis": sum(total - 1 for _, total, _ in grupos),
+        "exemplos": [
+            {"titulo": titulo, "quantidade": total, "manter": manter} for titulo, total, manter in grupos[:limite]
+        ],
+    }
+
+
+# Remove as duplicatas mantendo a tarefa de menor id de cada grupo; retorna a quantidade removida
+def remover_duplicatas(conn, normalizar: bool = False, tamanho_lote: int = DEDUP_TAMANHO_LOTE) -> int:
+    chave = chave_titulo(normalizar)
+    # Uma única leitura (função de janela) encontra todas as duplicatas e a tarefa mantida de cada uma
+    grupos = select(Tarefa.id, func.min(Tarefa.id).over(partition_by=chave).label("manter")).subquery()
+    duplicadas.drop(conn, checkfirst=True)
+    duplicadas.create(conn)
+    try:
+        conn.execute(
+            insert(duplicadas).from_select(
+                ["id", "manter"], select(grupos.c.id, grupos.c.manter).where(grupos.c.id != grupos.c.manter)
+            )
+        )
+        conn.commit()
+
+        mantida = Tarefa.__table__.alias("mantida")
+        removidas, ultimo = 0, 0
+        while True:
+            # Fim do lote atual, percorrendo a tabela temporária pela chave primária
+            limite = conn.execute(
+                select(duplicadas.c.id).where(duplicadas.c.id > ultimo)
+                .order_by(duplicadas.c.id).offset(tamanho_lote - 1).limit(1)
+            ).scalar()
+            faixa = [duplicadas.c.id > ultimo] + ([duplicadas.c.id <= limite] if limite is not None else [])
+            # Só remove se a tarefa mantida ainda existe (ela pode ter sido excluída entre um lote e outro)
+            lote = select(duplicadas.c.id).where(*faixa, exists().where(mantida.c.id == duplicadas.c.manter))
+            removidas += conn.execute(delete(Tarefa).where(Tarefa.id.in_(lote))).rowcount
+            conn.commit()
+            if limite is None:
+                return removidas
+            ultimo = limite
+    finally:
+        duplicadas.drop(conn, checkfirst=True)
+        conn.commit()
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import text
+from sqlmodel import Session, func, select
+from app.models import EstadoTarefa, ResumoDia, ResumoEstado
+
+# Gatilhos que mantêm resumoestado e resumodia a cada INSERT, UPDATE e DELETE em tarefa, inclusive nas
+# escritas em lote, na importação e nos scripts: as estatísticas são lidas sem percorrer a tabela de tarefas
+GATILHOS_RESUMO = {
+    "tarefa_resumo_insert": """
+        CREATE TRIGGER tarefa_resumo_insert AFTER INSERT ON tarefa BEGIN
+            INSERT INTO resumoestado (estado, total) VALUES (NEW.estado, 1)
+                ON CONFLICT (estado) DO UPDATE SET total = total + 1;
+            -- Criação e atualização no mesmo dia (o caso comum) custam um único upsert
+            INSERT INTO resumodia (dia, criadas, atualizadas)
+                VALUES (date(NEW.data_criacao), 1, date(NEW.data_criacao) = date(NEW.data_atualizacao))
+                ON CONFLICT (dia) DO UPDATE SET criadas = criadas + 1, atualizadas = atualizadas + excluded.atualizadas;
+            INSERT INTO resumodia (dia, criadas, atualizadas)
+                SELECT date(NEW.data_atualizacao), 0, 1 WHERE date(NEW.data_criacao) <> date(NEW.data_atualizacao)
+                ON CONFLICT (dia) DO UPDATE SET atualizadas = atualizadas + 1;
+        END
+    """,
+    "tarefa_resumo_update": """
+        CREATE TRIGGER tarefa_resumo_update AFTER UPDATE OF estado, data_criacao, data_atualizacao ON tarefa BEGIN
+            UPDATE resumoestado SET total = total - 1 WHERE estado = OLD.estado;
+            INSERT INTO resumoestado (estado, total) VALUES (NEW.estado, 1)
+                ON CONFLICT (estado) DO UPDATE SET total = total + 1;
+            UPDATE resumodia SET criadas = criadas - 1 WHERE dia = date(OLD.data_criacao);
+            INSERT INTO resumodia (dia, criadas, atualizadas) VALUES (date(NEW.data_criacao), 1, 0)
+                ON CONFLICT (dia) DO UPDATE SET criadas = criadas + 1;
+            UPDATE resumodia SET atualizadas = atualizadas - 1 WHERE dia = date(OLD.data_atualizacao);
+            INSERT INTO resumodia (dia, criadas, atualizadas) VALUES (date(NEW.data_atualizacao), 0, 1)
+                ON CONFLICT (dia) DO UPDATE SET atualizadas = atualizadas + 1;
+        END
+    """,
+    "tarefa_resumo_delete": """
+        CREATE TRIGGER tarefa_resumo_delete AFTER DELETE ON tarefa BEGIN
+            UPDATE resumoestado SET total = total - 1 WHERE estado = OLD.estado;
+            UPDATE resumodia SET criadas = criadas - 1 WHERE dia = date(OLD.data_criacao);
+            UPDATE resumodia SET atualizadas = atualizadas - 1 WHERE dia = date(OLD.data_atualizacao);
+        END
+    """,
+}
+
+# Recalcula o resumo inteiro a partir da tabela de tarefas (usado uma única vez, ao instalar os gatilhos)
+RECALCULAR_RESUMO = [
+    "DELETE FROM resumoestado",
+    "DELETE FROM resumodia",
+    "INSERT INTO resumoestado (estado, total) SELECT estado, count(*) FROM tarefa GROUP BY estado",
+    """
+    INSERT INTO resumodia (dia, criadas, atualizadas)
+    SELECT dia, sum(criadas), sum(atualizadas) FROM (
+        SELECT date(data_criacao) AS dia, 1 AS criadas, 0 AS atualizadas FROM tarefa
+        UNION ALL
+        SELECT date(data_atualizacao), 0, 1 FROM tarefa
+    ) GROUP BY dia
+    """,
+]
+
+
+# Cria os gatilhos que faltam e, nesse caso, recalcula o resumo (bancos criados antes do resumo existir)
+def instalar_resumo(conn):
+    if conn.dialect.name != "sqlite":
+        return  # Os gatilhos usam a sintaxe do SQLite
+    existentes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    faltando = [nome for nome in GATILHOS_RESUMO if nome not in existentes]
+    if not faltando:
+        return
+    for nome in faltando:
+        conn.execute(text(GATILHOS_RESUMO[nome]))
+    for sql in RECALCULAR_RESUMO:
+        conn.execute(text(sql))
+
+
+# Consulta do total de tarefas (opcionalmente de um estado) no resumo: lê uma linha por estado, sem contar a tabela
+def consulta_total(estado: Optional[str] = None):
+    query = select(func.coalesce(func.sum(ResumoEstado.total), 0))
+    if estado:
+        query = query.where(ResumoEstado.estado == estado)
+    return query
+
+
+# Monta a resposta de GET /tarefas/stats com os estados e os últimos `dias` dias do resumo
+def calcular_estatisticas(session: Session, dias: int, hoje: Optional[date] = None) -> dict:
+    hoje = hoje or datetime.utcnow().date()  # As datas das tarefas são gravadas em UTC
+    por_estado = {estado.value: 0 for estado in EstadoTarefa}
+    for resumo in session.exec(select(ResumoEstado)).all():
+        por_estado[resumo.estado.value] = resumo.total
+    por_dia = session.exec(
+        select(ResumoDia)
+        .where(ResumoDia.dia > hoje - timedelta(days=dias))
+        .where((ResumoDia.criadas > 0) | (ResumoDia.atualizadas > 0))
+        .order_by(ResumoDia.dia)
+    ).all()
+    return {"total": sum(por_estado.values()), "por_estado": por_estado, "por_dia": por_dia}
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+import os
+from typing import Iterator, Optional
+from sqlmodel import select
+from app.models import Tarefa
+
+# Linhas buscadas do banco por vez (cursor no servidor): a memória não cresce com o tamanho da tabela
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+
+COLUNAS = ["id", "titulo", "descricao", "estado", "data_criacao", "data_atualizacao"]
+
+
+# Consulta apenas as colunas exportadas, em ordem de id, com o filtro opcional por estado
+def consulta_exportacao(estado: Optional[str] = None):
+    query = select(*(getattr(Tarefa, coluna) for coluna in COLUNAS)).order_by(Tarefa.id)
+    if estado:
+        query = query.where(Tarefa.estado == estado)
+    return query
+
+
+# Percorre o resultado em blocos de yield_per linhas, sem carregar a tabela inteira
+def iterar_blocos(engine, estado: Optional[str], yield_per: int):
+    with engine.connect() as conn:
+        resultado = conn.execution_options(yield_per=yield_per).execute(consulta_exportacao(estado))
+        for bloco in resultado.partitions():
+            yield bloco
+
+
+# Converte uma linha do banco para valores serializáveis
+def valores(linha) -> list:
+    id, titulo, descricao, estado, data_criacao, data_atualizacao = linha
+    return [id, titulo, descricao, estado.value, data_criacao.isoformat(), data_atualizacao.isoformat()]
+
+
+# Gera o NDJSON (um objeto JSON por linha), um bloco por vez
+def gerar_ndjson(engine, estado: Optional[str] = None, yield_per: int = EXPORT_YIELD_PER) -> Iterator[str]:
+    for bloco in iterar_blocos(engine, estado, yield_per):
+        yield "".join(
+            json.dumps(dict(zip(COLUNAS, valores(linha))), ensure_ascii=False) + "\n" for linha in bloco
+        )
+
+
+# Gera o CSV com cabeçalho, um bloco por vez
+def gerar_csv(engine, estado: Optional[str] = None, yield_per: int = EXPORT_YIELD_PER) -> Iterator[str]:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUNAS)
+    for bloco in iterar_blocos(engine, estado, yield_per):
+        escritor.writerows(valores(linha) for linha in bloco)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()  # Apenas o cabeçalho, quando não há linhas
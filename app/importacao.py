@@ -0,0 +1,218 @@
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Union
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import NotRequired, Required, TypedDict
+from sqlmodel import select, insert
+from app.models import Tarefa, TarefaBase, EstadoTarefa
+
+# Quantidade de linhas enviadas em cada executemany
+TAMANHO_LOTE = 1000
+
+# POST /tarefas/import: linhas validadas e inseridas por vez e quantidade de erros detalhados na resposta
+IMPORT_TAMANHO_LOTE = int(os.getenv("IMPORT_TAMANHO_LOTE", "5000"))
+IMPORT_MAX_ERROS = int(os.getenv("IMPORT_MAX_ERROS", "100"))
+
+# Esquema gerado a partir dos campos de TarefaBase: valida um lote inteiro em uma chamada,
+# sem instanciar um modelo SQLModel por linha (o __init__ do SQLModel domina o custo)
+LinhaTarefa = TypedDict("LinhaTarefa", {
+    nome: (Required if campo.is_required() else NotRequired)[campo.annotation]
+    for nome, campo in TarefaBase.model_fields.items()
+})
+VALIDADOR_LOTE = TypeAdapter(list[LinhaTarefa])
+CAMPOS_OPCIONAIS = {nome: campo for nome, campo in TarefaBase.model_fields.items() if not campo.is_required()}
+
+# Registro lido do corpo: número da linha e o objeto, ou a mensagem de erro de leitura
+Registro = tuple[int, Union[dict, str]]
+
+
+# Função para ler um array JSON aos pedaços, devolvendo um item (objeto ou valor) por vez sem carregar o array inteiro
+def iterar_array_json(pedacos: Iterable[bytes]) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    texto = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    iniciado = False
+    for pedaco in pedacos:
+        buffer += texto.decode(pedaco)
+        pos = 0
+        while True:
+            # Pula espaços e vírgulas entre os itens
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if not iniciado:
+                if buffer[pos] != "[":
+                    raise ValueError("O conteúdo recebido não é um array JSON")
+                iniciado = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos_final = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Item incompleto: aguarda o próximo pedaço
+            # Só é completo se seguido de um separador: um número no fim do pedaço ("[1, 2" + "3]") pode continuar
+            if pos_final == len(buffer) or buffer[pos_final] not in " \t\r\n,]":
+                break
+            yield item
+            pos = pos_final
+        buffer = buffer[pos:]
+    raise ValueError("Array JSON incompleto")
+
+
+# Converte um todo do JSON Placeholder para uma linha da tabela de tarefas
+def converter_tarefa_externa(tarefa: dict) -> dict:
+    agora = datetime.utcnow()
+    return {
+        "titulo": tarefa["title"],
+        "descricao": "Tarefa importada da API JSON Placeholder",
+        "estado": EstadoTarefa.concluida if tarefa["completed"] else EstadoTarefa.pendente,
+        "data_criacao": agora,
+        "data_atualizacao": agora,
+    }
+
+
+# Insere as tarefas ignorando títulos já existentes, em lotes com executemany
+def importar_tarefas(conn, tarefas: Iterable[dict], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    # Uma única consulta carrega os títulos existentes (evita uma consulta por tarefa)
+    titulos = set(conn.execute(select(Tarefa.titulo)).scalars())
+    lote = []
+    total = 0
+    for tarefa in tarefas:
+        if tarefa["titulo"] in titulos:
+            continue
+        titulos.add(tarefa["titulo"])
+        lote.append(tarefa)
+        if len(lote) >= tamanho_lote:
+            conn.execute(insert(Tarefa), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        conn.execute(insert(Tarefa), lote)
+        total += len(lote)
+    return total
+
+
+# Lê o corpo da requisição aos pedaços e devolve, a cada pedaço, as linhas completas recebidas
+async def iterar_linhas(pedacos: AsyncIterable[bytes]) -> AsyncIterator[list[str]]:
+    texto = codecs.getincrementaldecoder("utf-8")()
+    resto = ""
+    try:
+        async for pedaco in pedacos:
+            linhas = (resto + texto.decode(pedaco)).split("\n")
+            resto = linhas.pop()  # Última linha ainda incompleta
+            yield linhas
+        resto += texto.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="O corpo deve estar em UTF-8")
+    if resto:
+        yield [resto]
+
+
+# Converte as linhas NDJSON em registros (um objeto JSON por linha; linhas vazias são ignoradas)
+async def iterar_registros_ndjson(pedacos: AsyncIterable[bytes]) -> AsyncIterator[list[Registro]]:
+    numero = 0
+    async for linhas in iterar_linhas(pedacos):
+        registros = []
+        for linha in linhas:
+            numero += 1
+            if not linha.strip():
+                continue
+            try:
+                dados = json.loads(linha)
+            except ValueError:
+                registros.append((numero, "JSON inválido"))
+                continue
+            registros.append((numero, dados if isinstance(dados, dict) else "A linha deve ser um objeto JSON"))
+        yield registros
+
+
+# Converte as linhas CSV em registros usando a primeira linha como cabeçalho (campos vazios ficam com o padrão)
+async def iterar_registros_csv(pedacos: AsyncIterable[bytes]) -> AsyncIterator[list[Registro]]:
+    cabecalho = None
+    numero = 0
+    aberto = []  # Linhas de um registro com campo entre aspas ainda aberto
+    async for linhas in iterar_linhas(pedacos):
+        completos = []
+        for linha in linhas:
+            numero += 1
+            aberto.append(linha)
+            # Número ímpar de aspas: a quebra de linha faz parte de um campo entre aspas
+            if sum(parte.count('"') for parte in aberto) % 2:
+                continue
+            if linha.strip() or len(aberto) > 1:
+                completos.append((numero - len(aberto) + 1, "\n".join(aberto)))
+            aberto = []
+
+        registros = []
+        for (inicio, _), campos in zip(completos, csv.reader(texto for _, texto in completos)):
+            if cabecalho is None:
+                cabecalho = [nome.strip() for nome in campos]
+            elif len(campos) != len(cabecalho):
+                registros.append((inicio, "Quantidade de colunas diferente do cabeçalho"))
+            else:
+                registros.append((inicio, {nome: valor for nome, valor in zip(cabecalho, campos) if valor != ""}))
+        yield registros
+    if aberto:
+        yield [(numero - len(aberto) + 1, "Campo entre aspas não foi fechado")]
+
+
+# Valida os registros em lote; retorna as linhas prontas para o INSERT e os erros (linha, mensagem)
+def validar_registros(registros: list[Registro]) -> tuple[list[dict], list[tuple[int, str]]]:
+    erros = [(numero, dados) for numero, dados in registros if isinstance(dados, str)]
+    candidatos = [(numero, dados) for numero, dados in registros if not isinstance(dados, str)]
+    try:
+        linhas = VALIDADOR_LOTE.validate_python([dados for _, dados in candidatos])
+    except ValidationError as exc:
+        # Guarda o primeiro erro de cada linha inválida e valida novamente apenas as demais
+        invalidas = {}
+        for erro in exc.errors():
+            campo = ".".join(map(str, erro["loc"][1:]))
+            invalidas.setdefault(erro["loc"][0], f"{campo}: {erro['msg']}" if campo else erro["msg"])
+        erros += [(candidatos[indice][0], mensagem) for indice, mensagem in invalidas.items()]
+        linhas = VALIDADOR_LOTE.validate_python(
+            [dados for indice, (_, dados) in enumerate(candidatos) if indice not in invalidas]
+        )
+    # Os padrões (datas de criação/atualização) são calculados uma vez por lote
+    padroes = {nome: campo.get_default(call_default_factory=True) for nome, campo in CAMPOS_OPCIONAIS.items()}
+    for linha in linhas:
+        for nome, valor in padroes.items():
+            linha.setdefault(nome, valor)
+    return linhas, sorted(erros)
+
+
+# Valida e insere um lote em sua própria transação, acumulando as contagens no resultado
+def processar_lote(engine, registros: list[Registro], resultado: dict, max_erros: int = IMPORT_MAX_ERROS):
+    linhas, erros = validar_registros(registros)
+    if linhas:
+        with engine.begin() as conn:
+            conn.execute(insert(Tarefa), linhas)
+    resultado["aceitas"] += len(linhas)
+    resultado["rejeitadas"] += len(erros)
+    espaco = max_erros - len(resultado["erros"])
+    resultado["erros"] += [{"linha": numero, "detail": mensagem} for numero, mensagem in erros[:max(espaco, 0)]]
+
+
+# Importa o corpo NDJSON ou CSV enquanto ele chega: a memória fica limitada a um lote de linhas
+async def importar_corpo(
+    engine, pedacos: AsyncIterable[bytes], formato: str = "ndjson", tamanho_lote: int = IMPORT_TAMANHO_LOTE
+) -> dict:
+    leitor = iterar_registros_csv if formato == "csv" else iterar_registros_ndjson
+    resultado = {"aceitas": 0, "rejeitadas": 0, "erros": []}
+    pendentes = []
+    async for registros in leitor(pedacos):
+        pendentes += registros
+        while len(pendentes) >= tamanho_lote:
+            lote, pendentes = pendentes[:tamanho_lote], pendentes[tamanho_lote:]
+            # Validação e INSERT rodam no threadpool, sem bloquear o event loop
+            await run_in_threadpool(processar_lote, engine, lote, resultado)
+    if pendentes:
+        await run_in_threadpool(processar_lote, engine, pendentes, resultado)
+    return resultado
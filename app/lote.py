@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlmodel import Session, select, insert, update, delete
+from app.models import Tarefa, TarefaBase, TarefaAtualizacaoLote
+
+# Quantidade máxima de itens aceitos em uma requisição em lote
+LIMITE_LOTE = int(os.getenv("LIMITE_LOTE", "1000"))
+
+
+# Recusa lotes acima do limite configurado
+def validar_tamanho_lote(itens: list):
+    if len(itens) > LIMITE_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"O lote aceita no máximo {LIMITE_LOTE} itens",
+        )
+
+
+# Retorna, em uma única consulta, quais dos ids informados existem
+def ids_existentes(session: Session, ids: list) -> set:
+    return set(session.exec(select(Tarefa.id).where(Tarefa.id.in_(ids))).all())
+
+
+# Insere todas as tarefas com um único INSERT ... RETURNING em executemany
+def criar_em_lote(session: Session, tarefas: list[TarefaBase]) -> list[dict]:
+    if not tarefas:
+        return []
+    agora = datetime.utcnow()
+    linhas = [
+        {
+            "titulo": tarefa.titulo,
+            "descricao": tarefa.descricao,
+            "estado": tarefa.estado,
+            "data_criacao": tarefa.data_criacao or agora,
+            "data_atualizacao": tarefa.data_atualizacao or agora,
+        }
+        for tarefa in tarefas
+    ]
+    ids = session.scalars(insert(Tarefa).returning(Tarefa.id, sort_by_parameter_order=True), linhas).all()
+    return [{"id": id, "status": status.HTTP_201_CREATED} for id in ids]
+
+
+# Atualiza apenas os campos enviados de cada tarefa existente (UPDATE em lote pela chave primária)
+def atualizar_em_lote(session: Session, itens: list[TarefaAtualizacaoLote]) -> list[dict]:
+    existentes = ids_existentes(session, [item.id for item in itens])
+    agora = datetime.utcnow()
+    linhas = []
+    resultados = []
+    for item in itens:
+        if item.id not in existentes:
+            resultados.append({"id": item.id, "status": status.HTTP_404_NOT_FOUND, "detail": "Tarefa não encontrada"})
+            continue
+        linha = item.model_dump(exclude_unset=True)
+        linha["data_atualizacao"] = agora
+        linhas.append(linha)
+        resultados.append({"id": item.id, "status": status.HTTP_200_OK})
+    if linhas:
+        session.execute(update(Tarefa), linhas)
+    return resultados
+
+
+# Remove todas as tarefas existentes com um único DELETE ... WHERE id IN (...)
+def deletar_em_lote(session: Session, ids: list[int]) -> list[dict]:
+    existentes = ids_existentes(session, ids)
+    if existentes:
+        session.execute(delete(Tarefa).where(Tarefa.id.in_(existentes)))
+    return [
+        {"id": id, "status": status.HTTP_204_NO_CONTENT}
+        if id in existentes
+        else {"id": id, "status": status.HTTP_404_NOT_FOUND, "detail": "Tarefa não encontrada"}
+        for id in ids
+    ]
@@ -1,16 +1,41 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Query
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.datastructures import MutableHeaders
 from sqlmodel import Session, select
-from app.database import engine, init_db
-from app.models import Tarefa, TarefaBase
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from app.auth import criar_token_acesso, verificar_senha, gerar_hash_senha
+from app.database import engine, init_db, MODO_ASYNC
+from app.models import (
+    Tarefa, TarefaBase, PaginaTarefas, Usuario, TarefaAtualizacaoLote, ResultadoLote, ResultadoImportacao,
+    EstadoTarefa, EstatisticasTarefas, PaginaAlteracoes,
+)
+from app.estatisticas import calcular_estatisticas, consulta_total
+from app.busca import consulta_busca, responder_busca, termos_busca
+from app.alteracoes import difusor
+from app.sincronizacao import iniciar_sincronizacao, encerrar_sincronizacao, sincronizar_uma_vez
+from app.lote import validar_tamanho_lote, criar_em_lote, atualizar_em_lote, deletar_em_lote
+from app.exportacao import gerar_csv, gerar_ndjson
+from app.paginacao import paginar_por_cursor, montar_pagina
+from app.importacao import (
+    TAMANHO_LOTE, converter_tarefa_externa, importar_tarefas, iterar_array_json, importar_corpo,
+)
+from fastapi.security import OAuth2PasswordRequestForm
+from app.auth import (
+    criar_token_acesso, verificar_senha_async, get_current_user, encerrar_pool_senhas,
+)
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 import requests
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
-from fastapi_cache.decorator import cache
+from app.serializacao import campos_projecao, consulta_tarefas, responder_tarefas
+from app.condicional import condicional_lista, consulta_validadores, verificar_condicional_tarefa
+from app.metricas import MiddlewareMetricas, gerar_metricas
+from app.codificacao import MiddlewareCompressao, MiddlewareMsgpack
+from app.cache import (
+    CACHE_TTL_LISTA, CACHE_TTL_TAREFA, NAMESPACE, CoderResposta, cache_agrupado, chave_lista, chave_tarefa,
+    configurar_cache, invalidar_tarefas, invalidar_tarefa_sync, invalidar_tarefas_sync,
+)
 
 # URL da API pública
 URL = "https://jsonplaceholder.typicode.com/todos"
@@ -20,50 +45,107 @@ URL = "https://jsonplaceholder.typicode.com/todos"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()  # Inicializar o banco de dados
-    FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")  # Configuração do cache
+    configurar_cache()  # Configuração do cache
+    iniciar_sincronizacao(engine)  # Sincronização periódica com a fonte externa (SYNC_INTERVALO > 0)
     yield  # Aqui pode ser usado para finalizar recursos, se necessário
+    encerrar_sincronizacao()
+    difusor.encerrar()
+    encerrar_pool_senhas()
 
 # Inicializando a aplicação com o lifespan
 app = FastAPI(lifespan=lifespan)
 
 
-# Simulação de um "banco de dados" para usuários
-fake_users_db = {
-    "usuario1": {
-        "username": "usuario1",
-        "full_name": "Usuario Um",
-        "email": "usuario1@example.com",
-        "hashed_password": gerar_hash_senha("senha123"),
-        "disabled": False,
-    }
-}
+# O cache do servidor é invalidado nas escritas, então o cliente deve sempre revalidar
+# (o decorator de cache enviaria o TTL de horas como max-age). Middleware ASGI, sem o BaseHTTPMiddleware,
+# que custaria uma tarefa e um canal a mais em cada conexão aberta de GET /tarefas/changes
+class RevalidarNoCliente:
+    def __init__(self, app):
+        self.app = app
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith("/tarefas"):
+            await self.app(scope, receive, send)
+            return
 
-def autenticar_usuario(username: str, password: str):
-    user = fake_users_db.get(username)
-    if not user or not verificar_senha(password, user["hashed_password"]):
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                headers = MutableHeaders(scope=mensagem)
+                headers["Cache-Control"] = "no-cache"
+                # request.state das dependências: ETag/Last-Modified calculados pelas dependências condicionais
+                # (substituem o ETag fraco do cache) e o total de cabecalho_total
+                estado = scope.get("state", {})
+                if mensagem["status"] == status.HTTP_200_OK:
+                    if estado.get("validadores"):
+                        headers.update(estado["validadores"])
+                    if estado.get("total") is not None:
+                        headers["X-Total-Count"] = str(estado["total"])
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
+
+
+app.add_middleware(RevalidarNoCliente)
+# MessagePack por dentro da compressão: o corpo já convertido também é comprimido
+app.add_middleware(MiddlewareMsgpack)
+app.add_middleware(MiddlewareCompressao)
+# Adicionado por último para ficar por fora dos demais middlewares e medir a requisição inteira
+app.add_middleware(MiddlewareMetricas)
+
+
+# Busca o usuário no banco pelo username (coluna com índice único)
+def buscar_usuario(username: str) -> Optional[Usuario]:
+    with Session(engine) as session:
+        return session.exec(select(Usuario).where(Usuario.username == username)).first()
+
+async def autenticar_usuario(username: str, password: str):
+    user = await run_in_threadpool(buscar_usuario, username)
+    # O bcrypt roda no pool de processos, sem ocupar o threadpool dos endpoints de tarefas
+    if not user or user.disabled or not await verificar_senha_async(password, user.hashed_password):
         return None
     return user
 
 
+# Dependência de GET /tarefas/{id}: lê só as colunas dos validadores para responder 304 sem montar o objeto
+def condicional_tarefa(id: int, request: Request, usuario: str = Depends(get_current_user)):
+    with Session(engine) as session:
+        linha = session.exec(consulta_validadores(id)).first()
+    verificar_condicional_tarefa(request, id, linha)
+
+
+# Dependência de GET /tarefas: com total=true, envia em X-Total-Count o total de tarefas do filtro, lido do resumo
+def cabecalho_total(
+    request: Request,
+    estado: Optional[EstadoTarefa] = Query(None, include_in_schema=False),  # Já documentado no endpoint
+    total: bool = Query(False, description="Envia o total de tarefas do filtro no cabeçalho X-Total-Count"),
+    usuario: str = Depends(get_current_user)
+):
+    if total:
+        with Session(engine) as session:
+            request.state.total = session.exec(consulta_total(estado)).one()
+
+
 # Endpoint de login
 @app.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = autenticar_usuario(form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await autenticar_usuario(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    token = criar_token_acesso({"sub": user["username"]})
+    token = criar_token_acesso({"sub": user.username})
     return {"access_token": token, "token_type": "bearer"}
 
 
 # Endpoint para listar todas as tarefas com filtros e paginação (Protegido)
-@app.get("/tarefas", response_model=list[Tarefa])
-@cache(expire=60)  # Cache configurado para expirar em 60 segundos
+@app.get(
+    "/tarefas",
+    response_model=Union[list[Tarefa], PaginaTarefas],
+    dependencies=[Depends(condicional_lista), Depends(cabecalho_total)],
+)
+@cache_agrupado(expire=CACHE_TTL_LISTA, namespace=NAMESPACE, key_builder=chave_lista, coder=CoderResposta)  # Invalidado a cada escrita
 def listar_tarefas(
     estado: Optional[str] = Query(
         None,
@@ -72,24 +154,34 @@ def listar_tarefas(
     ),
     skip: int = Query(0, ge=0, description="Número de tarefas a pular para paginação"),
     limit: int = Query(10, ge=1, le=100, description="Número máximo de tarefas a retornar (máximo: 100)"),
-    token: str = Depends(oauth2_scheme)
+    cursor: Optional[str] = Query(
+        None,
+        description="Ativa a paginação por cursor (envie vazio na primeira página e depois o 'next_cursor' recebido)"
+    ),
+    campos: Optional[tuple] = Depends(campos_projecao),  # Parâmetro fields=; entra na chave do cache já normalizado
+    usuario: str = Depends(get_current_user)
 ):
-    """Lista tarefas com suporte a filtros por estado e paginação."""
+    """Lista tarefas com suporte a filtros por estado, paginação (skip/limit ou cursor) e seleção de campos."""
     with Session(engine) as session:
-        # Base da consulta
-        query = select(Tarefa)
+        # Base da consulta (apenas as colunas no modo de serialização rápida)
+        query = consulta_tarefas(campos)
 
         # Aplicar filtro por estado, se fornecido
         if estado:
             query = query.where(Tarefa.estado == estado)
 
+        # Paginação por cursor: custo constante independente da profundidade
+        if cursor is not None:
+            tarefas = session.exec(paginar_por_cursor(query, cursor, limit)).all()
+            return responder_tarefas(montar_pagina(tarefas, limit), campos)
+
         # Adicionar paginação
         tarefas = session.exec(query.offset(skip).limit(limit)).all()
-        return tarefas
+        return responder_tarefas(tarefas, campos)
 
 # Endpoint para criar uma nova tarefa (Protegido)
 @app.post("/tarefas", response_model=Tarefa, status_code=status.HTTP_201_CREATED)
-def criar_tarefa(tarefa: TarefaBase, token: str = Depends(oauth2_scheme)):
+def criar_tarefa(tarefa: TarefaBase, usuario: str = Depends(get_current_user)):
     with Session(engine) as session:
         nova_tarefa = Tarefa(
             titulo=tarefa.titulo,
@@ -101,12 +193,146 @@ def criar_tarefa(tarefa: TarefaBase, token: str = Depends(oauth2_scheme)):
         session.add(nova_tarefa)
         session.commit()
         session.refresh(nova_tarefa)
+        invalidar_tarefa_sync()  # Novas tarefas alteram as listagens
+        difusor.sinalizar()  # Acorda os assinantes de GET /tarefas/changes
         return nova_tarefa
 
+# Endpoint para criar várias tarefas em uma única transação (Protegido)
+@app.post("/tarefas/batch", response_model=list[ResultadoLote], status_code=status.HTTP_201_CREATED)
+def criar_tarefas_lote(tarefas: list[TarefaBase], usuario: str = Depends(get_current_user)):
+    validar_tamanho_lote(tarefas)
+    with Session(engine) as session:
+        resultados = criar_em_lote(session, tarefas)
+        session.commit()
+    invalidar_tarefas_sync()
+    difusor.sinalizar()
+    return resultados
+
+# Endpoint para atualizar parcialmente várias tarefas em uma única transação (Protegido)
+@app.patch("/tarefas/batch", response_model=list[ResultadoLote])
+def atualizar_tarefas_lote(itens: list[TarefaAtualizacaoLote], usuario: str = Depends(get_current_user)):
+    validar_tamanho_lote(itens)
+    with Session(engine) as session:
+        resultados = atualizar_em_lote(session, itens)
+        session.commit()
+    invalidar_tarefas_sync(r["id"] for r in resultados if r["status"] == status.HTTP_200_OK)
+    difusor.sinalizar()
+    return resultados
+
+# Endpoint para deletar várias tarefas em uma única transação (Protegido)
+@app.delete("/tarefas/batch", response_model=list[ResultadoLote])
+def deletar_tarefas_lote(ids: list[int], usuario: str = Depends(get_current_user)):
+    validar_tamanho_lote(ids)
+    with Session(engine) as session:
+        resultados = deletar_em_lote(session, ids)
+        session.commit()
+    invalidar_tarefas_sync(r["id"] for r in resultados if r["status"] == status.HTTP_204_NO_CONTENT)
+    difusor.sinalizar()
+    return resultados
+
+# Endpoint para exportar todas as tarefas em NDJSON ou CSV, transmitidas aos poucos (Protegido)
+@app.get("/tarefas/export")
+def exportar_tarefas(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato da exportação ('ndjson' ou 'csv')"),
+    estado: Optional[str] = Query(
+        None,
+        pattern="^(pendente|em andamento|concluída)$",
+        description="Filtrar tarefas pelo estado ('pendente', 'em andamento', 'concluída')"
+    ),
+    usuario: str = Depends(get_current_user)
+):
+    if formato == "csv":
+        return StreamingResponse(
+            gerar_csv(engine, estado),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tarefas.csv"'},
+        )
+    return StreamingResponse(gerar_ndjson(engine, estado), media_type="application/x-ndjson")
+
+# Endpoint para importar tarefas de um corpo NDJSON ou CSV, lido e inserido aos poucos (Protegido)
+@app.post("/tarefas/import", response_model=ResultadoImportacao)
+async def importar_tarefas_arquivo(
+    request: Request,
+    formato: Optional[str] = Query(
+        None,
+        pattern="^(ndjson|csv)$",
+        description="Formato do corpo ('ndjson' ou 'csv'); sem o parâmetro, é deduzido do Content-Type"
+    ),
+    usuario: str = Depends(get_current_user)
+):
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    resultado = await importar_corpo(engine, request.stream(), formato)
+    if resultado["aceitas"]:
+        await invalidar_tarefas()
+        difusor.sinalizar()
+    return resultado
+
+# Endpoint com o total e as contagens por estado e por dia, lidas do resumo mantido no banco (Protegido)
+@app.get("/tarefas/stats", response_model=EstatisticasTarefas)
+def estatisticas_tarefas(
+    dias: int = Query(30, ge=1, le=366, description="Quantidade de dias, até hoje, nas contagens por dia"),
+    usuario: str = Depends(get_current_user)
+):
+    with Session(engine) as session:
+        return calcular_estatisticas(session, dias)
+
+# Endpoint de busca textual em título e descrição, ordenada por relevância e paginada por cursor (Protegido)
+@app.get("/tarefas/search", response_model=PaginaTarefas, dependencies=[Depends(condicional_lista)])
+@cache_agrupado(expire=CACHE_TTL_LISTA, namespace=NAMESPACE, key_builder=chave_lista, coder=CoderResposta)  # Invalidado a cada escrita
+def buscar_tarefas(
+    q: str = Query(..., min_length=1, max_length=200, description="Palavras buscadas no título e na descrição (todas obrigatórias)"),
+    estado: Optional[str] = Query(
+        None,
+        pattern="^(pendente|em andamento|concluída)$",
+        description="Filtrar tarefas pelo estado ('pendente', 'em andamento', 'concluída')"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Número máximo de tarefas a retornar (máximo: 100)"),
+    cursor: Optional[str] = Query(None, description="'next_cursor' recebido na página anterior"),
+    usuario: str = Depends(get_current_user)
+):
+    termos = termos_busca(q)
+    if not termos:
+        raise HTTPException(status_code=400, detail="A busca precisa de ao menos uma palavra")
+    with Session(engine) as session:
+        linhas = session.exec(consulta_busca(termos, estado, cursor, limit)).all()
+    return responder_busca(linhas, limit)
+
+# Feed de alterações das tarefas: SSE (Accept: text/event-stream) ou long-poll com since= (Protegido)
+@app.get("/tarefas/changes", response_model=PaginaAlteracoes)
+async def alteracoes_tarefas(
+    request: Request,
+    since: Optional[int] = Query(
+        None, ge=0, description="Último id de alteração recebido; sem ele, o feed começa nas próximas alterações"
+    ),
+    timeout: float = Query(30, ge=0, le=60, description="Segundos de espera do long-poll quando não há alterações"),
+    last_event_id: Optional[str] = Header(None, include_in_schema=False),  # Enviado pelo EventSource ao reconectar
+    usuario: str = Depends(get_current_user)
+):
+    desde = since
+    if desde is None and last_event_id is not None:
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=400, detail="Last-Event-ID inválido")
+        desde = int(last_event_id)
+    if desde is None:
+        desde = await difusor.atual()
+
+    if "text/event-stream" in request.headers.get("accept", ""):
+        await difusor.ler(desde)  # Responde 410 antes de abrir o fluxo se o ponto de retomada já foi descartado
+        return StreamingResponse(
+            difusor.fluxo(desde),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    if since is None and last_event_id is None:
+        return {"items": [], "ultimo_id": desde}  # Primeira chamada: só informa o ponto de partida
+    itens = await difusor.esperar(desde, timeout)
+    return {"items": itens, "ultimo_id": itens[-1]["id"] if itens else desde}
+
 # Endpoint para obter uma tarefa pelo ID (Protegido)
-@app.get("/tarefas/{id}", response_model=Tarefa)
-@cache(expire=30)  # Cache configurado para expirar em 30 segundos
-def obter_tarefa(id: int, token: str = Depends(oauth2_scheme)):
+@app.get("/tarefas/{id}", response_model=Tarefa, dependencies=[Depends(condicional_tarefa)])
+@cache_agrupado(expire=CACHE_TTL_TAREFA, namespace=NAMESPACE, key_builder=chave_tarefa)  # Invalidado a cada escrita
+def obter_tarefa(id: int, usuario: str = Depends(get_current_user)):
     with Session(engine) as session:
         tarefa = session.get(Tarefa, id)
         if not tarefa:
@@ -115,7 +341,7 @@ def obter_tarefa(id: int, token: str = Depends(oauth2_scheme)):
 
 # Endpoint para atualizar uma tarefa existente (Protegido)
 @app.put("/tarefas/{id}", response_model=Tarefa)
-def atualizar_tarefa(id: int, tarefa_atualizada: TarefaBase, token: str = Depends(oauth2_scheme)):
+def atualizar_tarefa(id: int, tarefa_atualizada: TarefaBase, usuario: str = Depends(get_current_user)):
     with Session(engine) as session:
         tarefa = session.get(Tarefa, id)
         if not tarefa:
@@ -124,16 +350,18 @@ def atualizar_tarefa(id: int, tarefa_atualizada: TarefaBase, token: str = Depend
         tarefa.titulo = tarefa_atualizada.titulo
         tarefa.descricao = tarefa_atualizada.descricao
         tarefa.estado = tarefa_atualizada.estado
-        tarefa.data_atualizacao = tarefa_atualizada.data_atualizacao or datetime.utcnow()
+        tarefa.data_atualizacao = datetime.utcnow()  # Sempre do servidor: base do Last-Modified
 
         session.add(tarefa)
         session.commit()
         session.refresh(tarefa)
+        invalidar_tarefa_sync(id)
+        difusor.sinalizar()
         return tarefa
 
 # Endpoint para deletar uma tarefa existente (Protegido)
 @app.delete("/tarefas/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_tarefa(id: int, token: str = Depends(oauth2_scheme)):
+def deletar_tarefa(id: int, usuario: str = Depends(get_current_user)):
     with Session(engine) as session:
         tarefa = session.get(Tarefa, id)
         if not tarefa:
@@ -141,37 +369,47 @@ def deletar_tarefa(id: int, token: str = Depends(oauth2_scheme)):
 
         session.delete(tarefa)
         session.commit()
+        invalidar_tarefa_sync(id)
+        difusor.sinalizar()
         return
 
-def buscar_tarefas_externas():
-    # Fazendo a requisição para a API
-    response = requests.get(URL)
-    
-    if response.status_code == 200:  # Verifica se a requisição foi bem-sucedida
-        tarefas = response.json()  # Converte o JSON recebido em uma lista de dicionários
-        
-        with Session(engine) as session:  # Conexão com o banco de dados
-            for tarefa in tarefas:
-                # Verifica se a tarefa já existe no banco pelo título
-                tarefa_existente = session.query(Tarefa).filter(Tarefa.titulo == tarefa["title"]).first()
-                
-                if not tarefa_existente:  # Se a tarefa não existir, cria uma nova
-                    nova_tarefa = Tarefa(
-                        titulo=tarefa["title"],
-                        descricao="Tarefa importada da API JSON Placeholder",
-                        estado="pendente" if not tarefa["completed"] else "concluída"
-                    )
-                    session.add(nova_tarefa)  # Adiciona a tarefa à sessão
-            
-            session.commit()  # Salva todas as mudanças no banco
-        print("Tarefas externas adicionadas com sucesso.")
-    else:
-        print(f"Erro ao buscar tarefas: {response.status_code}")
+# Estatísticas do cache (acertos, falhas, remoções) (Protegido)
+@app.get("/cache/estatisticas")
+def estatisticas_cache(usuario: str = Depends(get_current_user)):
+    return FastAPICache.get_backend().estatisticas()
+
+# Endpoint de métricas no formato de texto do Prometheus (sem autenticação, para o coletor; restrinja pela rede)
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metricas():  # No event loop, onde o limitador do threadpool pode ser lido
+    return PlainTextResponse(gerar_metricas(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def buscar_tarefas_externas(url: str = URL, tamanho_lote: int = TAMANHO_LOTE):
+    # Fazendo a requisição para a API (o corpo é lido aos pedaços, sem carregar tudo na memória)
+    with requests.get(url, stream=True, timeout=30) as response:
+        if response.status_code == 200:  # Verifica se a requisição foi bem-sucedida
+            tarefas = iterar_array_json(response.iter_content(chunk_size=64 * 1024))
+
+            with engine.begin() as conn:  # Uma única transação para toda a importação
+                total = importar_tarefas(
+                    conn, (converter_tarefa_externa(tarefa) for tarefa in tarefas), tamanho_lote
+                )
+            print(f"{total} tarefas externas adicionadas com sucesso.")
+            return total
+        else:
+            print(f"Erro ao buscar tarefas: {response.status_code}")
+            return 0
 
 @app.get("/")
 def read_root():
     return {"message": "Bem-vindo à API de Gerenciamento de Tarefas"}
 
+# Modo assíncrono (DATABASE_URL com driver async): troca os endpoints de tarefas pelas versões async def
+if MODO_ASYNC:
+    from app.routers import tarefas_async
+    tarefas_async.registrar(app)
+
 if __name__ == "__main__":
-    buscar_tarefas_externas()
+    init_db()
+    # Sincronização incremental: só as tarefas novas ou alteradas na origem são gravadas
+    print(asyncio.run(sincronizar_uma_vez(engine)))
 
@@ -0,0 +1,173 @@
+import bisect
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+import anyio.to_thread
+from sqlalchemy import event
+
+# Coleta das métricas expostas em /metrics (false = middleware e eventos do SQLAlchemy não medem nada)
+METRICAS_ATIVAS = os.getenv("METRICAS_ATIVAS", "true").lower() == "true"
+
+BALDES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BALDES_BCRYPT = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formatar_rotulos(nomes: tuple, valores: tuple) -> str:
+    return ",".join(f'{nome}="{escapar(valor)}"' for nome, valor in zip(nomes, valores))
+
+
+def formatar_valor(valor: float) -> str:
+    return "+Inf" if valor == math.inf else repr(float(valor))
+
+
+# Histograma com baldes fixos por combinação de rótulos, no formato de texto do Prometheus
+class Histograma:
+    def __init__(self, nome: str, descricao: str, rotulos: tuple, baldes: tuple):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = rotulos
+        self.baldes = tuple(baldes)
+        self._series: dict = {}  # valores dos rótulos -> [contagem por balde (o último é +Inf), soma]
+        self._lock = threading.Lock()  # Observações chegam do event loop e das threads do threadpool
+
+    def observar(self, valor: float, *rotulos):
+        indice = bisect.bisect_left(self.baldes, valor)
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = [[0] * (len(self.baldes) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def exportar(self) -> list[str]:
+        with self._lock:
+            series = sorted((rotulos, list(contagens), soma) for rotulos, (contagens, soma) in self._series.items())
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} histogram"]
+        for valores, contagens, soma in series:
+            rotulos = formatar_rotulos(self.rotulos, valores)
+            prefixo = rotulos + "," if rotulos else ""
+            acumulado = 0
+            for limite, contagem in zip(self.baldes + (math.inf,), contagens):
+                acumulado += contagem
+                linhas.append(f'{self.nome}_bucket{{{prefixo}le="{formatar_valor(limite)}"}} {acumulado}')
+            sufixo = f"{{{rotulos}}}" if rotulos else ""
+            linhas.append(f"{self.nome}_sum{sufixo} {formatar_valor(soma)}")
+            linhas.append(f"{self.nome}_count{sufixo} {acumulado}")
+        return linhas
+
+
+LATENCIA_REQUISICAO = Histograma(
+    "http_request_duration_seconds", "Duração das requisições HTTP por rota", ("method", "route", "status"),
+    BALDES_LATENCIA,
+)
+CONSULTAS_REQUISICAO = Histograma(
+    "db_queries_per_request", "Consultas SQL executadas por requisição", ("method", "route"), BALDES_CONSULTAS,
+)
+TEMPO_BANCO_REQUISICAO = Histograma(
+    "db_request_duration_seconds", "Tempo total no banco por requisição", ("method", "route"), BALDES_LATENCIA,
+)
+DURACAO_CONSULTA = Histograma("db_query_duration_seconds", "Duração de cada consulta SQL", (), BALDES_LATENCIA)
+DURACAO_BCRYPT = Histograma(
+    "bcrypt_duration_seconds", "Duração da verificação de senha no /login (inclui a espera pelo pool)", (),
+    BALDES_BCRYPT,
+)
+HISTOGRAMAS = [LATENCIA_REQUISICAO, CONSULTAS_REQUISICAO, TEMPO_BANCO_REQUISICAO, DURACAO_CONSULTA, DURACAO_BCRYPT]
+
+# Valores lidos apenas na coleta: nome -> (tipo, descrição, função)
+MEDIDORES: dict[str, tuple[str, str, Callable[[], float]]] = {}
+
+
+def registrar_medidor(nome: str, tipo: str, descricao: str, funcao: Callable[[], float]):
+    MEDIDORES[nome] = (tipo, descricao, funcao)
+
+
+# Saturação do threadpool usado pelos endpoints síncronos (lida no event loop, durante a coleta)
+registrar_medidor(
+    "threadpool_threads_in_use", "gauge", "Threads do threadpool ocupadas",
+    lambda: anyio.to_thread.current_default_thread_limiter().borrowed_tokens,
+)
+registrar_medidor(
+    "threadpool_threads_limit", "gauge", "Tamanho máximo do threadpool",
+    lambda: anyio.to_thread.current_default_thread_limiter().total_tokens,
+)
+registrar_medidor(
+    "threadpool_tasks_waiting", "gauge", "Chamadas esperando uma thread livre",
+    lambda: anyio.to_thread.current_default_thread_limiter().statistics().tasks_waiting,
+)
+
+
+# Texto completo do /metrics
+def gerar_metricas() -> str:
+    linhas = []
+    for histograma in HISTOGRAMAS:
+        linhas += histograma.exportar()
+    for nome, (tipo, descricao, funcao) in MEDIDORES.items():
+        linhas += [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}", f"{nome} {formatar_valor(funcao())}"]
+    return "\n".join(linhas) + "\n"
+
+
+# Contagem e tempo das consultas da requisição atual ([quantidade, segundos]); chega às threads do threadpool
+# porque o contexto é copiado para elas
+_consultas_requisicao: ContextVar[Optional[list]] = ContextVar("consultas_requisicao", default=None)
+
+
+# Registra os eventos que medem cada consulta executada pelo engine (síncrono ou o sync_engine do assíncrono)
+def instrumentar_engine(engine_sync):
+    # O início fica no contexto de execução, que é criado para cada comando
+    @event.listens_for(engine_sync, "before_cursor_execute")
+    def iniciar_consulta(conn, cursor, statement, parameters, context, executemany):
+        if METRICAS_ATIVAS and context is not None:
+            context.inicio_metricas = time.perf_counter()
+
+    @event.listens_for(engine_sync, "after_cursor_execute")
+    def finalizar_consulta(conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "inicio_metricas", None)
+        if inicio is None:
+            return
+        duracao = time.perf_counter() - inicio
+        DURACAO_CONSULTA.observar(duracao)
+        consultas = _consultas_requisicao.get()
+        if consultas is not None:
+            consultas[0] += 1
+            consultas[1] += duracao
+
+
+# Middleware ASGI (sem o custo do BaseHTTPMiddleware) que mede a latência e as consultas de cada requisição
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICAS_ATIVAS:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]  # Sem resposta (exceção não tratada) conta como erro
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status[0] = mensagem["status"]
+            await send(mensagem)
+
+        consultas = [0, 0.0]
+        token = _consultas_requisicao.set(consultas)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _consultas_requisicao.reset(token)
+            # Rota como declarada (ex.: /tarefas/{id}), para não criar uma série por id
+            rota = scope.get("route")
+            caminho = rota.path if rota is not None else "desconhecida"
+            LATENCIA_REQUISICAO.observar(duracao, scope["method"], caminho, status[0])
+            CONSULTAS_REQUISICAO.observar(consultas[0], scope["method"], caminho)
+            TEMPO_BANCO_REQUISICAO.observar(consultas[1], scope["method"], caminho)
@@ -1,8 +1,8 @@
 from typing import Optional
-from datetime import datetime
-from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+from sqlmodel import SQLModel, Field, Index, func
 from enum import Enum
-from pydantic import ConfigDict  # Substitui a Config antiga
+from pydantic import ConfigDict, field_validator  # ConfigDict substitui a Config antiga
 
 
 # Enum para os valores permitidos do campo "estado"
@@ -25,5 +25,128 @@ class TarefaBase(SQLModel):
 class Tarefa(TarefaBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
+    # Índices usados pelas consultas mais frequentes (criados também na migração 3c1a7e5d9b42)
+    __table_args__ = (
+        Index("ix_tarefa_estado_id", "estado", "id"),  # Filtro por estado + paginação por id
+        Index("ix_tarefa_data_criacao", "data_criacao"),
+        Index("ix_tarefa_titulo", "titulo"),  # Busca por título e GROUP BY titulo
+    )
+
     # Configuração para evitar redefinições da tabela
     model_config = ConfigDict(table_args={"extend_existing": True})
+
+
+# Índice sobre o título normalizado (minúsculas, sem espaços nas pontas) para comparações sem diferenciar caixa
+Index("ix_tarefa_titulo_normalizado", func.lower(func.trim(Tarefa.titulo)))
+
+
+# Tarefa importada da fonte externa (GET de SYNC_URL): id na origem e hash do item na última sincronização
+class TarefaExterna(SQLModel, table=True):
+    id_externo: int = Field(primary_key=True)
+    tarefa_id: int = Field(index=True, unique=True)
+    hash: str
+
+
+# Estado de cada URL (página) da fonte externa: ETag e quantidade de itens da última resposta com corpo
+class SincronizacaoExterna(SQLModel, table=True):
+    url: str = Field(primary_key=True)
+    etag: Optional[str] = None
+    itens: int = 0
+    data: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Modelo da tabela de usuários (a senha fica apenas como hash bcrypt)
+class Usuario(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    username: str = Field(index=True, unique=True)  # Índice usado na busca do /login
+    full_name: Optional[str] = None
+    email: Optional[str] = None
+    hashed_password: str
+    disabled: bool = False
+
+
+# Página de tarefas retornada na paginação por cursor
+class PaginaTarefas(SQLModel):
+    items: list[Tarefa]
+    next_cursor: Optional[str] = None  # None quando não há mais páginas
+
+
+# Item do PATCH /tarefas/batch: id obrigatório e apenas os campos que devem mudar
+class TarefaAtualizacaoLote(SQLModel):
+    id: int
+    titulo: Optional[str] = None
+    descricao: Optional[str] = None
+    estado: Optional[EstadoTarefa] = None
+
+    # data_atualizacao não é aceita: o servidor grava a hora de cada atualização
+    # Campos omitidos não mudam; enviados como null violariam o NOT NULL da tabela
+    @field_validator("titulo", "estado")
+    @classmethod
+    def recusar_nulo(cls, valor):
+        if valor is None:
+            raise ValueError("não pode ser null; omita o campo para mantê-lo")
+        return valor
+
+
+# Resultado de cada item de uma operação em lote
+class ResultadoLote(SQLModel):
+    id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None
+
+
+# Linha recusada no POST /tarefas/import
+class ErroImportacao(SQLModel):
+    linha: int
+    detail: str
+
+
+# Resumo do POST /tarefas/import (erros limitados aos primeiros IMPORT_MAX_ERROS)
+class ResultadoImportacao(SQLModel):
+    aceitas: int
+    rejeitadas: int
+    erros: list[ErroImportacao] = []
+
+
+# Resumo mantido por gatilhos no banco (app/estatisticas.py): quantidade de tarefas em cada estado
+class ResumoEstado(SQLModel, table=True):
+    estado: EstadoTarefa = Field(primary_key=True)
+    total: int = 0
+
+
+# Resumo por dia: tarefas criadas no dia e tarefas cuja última atualização foi no dia
+class ResumoDia(SQLModel, table=True):
+    dia: date = Field(primary_key=True)
+    criadas: int = 0
+    atualizadas: int = 0
+
+
+# Contagens de um dia em GET /tarefas/stats
+class ContagemDiaria(SQLModel):
+    dia: date
+    criadas: int
+    atualizadas: int
+
+
+# Resposta de GET /tarefas/stats
+class EstatisticasTarefas(SQLModel):
+    total: int
+    por_estado: dict[str, int]
+    por_dia: list[ContagemDiaria]
+
+
+# Registro de cada escrita em tarefas, mantido por gatilhos e lido pelo GET /tarefas/changes;
+# AUTOINCREMENT garante ids sempre crescentes, sem reaproveitar os de registros já descartados
+class AlteracaoTarefa(SQLModel, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tarefa_id: int
+    operacao: str  # "criada", "atualizada" ou "removida"
+    data: datetime
+
+
+# Resposta do long-poll de GET /tarefas/changes; "ultimo_id" é o próximo valor de "since"
+class PaginaAlteracoes(SQLModel):
+    items: list[AlteracaoTarefa]
+    ultimo_id: int
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import HTTPException, status
+from app.models import Tarefa
+
+
+# Função para gerar o cursor opaco a partir do último id retornado (e de outras chaves da ordenação, se houver)
+def codificar_cursor(ultimo_id: int, **extras) -> str:
+    dados = json.dumps({"id": ultimo_id, **extras}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def cursor_invalido() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cursor inválido",
+    )
+
+
+# Função para ler todos os dados do cursor recebido do cliente (vazio = primeira página)
+def ler_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        dados = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        int(dados["id"])
+        return dados
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise cursor_invalido()
+
+
+# Função para ler o último id do cursor recebido do cliente (vazio = primeira página)
+def decodificar_cursor(cursor: Optional[str]) -> Optional[int]:
+    dados = ler_cursor(cursor)
+    return None if dados is None else int(dados["id"])
+
+
+# Aplica a paginação por chave (keyset) sobre a consulta: WHERE id > cursor ORDER BY id
+def paginar_por_cursor(query, cursor: Optional[str], limit: int):
+    ultimo_id = decodificar_cursor(cursor)
+    if ultimo_id is not None:
+        query = query.where(Tarefa.id > ultimo_id)
+    # Busca um item a mais para saber se existe uma próxima página
+    return query.order_by(Tarefa.id).limit(limit + 1)
+
+
+# Monta a página de resposta a partir das linhas retornadas por paginar_por_cursor
+def montar_pagina(tarefas: list, limit: int) -> dict:
+    proximo_cursor = None
+    if len(tarefas) > limit:
+        tarefas = tarefas[:limit]
+        proximo_cursor = codificar_cursor(tarefas[-1].id)
+    return {"items": tarefas, "next_cursor": proximo_cursor}
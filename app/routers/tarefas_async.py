@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
+from fastapi.routing import APIRoute
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.alteracoes import difusor
+from app.auth import get_current_user
+from app.cache import (
+    CACHE_TTL_LISTA, CACHE_TTL_TAREFA, NAMESPACE, CoderResposta, cache_agrupado, chave_lista, chave_tarefa,
+    invalidar_tarefa,
+)
+from app.condicional import condicional_lista, consulta_validadores, verificar_condicional_tarefa
+from app.database import async_engine
+from app.estatisticas import consulta_total
+from app.models import EstadoTarefa, Tarefa, TarefaBase, PaginaTarefas
+from app.paginacao import paginar_por_cursor, montar_pagina
+from app.serializacao import campos_projecao, consulta_tarefas, responder_tarefas
+
+# Versões async def dos endpoints de tarefas, usadas quando o DATABASE_URL tem um driver assíncrono
+router = APIRouter()
+
+
+# Dependência de GET /tarefas/{id}: lê só as colunas dos validadores para responder 304 sem montar o objeto
+async def condicional_tarefa(id: int, request: Request, usuario: str = Depends(get_current_user)):
+    async with AsyncSession(async_engine) as session:
+        linha = (await session.exec(consulta_validadores(id))).first()
+    verificar_condicional_tarefa(request, id, linha)
+
+
+# Dependência de GET /tarefas: com total=true, envia em X-Total-Count o total de tarefas do filtro, lido do resumo
+async def cabecalho_total(
+    request: Request,
+    estado: Optional[EstadoTarefa] = Query(None, include_in_schema=False),  # Já documentado no endpoint
+    total: bool = Query(False, description="Envia o total de tarefas do filtro no cabeçalho X-Total-Count"),
+    usuario: str = Depends(get_current_user)
+):
+    if total:
+        async with AsyncSession(async_engine) as session:
+            request.state.total = (await session.exec(consulta_total(estado))).one()
+
+
+# Endpoint para listar todas as tarefas com filtros e paginação (Protegido)
+@router.get(
+    "/tarefas",
+    response_model=Union[list[Tarefa], PaginaTarefas],
+    dependencies=[Depends(condicional_lista), Depends(cabecalho_total)],
+)
+@cache_agrupado(expire=CACHE_TTL_LISTA, namespace=NAMESPACE, key_builder=chave_lista, coder=CoderResposta)  # Invalidado a cada escrita
+async def listar_tarefas(
+    estado: Optional[str] = Query(
+        None,
+        pattern="^(pendente|em andamento|concluída)$",
+        description="Filtrar tarefas pelo estado ('pendente', 'em andamento', 'concluída')"
+    ),
+    skip: int = Query(0, ge=0, description="Número de tarefas a pular para paginação"),
+    limit: int = Query(10, ge=1, le=100, description="Número máximo de tarefas a retornar (máximo: 100)"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Ativa a paginação por cursor (envie vazio na primeira página e depois o 'next_cursor' recebido)"
+    ),
+    campos: Optional[tuple] = Depends(campos_projecao),  # Parâmetro fields=; entra na chave do cache já normalizado
+    usuario: str = Depends(get_current_user)
+):
+    """Lista tarefas com suporte a filtros por estado, paginação (skip/limit ou cursor) e seleção de campos."""
+    async with AsyncSession(async_engine) as session:
+        query = consulta_tarefas(campos)
+
+        if estado:
+            query = query.where(Tarefa.estado == estado)
+
+        if cursor is not None:
+            tarefas = (await session.exec(paginar_por_cursor(query, cursor, limit))).all()
+            return responder_tarefas(montar_pagina(tarefas, limit), campos)
+
+        tarefas = (await session.exec(query.offset(skip).limit(limit))).all()
+        return responder_tarefas(tarefas, campos)
+
+# Endpoint para criar uma nova tarefa (Protegido)
+@router.post("/tarefas", response_model=Tarefa, status_code=status.HTTP_201_CREATED)
+async def criar_tarefa(tarefa: TarefaBase, usuario: str = Depends(get_current_user)):
+    async with AsyncSession(async_engine) as session:
+        nova_tarefa = Tarefa(
+            titulo=tarefa.titulo,
+            descricao=tarefa.descricao,
+            estado=tarefa.estado,
+            data_criacao=tarefa.data_criacao or datetime.utcnow(),
+            data_atualizacao=tarefa.data_atualizacao or datetime.utcnow()
+        )
+        session.add(nova_tarefa)
+        await session.commit()
+        await session.refresh(nova_tarefa)
+        await invalidar_tarefa()  # Novas tarefas alteram as listagens
+        difusor.sinalizar()  # Acorda os assinantes de GET /tarefas/changes
+        return nova_tarefa
+
+# Endpoint para obter uma tarefa pelo ID (Protegido)
+@router.get("/tarefas/{id}", response_model=Tarefa, dependencies=[Depends(condicional_tarefa)])
+@cache_agrupado(expire=CACHE_TTL_TAREFA, namespace=NAMESPACE, key_builder=chave_tarefa)  # Invalidado a cada escrita
+async def obter_tarefa(id: int, usuario: str = Depends(get_current_user)):
+    async with AsyncSession(async_engine) as session:
+        tarefa = await session.get(Tarefa, id)
+        if not tarefa:
+            raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+        return tarefa
+
+# Endpoint para atualizar uma tarefa existente (Protegido)
+@router.put("/tarefas/{id}", response_model=Tarefa)
+async def atualizar_tarefa(id: int, tarefa_atualizada: TarefaBase, usuario: str = Depends(get_current_user)):
+    async with AsyncSession(async_engine) as session:
+        tarefa = await session.get(Tarefa, id)
+        if not tarefa:
+            raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+
+        tarefa.titulo = tarefa_atualizada.titulo
+        tarefa.descricao = tarefa_atualizada.descricao
+        tarefa.estado = tarefa_atualizada.estado
+        tarefa.data_atualizacao = datetime.utcnow()  # Sempre do servidor: base do Last-Modified
+
+        session.add(tarefa)
+        await session.commit()
+        await session.refresh(tarefa)
+        await invalidar_tarefa(id)
+        difusor.sinalizar()
+        return tarefa
+
+# Endpoint para deletar uma tarefa existente (Protegido)
+@router.delete("/tarefas/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def deletar_tarefa(id: int, usuario: str = Depends(get_current_user)):
+    async with AsyncSession(async_engine) as session:
+        tarefa = await session.get(Tarefa, id)
+        if not tarefa:
+            raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+
+        await session.delete(tarefa)
+        await session.commit()
+        await invalidar_tarefa(id)
+        difusor.sinalizar()
+        return
+
+
+# Substitui, na aplicação, as rotas síncronas de mesmo caminho e método pelas versões deste router
+def registrar(app: FastAPI):
+    rotas_async = {(rota.path, frozenset(rota.methods)): rota for rota in router.routes}
+    app.router.routes[:] = [
+        rotas_async.get((rota.path, frozenset(rota.methods)), rota) if isinstance(rota, APIRoute) else rota
+        for rota in app.router.routes
+    ]
@@ -0,0 +1,53 @@
+import os
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlmodel import select
+from app.models import Tarefa
+
+# Modo rápido das listagens: seleciona só as colunas (tuplas, sem objetos ORM) e serializa com orjson,
+# sem a revalidação pelo response_model. Desative com SERIALIZACAO_RAPIDA=false para usar o caminho padrão
+SERIALIZACAO_RAPIDA = os.getenv("SERIALIZACAO_RAPIDA", "true").lower() == "true"
+
+# Campos na mesma ordem em que o response_model os serializa
+CAMPOS_TAREFA = list(Tarefa.model_fields)
+
+
+# Dependência do parâmetro fields= (ex.: fields=titulo,estado): campos válidos, sem repetição, na ordem do modelo
+def campos_projecao(
+    fields: Optional[str] = Query(
+        None,
+        description="Campos retornados, separados por vírgula (ex.: titulo,estado); o id é sempre incluído"
+    )
+) -> Optional[tuple]:
+    if not fields:
+        return None
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    invalidos = pedidos - set(CAMPOS_TAREFA)
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos em fields: {', '.join(sorted(invalidos))}",
+        )
+    pedidos.add("id")  # Usado pela paginação por cursor e para identificar os itens
+    return tuple(campo for campo in CAMPOS_TAREFA if campo in pedidos)
+
+
+# Base da consulta das listagens: só as colunas pedidas (ou todas no modo rápido), objetos Tarefa no modo padrão
+def consulta_tarefas(campos: Optional[tuple] = None):
+    if campos or SERIALIZACAO_RAPIDA:
+        return select(*(getattr(Tarefa, campo) for campo in campos or CAMPOS_TAREFA))
+    return select(Tarefa)
+
+
+# Converte o resultado da listagem (lista ou página do cursor) na resposta final
+def responder_tarefas(conteudo, campos: Optional[tuple] = None):
+    if not (campos or SERIALIZACAO_RAPIDA):
+        return conteudo  # O FastAPI valida e serializa pelo response_model
+    # O orjson serializa datetime e Enum diretamente, no mesmo formato do response_model;
+    # as projeções parciais não passariam pela validação do modelo Tarefa
+    if isinstance(conteudo, dict):
+        conteudo = {**conteudo, "items": [linha._asdict() for linha in conteudo["items"]]}
+    else:
+        conteudo = [linha._asdict() for linha in conteudo]
+    return ORJSONResponse(conteudo)
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+from typing import Optional
+import httpx
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, delete, exists, insert, select, update
+from app.alteracoes import difusor
+from app.cache import invalidar_tarefas
+from app.importacao import TAMANHO_LOTE, converter_tarefa_externa
+from app.models import SincronizacaoExterna, Tarefa, TarefaExterna
+
+# Fonte externa (array JSON de todos no formato do JSON Placeholder) e intervalo entre sincronizações
+SYNC_URL = os.getenv("SYNC_URL", "https://jsonplaceholder.typicode.com/todos")
+SYNC_INTERVALO = float(os.getenv("SYNC_INTERVALO", "0"))  # Segundos; 0 = sincronização periódica desligada
+# Itens por página (parâmetros _page e _limit); 0 = a fonte devolve tudo em uma única resposta
+SYNC_TAMANHO_PAGINA = int(os.getenv("SYNC_TAMANHO_PAGINA", "0"))
+SYNC_CONCORRENCIA = int(os.getenv("SYNC_CONCORRENCIA", "4"))  # Páginas baixadas ao mesmo tempo
+SYNC_TIMEOUT = float(os.getenv("SYNC_TIMEOUT", "30"))  # Segundos por requisição
+
+logger = logging.getLogger(__name__)
+
+
+# Hash do item como recebido da fonte (chaves ordenadas): muda só quando o conteúdo na origem muda
+def hash_item(item: dict) -> str:
+    return hashlib.blake2b(orjson.dumps(item, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+# URL de uma página da fonte (numeradas a partir de 1)
+def url_pagina(url: str, pagina: int, tamanho_pagina: int) -> str:
+    return str(httpx.URL(url).copy_merge_params({"_page": pagina, "_limit": tamanho_pagina}))
+
+
+# Cliente HTTP da sincronização: conexões reaproveitadas (keep-alive) entre páginas e entre execuções
+def criar_cliente(concorrencia: int = SYNC_CONCORRENCIA, timeout: float = SYNC_TIMEOUT) -> httpx.AsyncClient:
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    return httpx.AsyncClient(limits=limites, timeout=timeout, follow_redirects=True)
+
+
+# ETag e quantidade de itens guardados de cada URL já sincronizada
+def ler_estados(engine) -> dict:
+    with Session(engine) as session:
+        return {
+            url: (etag, itens)
+            for url, etag, itens in session.exec(
+                select(SincronizacaoExterna.url, SincronizacaoExterna.etag, SincronizacaoExterna.itens)
+            )
+        }
+
+
+# Aplica um lote de itens da fonte: só as tarefas novas ou com hash diferente são escritas.
+# Os ids das tarefas escritas são acrescentados a "alteradas" (para invalidar o cache de cada uma)
+def aplicar_itens(session: Session, itens: list[dict], alteradas: Optional[set] = None) -> dict:
+    por_id = {item["id"]: item for item in itens}
+    hashes = {id_externo: hash_item(item) for id_externo, item in por_id.items()}
+    conhecidas = {
+        id_externo: (tarefa_id, hash)
+        for id_externo, tarefa_id, hash in session.exec(
+            select(TarefaExterna.id_externo, TarefaExterna.tarefa_id, TarefaExterna.hash)
+            .where(TarefaExterna.id_externo.in_(hashes))
+        )
+    }
+    mudaram = [i for i, hash in hashes.items() if i not in conhecidas or conhecidas[i][1] != hash]
+    # Tarefas removidas localmente voltam a ser criadas quando o item muda na origem
+    existentes = set(session.exec(
+        select(Tarefa.id).where(Tarefa.id.in_([conhecidas[i][0] for i in mudaram if i in conhecidas]))
+    ))
+    destino = {i: conhecidas[i][0] for i in mudaram if i in conhecidas and conhecidas[i][0] in existentes}
+
+    linhas = {i: converter_tarefa_externa(por_id[i]) for i in mudaram}
+    # Itens ainda sem vínculo assumem a tarefa de mesmo título sem vínculo (importada por buscar_tarefas_externas)
+    por_titulo = {linhas[i]["titulo"]: i for i in mudaram if i not in destino}
+    if por_titulo:
+        sem_vinculo = ~exists().where(TarefaExterna.tarefa_id == Tarefa.id)
+        for tarefa_id, titulo in session.exec(
+            select(Tarefa.id, Tarefa.titulo).where(Tarefa.titulo.in_(por_titulo), sem_vinculo).order_by(Tarefa.id)
+        ):
+            if titulo in por_titulo:
+                destino[por_titulo.pop(titulo)] = tarefa_id
+    novas = [i for i in mudaram if i not in destino]
+
+    if destino:
+        # A descrição e a data de criação da tarefa local são mantidas
+        session.execute(update(Tarefa), [
+            {"id": tarefa_id, **{campo: linhas[i][campo] for campo in ("titulo", "estado", "data_atualizacao")}}
+            for i, tarefa_id in destino.items()
+        ])
+    if novas:
+        ids = session.scalars(
+            insert(Tarefa).returning(Tarefa.id, sort_by_parameter_order=True), [linhas[i] for i in novas]
+        ).all()
+        destino.update(zip(novas, ids))
+
+    if alteradas is not None:
+        alteradas.update(destino.values())
+    vinculos = [{"id_externo": i, "tarefa_id": destino[i], "hash": hashes[i]} for i in mudaram]
+    if vinculos:
+        session.execute(delete(TarefaExterna).where(TarefaExterna.id_externo.in_(mudaram)))
+        session.execute(insert(TarefaExterna), vinculos)
+    return {
+        "inseridas": len(novas), "atualizadas": len(mudaram) - len(novas), "inalteradas": len(hashes) - len(mudaram)
+    }
+
+
+# Aplica uma resposta (página) e guarda o ETag dela na mesma transação
+def aplicar_pagina(
+    engine, url: str, etag: Optional[str], itens: list[dict], tamanho_lote: int = TAMANHO_LOTE,
+    alteradas: Optional[set] = None,
+) -> dict:
+    contagens = {"inseridas": 0, "atualizadas": 0, "inalteradas": 0}
+    with Session(engine) as session:
+        for inicio in range(0, len(itens), tamanho_lote):
+            for nome, valor in aplicar_itens(session, itens[inicio:inicio + tamanho_lote], alteradas).items():
+                contagens[nome] += valor
+        session.execute(delete(SincronizacaoExterna).where(SincronizacaoExterna.url == url))
+        session.add(SincronizacaoExterna(url=url, etag=etag, itens=len(itens)))
+        session.commit()
+    return contagens
+
+
+# Requisição condicional: 304 quando a URL não mudou desde o ETag guardado
+async def baixar(cliente: httpx.AsyncClient, url: str, etag: Optional[str]) -> httpx.Response:
+    resposta = await cliente.get(url, headers={"If-None-Match": etag} if etag else None)
+    if resposta.status_code != 304:
+        resposta.raise_for_status()
+    return resposta
+
+
+# Uma sincronização completa: baixa as páginas (até "concorrencia" de cada vez) e aplica as que mudaram;
+# os ids das tarefas escritas vão para "alteradas", quando informado
+async def sincronizar(
+    engine,
+    cliente: httpx.AsyncClient,
+    url: str = SYNC_URL,
+    tamanho_pagina: int = SYNC_TAMANHO_PAGINA,
+    concorrencia: int = SYNC_CONCORRENCIA,
+    alteradas: Optional[set] = None,
+) -> dict:
+    estados = await run_in_threadpool(ler_estados, engine)
+    resultado = {"paginas": 0, "nao_modificadas": 0, "inseridas": 0, "atualizadas": 0, "inalteradas": 0}
+    if tamanho_pagina:
+        urls = (url_pagina(url, pagina, tamanho_pagina) for pagina in itertools.count(1))
+    else:
+        urls, concorrencia = iter([url]), 1
+    while True:
+        janela = list(itertools.islice(urls, concorrencia))
+        if not janela:
+            return resultado
+        respostas = await asyncio.gather(*(baixar(cliente, u, estados.get(u, (None, 0))[0]) for u in janela))
+        fim = not tamanho_pagina
+        # O banco recebe uma página por vez, na ordem (o SQLite aceita um escritor por vez)
+        for u, resposta in zip(janela, respostas):
+            resultado["paginas"] += 1
+            if resposta.status_code == 304:
+                resultado["nao_modificadas"] += 1
+                quantidade = estados.get(u, (None, 0))[1]
+            else:
+                itens = orjson.loads(resposta.content)
+                quantidade = len(itens)
+                contagens = await run_in_threadpool(
+                    aplicar_pagina, engine, u, resposta.headers.get("etag"), itens, alteradas=alteradas
+                )
+                for nome, valor in contagens.items():
+                    resultado[nome] += valor
+            fim = fim or quantidade < tamanho_pagina  # Página incompleta: é a última
+        if fim:
+            return resultado
+
+
+# Uma sincronização avulsa com um cliente próprio (python -m app.main)
+async def sincronizar_uma_vez(engine, **opcoes) -> dict:
+    async with criar_cliente() as cliente:
+        return await sincronizar(engine, cliente, **opcoes)
+
+
+_tarefa_sincronizacao: Optional[asyncio.Task] = None
+
+
+# Sincroniza a cada "intervalo" segundos com um único cliente HTTP; ao mudar algo, invalida no cache
+# as tarefas escritas e as listagens e avisa o feed
+async def sincronizar_periodicamente(engine, intervalo: float = SYNC_INTERVALO, **opcoes):
+    async with criar_cliente() as cliente:
+        while True:
+            alteradas = set()
+            try:
+                resultado = await sincronizar(engine, cliente, alteradas=alteradas, **opcoes)
+                if resultado["inseridas"] or resultado["atualizadas"]:
+                    logger.info("Sincronização externa: %s", resultado)
+            except (httpx.HTTPError, SQLAlchemyError, ValueError, KeyError, TypeError):
+                # Fonte fora do ar, banco ocupado ou resposta inesperada: tenta de novo no próximo intervalo
+                logger.exception("Falha na sincronização externa")
+            if alteradas:  # Também as páginas gravadas antes de uma falha
+                await invalidar_tarefas(alteradas)
+                difusor.sinalizar()
+            await asyncio.sleep(intervalo)
+
+
+# Inicia a sincronização periódica (chamada no lifespan; não faz nada com SYNC_INTERVALO=0)
+def iniciar_sincronizacao(engine, intervalo: float = SYNC_INTERVALO, **opcoes):
+    global _tarefa_sincronizacao
+    if intervalo > 0 and _tarefa_sincronizacao is None:
+        _tarefa_sincronizacao = asyncio.get_running_loop().create_task(
+            sincronizar_periodicamente(engine, intervalo, **opcoes)
+        )
+
+
+def encerrar_sincronizacao():
+    global _tarefa_sincronizacao
+    if _tarefa_sincronizacao is not None:
+        _tarefa_sincronizacao.cancel()
+        _tarefa_sincronizacao = None
@@ -0,0 +1,6 @@
+from app.cache import configurar_cache
+from app.database import init_db
+
+# Prepara o banco e o cache como no lifespan da aplicação (os FastAPICache.init dos módulos de teste viram no-op)
+init_db()
+configurar_cache()
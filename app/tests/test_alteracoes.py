@@ -0,0 +1,136 @@
+import asyncio
+import json
+import httpx
+from fastapi.testclient import TestClient
+from app.alteracoes import descartar_alteracoes_antigas
+from app.auth import criar_token_acesso
+from app.database import engine
+from app.main import app
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+NOVA_TAREFA = {"titulo": "Acompanhar alterações", "estado": "pendente"}
+
+
+def posicao_atual() -> int:
+    return client.get("/tarefas/changes", headers=headers).json()["ultimo_id"]
+
+
+# Lê eventos do SSE chamando a aplicação ASGI diretamente (o TestClient só retorna depois do fim do corpo)
+async def ler_eventos_sse(url: str, quantidade: int, ao_conectar=None, cabecalhos: dict = None) -> list[dict]:
+    desconectar = asyncio.Event()
+    corpo, eventos, tarefas = "", [], []
+    recebido = False
+
+    async def receive():
+        nonlocal recebido
+        if not recebido:
+            recebido = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await desconectar.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        nonlocal corpo
+        if mensagem["type"] == "http.response.start":
+            assert mensagem["status"] == 200
+            if ao_conectar is not None:
+                tarefas.append(asyncio.get_running_loop().create_task(ao_conectar()))
+        elif mensagem["type"] == "http.response.body":
+            corpo += mensagem.get("body", b"").decode()
+            while "\n\n" in corpo:
+                bloco, corpo = corpo.split("\n\n", 1)
+                campos = dict(linha.split(": ", 1) for linha in bloco.split("\n") if not linha.startswith(":"))
+                if "data" in campos:
+                    eventos.append({**campos, "data": json.loads(campos["data"])})
+            if len(eventos) >= quantidade:
+                desconectar.set()
+
+    todos = {**headers, "accept": "text/event-stream", **(cabecalhos or {})}
+    caminho, _, consulta = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": caminho, "raw_path": caminho.encode(), "query_string": consulta.encode(), "root_path": "",
+        "headers": [(nome.lower().encode(), valor.encode()) for nome, valor in todos.items()],
+        "client": ("teste", 1), "server": ("teste", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 10)
+    await asyncio.gather(*tarefas)
+    return eventos
+
+
+
+# Teste para o long-poll: criação, atualização e remoção aparecem em ordem a partir do "since"
+def test_long_poll_retorna_alteracoes_em_ordem():
+    inicio = posicao_atual()
+    tarefa = client.post("/tarefas", json=NOVA_TAREFA, headers=headers).json()
+    client.put(f"/tarefas/{tarefa['id']}", json={**NOVA_TAREFA, "estado": "concluída"}, headers=headers)
+    client.delete(f"/tarefas/{tarefa['id']}", headers=headers)
+
+    resposta = client.get(f"/tarefas/changes?since={inicio}&timeout=0", headers=headers)
+    assert resposta.status_code == 200
+    pagina = resposta.json()
+    da_tarefa = [item for item in pagina["items"] if item["tarefa_id"] == tarefa["id"]]
+    assert [item["operacao"] for item in da_tarefa] == ["criada", "atualizada", "removida"]
+    assert [item["id"] for item in pagina["items"]] == sorted(item["id"] for item in pagina["items"])
+    assert pagina["ultimo_id"] == pagina["items"][-1]["id"]
+
+    # Já em dia: sem espera, retorna vazio e mantém a posição
+    vazia = client.get(f"/tarefas/changes?since={pagina['ultimo_id']}&timeout=0", headers=headers).json()
+    assert vazia == {"items": [], "ultimo_id": pagina["ultimo_id"]}
+    assert client.get("/tarefas/changes?since=0").status_code == 401
+
+
+
+# Teste para garantir que um long-poll em espera é acordado pela escrita, sem esperar o timeout
+def test_long_poll_acordado_pela_escrita():
+    async def cenario():
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste", headers=headers) as cliente:
+            inicio = (await cliente.get("/tarefas/changes")).json()["ultimo_id"]
+            espera = asyncio.create_task(cliente.get(f"/tarefas/changes?since={inicio}&timeout=30"))
+            await asyncio.sleep(0.2)
+            assert not espera.done()
+            criada = (await cliente.post("/tarefas", json=NOVA_TAREFA)).json()
+            resposta = await asyncio.wait_for(espera, 5)
+        return criada, resposta.json()
+
+    criada, pagina = asyncio.run(cenario())
+    assert [(item["tarefa_id"], item["operacao"]) for item in pagina["items"]] == [(criada["id"], "criada")]
+
+
+
+# Teste para o SSE: eventos com id (retomada pelo Last-Event-ID) e o tipo da operação
+def test_sse_envia_e_retoma_alteracoes():
+    inicio = posicao_atual()
+    ids = []
+
+    async def criar_duas():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste",
+                                     headers=headers) as cliente:
+            for _ in range(2):
+                ids.append((await cliente.post("/tarefas", json=NOVA_TAREFA)).json()["id"])
+
+    eventos = asyncio.run(ler_eventos_sse(f"/tarefas/changes?since={inicio}", 2, ao_conectar=criar_duas))
+    assert [evento["event"] for evento in eventos] == ["criada", "criada"]
+    assert [evento["data"]["tarefa_id"] for evento in eventos] == ids
+    assert [int(evento["id"]) for evento in eventos] == [evento["data"]["id"] for evento in eventos]
+
+    # Reconexão do EventSource: começa depois do último id recebido
+    client.delete(f"/tarefas/{ids[0]}", headers=headers)
+    retomados = asyncio.run(ler_eventos_sse("/tarefas/changes", 1, cabecalhos={"last-event-id": eventos[-1]["id"]}))
+    assert retomados[0]["event"] == "removida"
+    assert int(retomados[0]["id"]) > int(eventos[-1]["id"])
+    assert client.get("/tarefas/changes", headers={**headers, "last-event-id": "abc"}).status_code == 400
+
+
+
+# Teste para a retomada de uma posição já descartada do log: 410 para o cliente recarregar as tarefas
+def test_posicao_descartada_retorna_410():
+    client.post("/tarefas", json=NOVA_TAREFA, headers=headers)
+    client.post("/tarefas", json=NOVA_TAREFA, headers=headers)
+    ultimo = posicao_atual()
+    descartar_alteracoes_antigas(engine, ultimo, retencao=1)  # Mantém apenas a última alteração
+
+    assert client.get("/tarefas/changes?since=0&timeout=0", headers=headers).status_code == 410
+    assert client.get(f"/tarefas/changes?since={ultimo - 1}&timeout=0", headers=headers).json()["ultimo_id"] == ultimo
@@ -0,0 +1,64 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine
+from app.auth import criar_token_acesso
+from app.routers import tarefas_async
+
+
+# Inicializa o cache para os testes
+FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+
+
+
+# Teste do CRUD completo usando os endpoints async def com aiosqlite
+def test_crud_modo_async(tmp_path, monkeypatch):
+    caminho = tmp_path / "async.db"
+    SQLModel.metadata.create_all(create_engine(f"sqlite:///{caminho}"))
+    monkeypatch.setattr(tarefas_async, "async_engine", create_async_engine(f"sqlite+aiosqlite:///{caminho}"))
+
+    app = FastAPI()
+    app.include_router(tarefas_async.router)
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/tarefas",
+            json={"titulo": "Async", "descricao": "Tarefa async", "estado": "pendente"},
+            headers=headers
+        )
+        assert response.status_code == 201
+        tarefa_id = response.json()["id"]
+
+        response = client.put(
+            f"/tarefas/{tarefa_id}",
+            json={"titulo": "Async atualizada", "estado": "concluída"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["estado"] == "concluída"
+
+        response = client.get("/tarefas?estado=concluída&cursor=", headers=headers)
+        assert response.status_code == 200
+        assert [t["titulo"] for t in response.json()["items"]] == ["Async atualizada"]
+
+        assert client.get(f"/tarefas/{tarefa_id}", headers=headers).status_code == 200
+        assert client.get(f"/tarefas/{tarefa_id}", headers={**headers, "If-None-Match": "*"}).status_code == 304
+        assert client.delete(f"/tarefas/{tarefa_id}", headers=headers).status_code == 204
+        assert client.get(f"/tarefas/{tarefa_id + 1}", headers=headers).status_code == 404
+
+
+
+# Teste para a troca das rotas síncronas pelas assíncronas
+def test_registrar_substitui_rotas():
+    app = FastAPI()
+
+    @app.get("/tarefas/{id}")
+    def obter_tarefa(id: int):
+        return {}
+
+    tarefas_async.registrar(app)
+    rota = next(r for r in app.router.routes if getattr(r, "path", None) == "/tarefas/{id}")
+    assert rota.endpoint is tarefas_async.obter_tarefa
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from jose import jwt
+from app import auth
+from app.auth import ALGORITHM, criar_token_acesso, validar_token_acesso_cache
+
+
+
+# Teste para verificar se o mesmo token só tem a assinatura verificada uma vez
+def test_token_validado_uma_vez(monkeypatch):
+    chamadas = []
+    validar_original = auth.validar_token_acesso
+    monkeypatch.setattr(auth, "validar_token_acesso", lambda token: chamadas.append(token) or validar_original(token))
+
+    token = criar_token_acesso({"sub": "usuario-cache"})
+    for _ in range(5):
+        assert validar_token_acesso_cache(token)["sub"] == "usuario-cache"
+    assert len(chamadas) == 1
+
+
+
+# Teste para verificar se a entrada do cache não sobrevive à expiração do token
+def test_token_cache_respeita_exp(monkeypatch):
+    token = criar_token_acesso({"sub": "usuario-exp"})
+    assert validar_token_acesso_cache(token) is not None
+
+    exp = jwt.get_unverified_claims(token)["exp"]
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    monkeypatch.setattr(auth, "validar_token_acesso", lambda token: None)  # O jwt.decode rejeitaria o token
+    assert validar_token_acesso_cache(token) is None
+
+
+
+# Teste para tokens inválidos, que não entram no cache
+def test_token_invalido_nao_e_cacheado():
+    token = jwt.encode(
+        {"sub": "invasor", "exp": datetime.utcnow() + timedelta(minutes=5)}, "outra-chave", algorithm=ALGORITHM
+    )
+    assert validar_token_acesso_cache(token) is None
+    assert validar_token_acesso_cache(token) is None
+
+
+
+# Teste para garantir que importar a aplicação não cria o contexto do bcrypt nem calcula hashes
+def test_importacao_sem_bcrypt():
+    codigo = (
+        "import app.main, app.auth; "
+        "assert app.auth.obter_contexto_senhas.cache_info().currsize == 0"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
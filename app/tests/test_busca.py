@@ -0,0 +1,68 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import insert
+from app.auth import criar_token_acesso
+from app.main import app
+from app.models import Tarefa
+from app.tests.test_indices import criar_banco_migrado
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+
+def buscar(**params) -> list:
+    return client.get("/tarefas/search", params=params, headers=headers).json()["items"]
+
+
+
+# Teste para a busca por relevância: o título pesa mais que a descrição e acentos são ignorados
+def test_busca_ordenada_por_relevancia():
+    na_descricao = client.post("/tarefas", json={"titulo": "Planilha", "descricao": "Revisar o xilofone antigo",
+                                                 "estado": "pendente"}, headers=headers).json()
+    no_titulo = client.post("/tarefas", json={"titulo": "Xilofone novo", "estado": "concluída"},
+                            headers=headers).json()
+
+    assert [item["id"] for item in buscar(q="xilofone")] == [no_titulo["id"], na_descricao["id"]]
+    assert [item["id"] for item in buscar(q="XILOFONE antigo")] == [na_descricao["id"]]
+    assert [item["id"] for item in buscar(q="xilofone", estado="pendente")] == [na_descricao["id"]]
+    assert buscar(q="xilofone")[0] == no_titulo  # Mesmos campos da tarefa, sem o rank
+
+    acentuada = client.post("/tarefas", json={"titulo": "Relatório trimestral de zênite", "estado": "pendente"},
+                            headers=headers).json()
+    assert [item["id"] for item in buscar(q="zenite")] == [acentuada["id"]]
+    # Aspas e operadores do FTS5 no texto do usuário não quebram a consulta
+    assert [item["id"] for item in buscar(q='"zênite*" -(')] == [acentuada["id"]]
+    assert client.get("/tarefas/search?q=%21%21", headers=headers).status_code == 400
+
+
+
+# Teste para garantir que o índice acompanha atualizações e remoções e que os cursores percorrem todos os resultados
+def test_busca_sincronizada_e_paginada():
+    tarefa = {"titulo": "Quasar", "descricao": "Observar o quasar", "estado": "pendente"}
+    ids = [item["id"] for item in client.post("/tarefas/batch", json=[tarefa] * 7, headers=headers).json()]
+
+    vistos, cursor = [], None
+    while True:
+        params = {"q": "quasar", "limit": 3, **({"cursor": cursor} if cursor else {})}
+        pagina = client.get("/tarefas/search", params=params, headers=headers).json()
+        vistos += [item["id"] for item in pagina["items"]]
+        cursor = pagina["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(vistos) == ids
+
+    client.put(f"/tarefas/{ids[0]}", json={**tarefa, "titulo": "Pulsar", "descricao": None}, headers=headers)
+    client.request("DELETE", "/tarefas/batch", json=ids[1:3], headers=headers)
+    assert sorted(item["id"] for item in buscar(q="quasar", limit=100)) == ids[3:]
+    assert [item["id"] for item in buscar(q="pulsar")] == [ids[0]]
+    assert client.get("/tarefas/search?q=quasar&cursor=abc", headers=headers).status_code == 400
+
+
+
+# Teste para a migração: o índice é criado e preenchido com as tarefas que já existiam
+def test_migracao_cria_indice_de_busca(tmp_path):
+    migrado = criar_banco_migrado(tmp_path)
+    with migrado.begin() as conn:
+        conn.execute(insert(Tarefa), [{"titulo": "Nebulosa", "estado": "pendente"}])
+        encontrados = conn.execute(text("SELECT rowid FROM tarefa_fts WHERE tarefa_fts MATCH 'nebulosa'")).all()
+    assert len(encontrados) == 1
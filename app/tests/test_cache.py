@@ -0,0 +1,186 @@
+import asyncio
+import time
+from uuid import uuid4
+import httpx
+import pytest
+from sqlalchemy import event
+from app.auth import criar_token_acesso
+from app.cache import AGRUPAMENTO, BackendLRU, cache_agrupado, invalidar_tarefas
+from app.database import engine
+from app.main import app
+
+
+
+# Teste para o descarte da entrada usada há mais tempo ao atingir o limite de entradas
+def test_lru_limite_de_entradas():
+    async def cenario():
+        backend = BackendLRU(max_entradas=2, max_bytes=10_000)
+        await backend.set("a", "1", 60)
+        await backend.set("b", "2", 60)
+        await backend.get("a")  # "a" passa a ser a mais recente
+        await backend.set("c", "3", 60)
+        return backend, await backend.get("a"), await backend.get("b"), await backend.get("c")
+
+    backend, a, b, c = asyncio.run(cenario())
+    assert (a, b, c) == ("1", None, "3")
+    assert backend.remocoes == 1
+    assert backend.entradas == 2
+
+
+
+# Teste para o limite de bytes e para valores maiores que o cache inteiro
+def test_lru_limite_de_bytes():
+    async def cenario():
+        backend = BackendLRU(max_entradas=100, max_bytes=30)
+        for chave in ("k1", "k2", "k3"):
+            await backend.set(chave, "x" * 8, 60)  # 10 bytes cada (chave + valor)
+        await backend.set("k4", "x" * 8, 60)
+        await backend.set("grande", "x" * 100, 60)
+        return backend, [await backend.get(chave) for chave in ("k1", "k2", "k3", "k4", "grande")]
+
+    backend, valores = asyncio.run(cenario())
+    assert valores == [None, "x" * 8, "x" * 8, "x" * 8, None]
+    assert backend.bytes <= 30
+
+
+
+# Teste para a expiração das entradas
+def test_lru_expiracao(monkeypatch):
+    relogio = [100.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: relogio[0])
+
+    async def cenario():
+        backend = BackendLRU()
+        await backend.set("chave", "valor", 10)
+        antes = await backend.get_with_ttl("chave")
+        relogio[0] += 11
+        return antes, await backend.get_with_ttl("chave")
+
+    antes, depois = asyncio.run(cenario())
+    assert antes == (10, "valor")
+    assert depois == (0, None)
+
+
+
+# Teste para o cache compartilhado: dois workers enxergam as mesmas entradas no Redis
+def test_backend_redis_compartilhado():
+    fakeredis = pytest.importorskip("fakeredis")
+    from fastapi_cache.backends.redis import RedisBackend
+
+    async def cenario():
+        servidor = fakeredis.FakeServer()
+        worker_1 = RedisBackend(fakeredis.FakeAsyncRedis(server=servidor))
+        worker_2 = RedisBackend(fakeredis.FakeAsyncRedis(server=servidor))
+        await worker_1.set("fastapi-cache:tarefas:tarefa:1:v1", "{}", 60)
+        return await worker_2.get_with_ttl("fastapi-cache:tarefas:tarefa:1:v1")
+
+    ttl, valor = asyncio.run(cenario())
+    assert valor == b"{}"
+    assert 0 < ttl <= 60
+
+
+
+# Teste para a consulta única (single-flight): falhas simultâneas na mesma chave executam a função uma vez
+def test_falhas_simultaneas_executam_uma_consulta():
+    execucoes = []
+
+    @cache_agrupado(expire=60, namespace="teste", key_builder=lambda func, namespace, **_: f"{namespace}:{uuid}")
+    async def consultar() -> dict:
+        execucoes.append(1)
+        await asyncio.sleep(0.05)
+        return {"execucao": len(execucoes)}
+
+    uuid = uuid4().hex
+    antes = AGRUPAMENTO["agrupadas"]
+
+    async def cenario():
+        return await asyncio.gather(*(consultar() for _ in range(20)))
+
+    resultados = asyncio.run(cenario())
+    assert len(execucoes) == 1
+    assert resultados == [{"execucao": 1}] * 20
+    assert AGRUPAMENTO["agrupadas"] == antes + 19
+    assert asyncio.run(consultar()) == {"execucao": 1}  # Já gravado no cache
+
+
+
+# Teste para o erro da consulta única: chega a todos que aguardavam e a próxima falha tenta de novo
+def test_erro_da_consulta_chega_a_todos():
+    execucoes = []
+    chave = uuid4().hex
+
+    @cache_agrupado(expire=60, key_builder=lambda func, namespace, **_: chave)
+    async def consultar() -> dict:
+        execucoes.append(1)
+        await asyncio.sleep(0.05)
+        if len(execucoes) == 1:
+            raise ValueError("banco indisponível")
+        return {"ok": True}
+
+    async def cenario():
+        return await asyncio.gather(*(consultar() for _ in range(5)), return_exceptions=True)
+
+    resultados = asyncio.run(cenario())
+    assert len(execucoes) == 1
+    assert all(isinstance(resultado, ValueError) for resultado in resultados)
+    assert asyncio.run(consultar()) == {"ok": True}
+    assert len(execucoes) == 2
+
+
+
+# Teste para o stale-while-revalidate: a entrada vencida é servida e renovada uma única vez em segundo plano
+def test_entrada_vencida_servida_durante_renovacao(monkeypatch):
+    # Relógio adiantável sem pará-lo (o event loop usa o mesmo time.monotonic)
+    monotonic, desvio = time.monotonic, [0.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: monotonic() + desvio[0])
+    execucoes = []
+    chave = uuid4().hex
+
+    @cache_agrupado(expire=10, obsoleto=30, key_builder=lambda func, namespace, **_: chave)
+    async def consultar() -> dict:
+        execucoes.append(1)
+        await asyncio.sleep(0.05)
+        return {"execucao": len(execucoes)}
+
+    async def cenario():
+        primeira = await consultar()
+        desvio[0] += 15  # Venceu há 5 segundos, dentro da janela de 30
+        vencidas = await asyncio.gather(*(consultar() for _ in range(10)))
+        renovando = len(execucoes)
+        await asyncio.sleep(0.2)  # Renovação em segundo plano termina
+        renovada = await consultar()
+        desvio[0] += 60  # Fora da janela: falha comum
+        return primeira, vencidas, renovando, renovada, await consultar()
+
+    primeira, vencidas, renovando, renovada, depois = asyncio.run(cenario())
+    assert primeira == {"execucao": 1}
+    assert vencidas == [{"execucao": 1}] * 10  # Respondidas sem esperar a consulta
+    assert renovando == 2  # Uma única renovação para as 10 requisições
+    assert renovada == {"execucao": 2}
+    assert depois == {"execucao": 3}
+
+
+
+# Teste para o thundering herd na listagem: após a invalidação, requisições simultâneas fazem uma consulta
+def test_listagem_simultanea_consulta_o_banco_uma_vez():
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    consultas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "LIMIT" in statement.upper():
+            consultas.append(statement)
+
+    async def cenario():
+        await invalidar_tarefas()
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste", headers=headers) as cliente:
+            return await asyncio.gather(*(cliente.get("/tarefas?limit=7&skip=2") for _ in range(30)))
+
+    event.listen(engine, "before_cursor_execute", contar)
+    try:
+        respostas = asyncio.run(cenario())
+    finally:
+        event.remove(engine, "before_cursor_execute", contar)
+    assert all(resposta.status_code == 200 for resposta in respostas)
+    assert len({resposta.content for resposta in respostas}) == 1
+    assert len(consultas) == 1
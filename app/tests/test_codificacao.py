@@ -0,0 +1,99 @@
+import gzip
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app import codificacao
+from app.auth import criar_token_acesso
+from app.codificacao import escolher_codificacao
+from app.main import app
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+LOTE = [{"titulo": f"Compressão {i}", "descricao": "Descrição repetitiva " * 20, "estado": "pendente"} for i in range(30)]
+
+
+def listar(**cabecalhos):
+    return client.get("/tarefas?limit=30&estado=pendente", headers={**headers, **cabecalhos})
+
+
+
+# Teste para a escolha da codificação pelo Accept-Encoding (q=0 recusa; sem brotli, só gzip)
+def test_escolher_codificacao(monkeypatch):
+    monkeypatch.setattr(codificacao, "brotli", None)
+    assert escolher_codificacao("gzip, deflate") == "gzip"
+    assert escolher_codificacao("br") is None
+    assert escolher_codificacao("gzip;q=0, identity") is None
+    assert escolher_codificacao("*") == "gzip"
+    assert escolher_codificacao("") is None
+
+
+
+# Teste para a compressão gzip da listagem: mesmo JSON depois de descomprimido e respostas pequenas sem compressão
+def test_listagem_comprimida_com_gzip():
+    client.post("/tarefas/batch", json=LOTE, headers=headers)
+    sem_compressao = listar(**{"Accept-Encoding": "identity"})
+    comprimida = listar(**{"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in sem_compressao.headers
+    assert comprimida.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in comprimida.headers["vary"]
+    assert comprimida.json() == sem_compressao.json()
+    assert int(comprimida.headers["content-length"]) < len(sem_compressao.content) / 3
+
+    pequena = client.get("/tarefas?limit=1&fields=estado", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in pequena.headers
+
+
+
+# Teste para o brotli, preferido quando o cliente aceita os dois formatos
+def test_listagem_comprimida_com_brotli():
+    brotli = pytest.importorskip("brotli")
+    client.post("/tarefas/batch", json=LOTE, headers=headers)
+    with client.stream(
+        "GET", "/tarefas?limit=30&estado=pendente", headers={**headers, "Accept-Encoding": "gzip, br"}
+    ) as resposta:
+        bruto = b"".join(resposta.iter_raw())
+    assert resposta.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(bruto)) == listar(**{"Accept-Encoding": "identity"}).json()
+
+
+
+# Teste para a exportação em fluxo: comprimida aos poucos, sem Content-Length
+def test_exportacao_comprimida_em_fluxo():
+    with client.stream("GET", "/tarefas/export", headers={**headers, "Accept-Encoding": "gzip"}) as resposta:
+        bruto = b"".join(resposta.iter_raw())
+    assert resposta.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resposta.headers
+    linhas = gzip.decompress(bruto).decode().splitlines()
+    assert len(linhas) > 0 and all(json.loads(linha)["id"] for linha in linhas)
+
+
+
+# Teste para o MessagePack negociado pelo Accept, inclusive nos acertos do cache
+def test_listagem_em_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    client.post("/tarefas/batch", json=LOTE, headers=headers)
+    esperado = listar().json()
+    for _ in range(2):  # Falha e acerto do cache
+        resposta = listar(Accept="application/msgpack")
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"] == "application/msgpack"
+        assert "Accept" in resposta.headers["vary"]
+        assert msgpack.unpackb(resposta.content) == esperado
+    assert listar().headers["content-type"] == "application/json"
+
+
+
+# Teste para o ETag por representação: JSON, gzip e MessagePack têm ETags distintos e cada um gera 304
+def test_etag_por_representacao():
+    client.post("/tarefas/batch", json=LOTE, headers=headers)
+    representacoes = [{"Accept-Encoding": "identity"}, {"Accept-Encoding": "gzip"}]
+    if codificacao.msgpack is not None:
+        representacoes.append({"Accept-Encoding": "identity", "Accept": "application/msgpack"})
+    etags = [listar(**cabecalhos).headers["etag"] for cabecalhos in representacoes]
+    assert len(set(etags)) == len(etags)
+    assert etags[1] == etags[0][:-1] + '-gzip"'
+    for cabecalhos, etag in zip(representacoes, etags):
+        resposta = listar(**cabecalhos, **{"If-None-Match": etag})
+        assert resposta.status_code == 304
+        assert resposta.headers["etag"] == etag
+
@@ -0,0 +1,33 @@
+import asyncio
+from sqlalchemy import text
+from app.database import criar_engine, engine
+
+
+
+# Teste para verificar se os PRAGMAs do SQLite são aplicados em cada conexão
+def test_pragmas_sqlite_aplicados(tmp_path):
+    novo_engine = criar_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with novo_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64000
+
+
+
+# Teste para verificar os PRAGMAs também no engine assíncrono
+def test_pragmas_sqlite_modo_async(tmp_path):
+    novo_engine = criar_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}", assincrono=True)
+
+    async def consultar():
+        async with novo_engine.connect() as conn:
+            return (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+
+    assert asyncio.run(consultar()) == "wal"
+
+
+
+# Teste para verificar se o log de SQL vem desligado por padrão
+def test_echo_desligado_por_padrao():
+    assert engine.echo is False
+    criar_engine("sqlite://")  # Banco em memória não aceita tamanho de pool
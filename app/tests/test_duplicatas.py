@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine, insert
+from app.duplicatas import relatorio_duplicatas, remover_duplicatas
+from app.models import Tarefa
+
+TITULOS = ["Comprar pão", "Comprar pão", " comprar pão", "Lavar carro", "Comprar pão", "LAVAR CARRO ", "Única"]
+
+
+def criar_banco(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'duplicatas.db'}")
+    SQLModel.metadata.create_all(engine)
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Tarefa), [
+            {"titulo": titulo, "estado": "pendente", "data_criacao": agora, "data_atualizacao": agora}
+            for titulo in TITULOS
+        ])
+    return engine
+
+
+def titulos_restantes(conn) -> list:
+    return conn.execute(text("SELECT id, titulo FROM tarefa ORDER BY id")).all()
+
+
+
+# Teste para o modo dry-run: o relatório não altera a tabela
+def test_relatorio_duplicatas(tmp_path):
+    with criar_banco(tmp_path).connect() as conn:
+        relatorio = relatorio_duplicatas(conn)
+        assert relatorio["grupos"] == 1 and relatorio["removiveis"] == 2
+        assert relatorio["exemplos"] == [{"titulo": "Comprar pão", "quantidade": 3, "manter": 1}]
+
+        normalizado = relatorio_duplicatas(conn, normalizar=True)
+        assert normalizado["grupos"] == 2 and normalizado["removiveis"] == 4
+        assert len(titulos_restantes(conn)) == len(TITULOS)
+
+
+
+# Teste para a remoção em lotes: mantém a tarefa de menor id de cada grupo
+def test_remover_duplicatas(tmp_path):
+    engine = criar_banco(tmp_path)
+    with engine.connect() as conn:
+        assert remover_duplicatas(conn, tamanho_lote=1) == 2
+        assert [id for id, _ in titulos_restantes(conn)] == [1, 3, 4, 6, 7]
+        assert remover_duplicatas(conn) == 0
+
+        assert remover_duplicatas(conn, normalizar=True, tamanho_lote=1) == 2
+        assert titulos_restantes(conn) == [(1, "Comprar pão"), (4, "Lavar carro"), (7, "Única")]
+        # A tabela temporária não fica na conexão
+        assert conn.execute(text("SELECT count(*) FROM sqlite_temp_master")).scalar() == 0
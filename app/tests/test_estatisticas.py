@@ -0,0 +1,89 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session, create_engine, insert
+from app.auth import criar_token_acesso
+from app.database import engine
+from app.estatisticas import calcular_estatisticas, instalar_resumo
+from app.main import app
+from app.models import Tarefa
+from app.tests.test_indices import criar_banco_migrado
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+
+# Contagens calculadas diretamente na tabela de tarefas, para comparar com o resumo
+def contagens_reais(engine) -> tuple:
+    with engine.connect() as conn:
+        por_estado = dict(conn.execute(text("SELECT estado, count(*) FROM tarefa GROUP BY estado")).all())
+        criadas = dict(conn.execute(text("SELECT date(data_criacao), count(*) FROM tarefa GROUP BY 1")).all())
+        atualizadas = dict(conn.execute(text("SELECT date(data_atualizacao), count(*) FROM tarefa GROUP BY 1")).all())
+    return por_estado, criadas, atualizadas
+
+
+def contagens_resumo(engine) -> tuple:
+    with engine.connect() as conn:
+        por_estado = dict(conn.execute(text("SELECT estado, total FROM resumoestado WHERE total > 0")).all())
+        criadas = dict(conn.execute(text("SELECT dia, criadas FROM resumodia WHERE criadas > 0")).all())
+        atualizadas = dict(conn.execute(text("SELECT dia, atualizadas FROM resumodia WHERE atualizadas > 0")).all())
+    return por_estado, criadas, atualizadas
+
+
+
+# Teste para garantir que os gatilhos mantêm o resumo igual às contagens da tabela em todas as formas de escrita
+def test_resumo_acompanha_escritas():
+    tarefa = {"titulo": "Estatística", "estado": "pendente", "data_criacao": "2024-03-01T10:00:00"}
+    id = client.post("/tarefas", json=tarefa, headers=headers).json()["id"]
+    client.put(f"/tarefas/{id}", json={**tarefa, "estado": "concluída"}, headers=headers)
+    ids = [item["id"] for item in client.post("/tarefas/batch", json=[tarefa] * 5, headers=headers).json()]
+    client.patch("/tarefas/batch", json=[{"id": ids[0], "estado": "em andamento"}], headers=headers)
+    client.request("DELETE", "/tarefas/batch", json=ids[1:3], headers=headers)
+    client.post("/tarefas/import", content=b'{"titulo": "Importada", "estado": "pendente"}\n', headers=headers)
+    client.delete(f"/tarefas/{id}", headers=headers)
+
+    assert contagens_resumo(engine) == contagens_reais(engine)
+
+
+
+# Teste para o GET /tarefas/stats e o cabeçalho X-Total-Count da listagem
+def test_estatisticas_e_total():
+    antes = client.get("/tarefas/stats", headers=headers).json()
+    client.post("/tarefas", json={"titulo": "Contada", "estado": "em andamento"}, headers=headers)
+
+    response = client.get("/tarefas/stats?dias=7", headers=headers)
+    assert response.status_code == 200
+    depois = response.json()
+    assert depois["total"] == antes["total"] + 1
+    assert depois["por_estado"]["em andamento"] == antes["por_estado"]["em andamento"] + 1
+    assert sum(depois["por_estado"].values()) == depois["total"]
+    hoje = datetime.utcnow().date().isoformat()
+    assert [dia for dia in depois["por_dia"] if dia["dia"] == hoje][0]["criadas"] >= 1
+
+    response = client.get("/tarefas?limit=1&estado=em andamento&total=true", headers=headers)
+    assert response.headers["X-Total-Count"] == str(depois["por_estado"]["em andamento"])
+    assert "X-Total-Count" not in client.get("/tarefas?limit=1", headers=headers).headers
+
+
+
+# Teste para a instalação do resumo em um banco que já tinha tarefas (migração e init_db)
+def test_instalar_resumo_preenche_contagens(tmp_path):
+    banco = create_engine(f"sqlite:///{tmp_path / 'resumo.db'}")
+    SQLModel.metadata.create_all(banco)
+    agora = datetime.utcnow()
+    with banco.begin() as conn:
+        conn.execute(insert(Tarefa), [
+            {"titulo": f"T{i}", "estado": "pendente", "data_criacao": agora, "data_atualizacao": agora}
+            for i in range(10)
+        ])
+        instalar_resumo(conn)
+    with Session(banco) as session:
+        estatisticas = calcular_estatisticas(session, dias=1)
+    assert estatisticas["total"] == 10
+    assert estatisticas["por_estado"] == {"pendente": 10, "em andamento": 0, "concluída": 0}
+
+    migrado = criar_banco_migrado(tmp_path)
+    with migrado.begin() as conn:
+        conn.execute(insert(Tarefa), [{"titulo": "M", "estado": "concluida", "data_criacao": agora,
+                                       "data_atualizacao": agora}])
+    assert contagens_resumo(migrado) == contagens_reais(migrado)
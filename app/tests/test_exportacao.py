@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+import tracemalloc
+import uuid
+from datetime import datetime
+from sqlmodel import SQLModel, create_engine, insert
+from fastapi.testclient import TestClient
+from app.auth import criar_token_acesso
+from app.exportacao import gerar_ndjson
+from app.main import app
+from app.models import Tarefa
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+
+
+# Teste para a exportação em NDJSON com filtro por estado
+def test_exportar_ndjson_com_filtro():
+    titulo = f"Exportação {uuid.uuid4().hex}"
+    client.post("/tarefas", json={"titulo": titulo, "estado": "concluída"}, headers=headers)
+
+    response = client.get("/tarefas/export?estado=concluída", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    tarefas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert titulo in [tarefa["titulo"] for tarefa in tarefas]
+    assert {tarefa["estado"] for tarefa in tarefas} == {"concluída"}
+
+
+
+# Teste para a exportação em CSV
+def test_exportar_csv():
+    response = client.get("/tarefas/export?formato=csv&estado=pendente", headers=headers)
+    assert response.status_code == 200
+    linhas = list(csv.reader(io.StringIO(response.text)))
+    assert linhas[0] == ["id", "titulo", "descricao", "estado", "data_criacao", "data_atualizacao"]
+    assert all(linha[3] == "pendente" for linha in linhas[1:])
+
+
+
+# Teste para garantir memória constante: o pico não acompanha o tamanho da exportação
+def test_exportacao_memoria_constante(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    SQLModel.metadata.create_all(engine)
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Tarefa), [
+            {"titulo": f"Tarefa {i}", "descricao": "x" * 500, "estado": "pendente",
+             "data_criacao": agora, "data_atualizacao": agora}
+            for i in range(40_000)
+        ])
+
+    tracemalloc.start()
+    total_bytes = sum(len(bloco) for bloco in gerar_ndjson(engine))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert total_bytes > 20 * 1024 * 1024
+    assert pico < 5 * 1024 * 1024
@@ -0,0 +1,127 @@
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select, func
+from app.auth import criar_token_acesso
+from app.database import engine
+from app.importacao import iterar_array_json
+from app.main import app, buscar_tarefas_externas
+from app.models import Tarefa
+
+
+# Sobe um servidor HTTP local que substitui o JSON Placeholder nos testes
+def iniciar_servidor_stub(todos):
+    corpo = json.dumps(todos).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+
+# Teste para a leitura incremental do array JSON, com pedaços que cortam itens e caracteres
+def test_iterar_array_json_em_pedacos():
+    itens = [{"id": i, "title": f"título {i}", "completed": i % 2 == 0} for i in range(50)]
+    dados = json.dumps(itens, ensure_ascii=False).encode()
+    pedacos = [dados[i:i + 7] for i in range(0, len(dados), 7)]
+    assert list(iterar_array_json(pedacos)) == itens
+
+
+
+# Teste para valores escalares cortados entre pedaços: o número só é lido depois do separador
+def test_iterar_array_json_escalares_em_pedacos():
+    assert list(iterar_array_json([b"[1, 2", b"3, 4]"])) == [1, 23, 4]
+    assert list(iterar_array_json([b'[1.', b'5, "a', b'b", tr', b"ue, nul", b"l]"])) == [1.5, "ab", True, None]
+    assert list(iterar_array_json([b"[1", b"]"])) == [1]
+
+
+
+# Teste para a importação em lote a partir de um servidor local
+def test_buscar_tarefas_externas_com_stub():
+    prefixo = uuid.uuid4().hex
+    todos = [
+        {"userId": 1, "id": i, "title": f"{prefixo} {i % 2500}", "completed": i % 3 == 0}
+        for i in range(3000)  # 500 títulos repetidos dentro do próprio payload
+    ]
+    servidor = iniciar_servidor_stub(todos)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/todos"
+    try:
+        assert buscar_tarefas_externas(url, tamanho_lote=400) == 2500
+        # Uma segunda execução não deve duplicar nenhuma tarefa
+        assert buscar_tarefas_externas(url, tamanho_lote=400) == 0
+    finally:
+        servidor.shutdown()
+
+    with Session(engine) as session:
+        total = session.exec(
+            select(func.count(Tarefa.id)).where(Tarefa.titulo.startswith(prefixo))
+        ).one()
+        concluida = session.exec(select(Tarefa).where(Tarefa.titulo == f"{prefixo} 0")).one()
+    assert total == 2500
+    assert concluida.estado == "concluída"
+
+
+
+
+# Teste para o POST /tarefas/import com NDJSON enviado em pedaços, incluindo linhas inválidas
+def test_importar_ndjson_em_pedacos():
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    prefixo = uuid.uuid4().hex
+    linhas = [json.dumps({"titulo": f"{prefixo} {i}", "estado": "pendente"}) for i in range(25)]
+    linhas[3] = json.dumps({"titulo": f"{prefixo} sem estado"})
+    linhas[10] = "{quebrado"
+    linhas[17] = json.dumps({"titulo": f"{prefixo} 17", "estado": "arquivada"})
+    dados = ("\n".join(linhas) + "\n").encode()
+
+    response = client.post(
+        "/tarefas/import",
+        content=(dados[i:i + 50] for i in range(0, len(dados), 50)),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    resultado = response.json()
+    assert (resultado["aceitas"], resultado["rejeitadas"]) == (22, 3)
+    assert [erro["linha"] for erro in resultado["erros"]] == [4, 11, 18]
+
+    with Session(engine) as session:
+        total = session.exec(select(func.count(Tarefa.id)).where(Tarefa.titulo.startswith(prefixo))).one()
+    assert total == 22
+
+
+
+# Teste para o POST /tarefas/import com CSV (cabeçalho, campo com quebra de linha e campos vazios)
+def test_importar_csv():
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    prefixo = uuid.uuid4().hex
+    corpo = (
+        "titulo,descricao,estado\r\n"
+        f'{prefixo} a,"linha 1\nlinha 2",concluída\r\n'
+        f"{prefixo} b,,pendente\r\n"
+        f"{prefixo} c,sem estado\r\n"
+    )
+    response = client.post("/tarefas/import?formato=csv", content=corpo.encode(), headers=headers)
+    assert response.status_code == 200
+    assert response.json()["aceitas"] == 2
+    assert response.json()["erros"] == [{"linha": 5, "detail": "Quantidade de colunas diferente do cabeçalho"}]
+
+    with Session(engine) as session:
+        tarefa = session.exec(select(Tarefa).where(Tarefa.titulo == f"{prefixo} a")).one()
+        vazia = session.exec(select(Tarefa).where(Tarefa.titulo == f"{prefixo} b")).one()
+    assert tarefa.descricao == "linha 1\nlinha 2"
+    assert tarefa.estado == "concluída"
+    assert vazia.descricao is None
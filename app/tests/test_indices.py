@@ -0,0 +1,80 @@
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+
+# Cria um banco SQLite novo aplicando todas as migrações do Alembic
+def criar_banco_migrado(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrado.db'}")
+    config = Config("alembic.ini")
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+    return engine
+
+
+# Retorna o plano de execução (EXPLAIN QUERY PLAN) como um único texto
+def plano(engine, sql, **params):
+    with engine.connect() as conn:
+        linhas = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+    return " | ".join(linha[-1] for linha in linhas)
+
+
+
+# Teste para verificar se a migração cria a tabela e os índices
+def test_migracao_cria_tabela_e_indices(tmp_path):
+    engine = criar_banco_migrado(tmp_path)
+    inspetor = inspect(engine)
+    assert "tarefa" in inspetor.get_table_names()
+    with engine.connect() as conn:
+        indices = set(conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tarefa'")
+        ).scalars())
+    assert {
+        "ix_tarefa_estado_id",
+        "ix_tarefa_data_criacao",
+        "ix_tarefa_titulo",
+        "ix_tarefa_titulo_normalizado",
+    } <= indices
+
+
+
+# Teste para verificar se as consultas mais usadas aproveitam os índices
+def test_consultas_usam_indices(tmp_path):
+    engine = criar_banco_migrado(tmp_path)
+
+    # Filtro por estado com paginação por cursor
+    assert "ix_tarefa_estado_id" in plano(
+        engine, "SELECT * FROM tarefa WHERE estado = :estado AND id > :id ORDER BY id LIMIT 10",
+        estado="pendente", id=0,
+    )
+    # Busca por título (importação de tarefas externas)
+    assert "ix_tarefa_titulo" in plano(
+        engine, "SELECT id FROM tarefa WHERE titulo = :titulo LIMIT 1", titulo="x"
+    )
+    # Agrupamento por título (verificação de duplicatas) sem ordenação temporária
+    plano_duplicatas = plano(
+        engine, "SELECT titulo, count(id) FROM tarefa GROUP BY titulo HAVING count(id) > 1"
+    )
+    assert "ix_tarefa_titulo" in plano_duplicatas
+    assert "TEMP B-TREE" not in plano_duplicatas
+    # Ordenação por data de criação
+    assert "ix_tarefa_data_criacao" in plano(
+        engine, "SELECT * FROM tarefa ORDER BY data_criacao LIMIT 10"
+    )
+    # Comparação por título normalizado
+    assert "ix_tarefa_titulo_normalizado" in plano(
+        engine, "SELECT id FROM tarefa WHERE lower(trim(titulo)) = :titulo", titulo="x"
+    )
+
+
+
+# Teste para a tabela de usuários: usuário padrão criado e busca do /login pelo índice único
+def test_migracao_usuarios(tmp_path):
+    engine = criar_banco_migrado(tmp_path)
+    with engine.connect() as conn:
+        usernames = conn.execute(text("SELECT username FROM usuario")).scalars().all()
+    assert usernames == ["usuario1"]
+    assert "ix_usuario_username" in plano(
+        engine, "SELECT * FROM usuario WHERE username = :username", username="usuario1"
+    )
@@ -1,5 +1,8 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 from fastapi.testclient import TestClient
 from app.main import app
+from app import serializacao
 from app.auth import criar_token_acesso
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
@@ -243,3 +246,313 @@ def test_cache_tarefa():
     # As respostas devem ser iguais
     assert primeira_response.json() == segunda_response.json()
 
+
+
+
+# Teste para verificar paginação por cursor
+def test_paginacao_por_cursor():
+    token = obter_token()
+    for i in range(7):
+        client.post(
+            "/tarefas",
+            json={"titulo": f"Tarefa cursor {i+1}", "descricao": "Cursor", "estado": "pendente"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    # Percorre as primeiras páginas seguindo o next_cursor
+    response = client.get(
+        "/tarefas?cursor=&limit=3&estado=pendente",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    primeira = response.json()
+    assert len(primeira["items"]) == 3
+    assert primeira["next_cursor"]
+
+    response = client.get(
+        f"/tarefas?cursor={primeira['next_cursor']}&limit=3&estado=pendente",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    segunda = response.json()
+    ids_primeira = [t["id"] for t in primeira["items"]]
+    ids_segunda = [t["id"] for t in segunda["items"]]
+    assert max(ids_primeira) < min(ids_segunda)  # Sem repetições entre páginas
+    for tarefa in segunda["items"]:
+        assert tarefa["estado"] == "pendente"
+
+
+
+# Teste para cursor inválido
+def test_paginacao_cursor_invalido():
+    token = obter_token()
+    response = client.get(
+        "/tarefas?cursor=invalido",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 400
+
+
+
+# Teste para verificar se a atualização invalida o cache da tarefa e das listagens
+def test_cache_invalidado_nas_escritas():
+    token = obter_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    criar_response = client.post(
+        "/tarefas",
+        json={"titulo": "Cache invalidação", "descricao": "Antes", "estado": "pendente"},
+        headers=headers
+    )
+    tarefa_id = criar_response.json()["id"]
+
+    # Popula o cache da tarefa e da listagem
+    response = client.get(f"/tarefas/{tarefa_id}", headers=headers)
+    assert response.json()["descricao"] == "Antes"
+    assert response.headers["Cache-Control"] == "no-cache"  # O cliente sempre revalida
+    lista = client.get("/tarefas?cursor=&limit=100&estado=concluída", headers=headers).json()
+    assert tarefa_id not in [t["id"] for t in lista["items"]]
+
+    client.put(
+        f"/tarefas/{tarefa_id}",
+        json={"titulo": "Cache invalidação", "descricao": "Depois", "estado": "concluída"},
+        headers=headers
+    )
+
+    # As leituras seguintes já devem refletir a escrita
+    assert client.get(f"/tarefas/{tarefa_id}", headers=headers).json()["descricao"] == "Depois"
+    lista = client.get("/tarefas?cursor=&limit=100&estado=concluída", headers=headers).json()
+    ids = [t["id"] for t in lista["items"]]
+    while lista["next_cursor"]:
+        lista = client.get(
+            f"/tarefas?cursor={lista['next_cursor']}&limit=100&estado=concluída", headers=headers
+        ).json()
+        ids += [t["id"] for t in lista["items"]]
+    assert tarefa_id in ids
+
+    # Após a exclusão a tarefa não pode mais vir do cache
+    client.delete(f"/tarefas/{tarefa_id}", headers=headers)
+    assert client.get(f"/tarefas/{tarefa_id}", headers=headers).status_code == 404
+
+
+
+# Teste para as estatísticas do cache
+def test_estatisticas_cache():
+    token = obter_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    antes = client.get("/cache/estatisticas", headers=headers).json()
+    client.get("/tarefas?limit=3&skip=1", headers=headers)
+    client.get("/tarefas?limit=3&skip=1", headers=headers)
+    depois = client.get("/cache/estatisticas", headers=headers).json()
+    assert depois["acertos"] >= antes["acertos"] + 1
+    assert depois["falhas"] >= antes["falhas"] + 1
+    assert 0 <= depois["taxa_acerto"] <= 1
+
+
+
+# Teste para verificar se um token inválido é recusado
+def test_token_invalido():
+    response = client.get(
+        "/tarefas",
+        headers={"Authorization": "Bearer token-invalido"}
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token inválido ou expirado"
+
+
+
+# Teste para o limite de verificações de senha simultâneas no login
+def test_login_saturado(monkeypatch):
+    monkeypatch.setattr("app.auth.LOGIN_MAX_FILA", 0)
+    response = client.post(
+        "/login",
+        data={"username": "usuario1", "password": "senha123"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+
+# Teste para as operações em lote (criação, atualização parcial e exclusão)
+def test_operacoes_em_lote():
+    token = obter_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post(
+        "/tarefas/batch",
+        json=[{"titulo": f"Lote {i}", "estado": "pendente"} for i in range(3)],
+        headers=headers
+    )
+    assert response.status_code == 201
+    ids = [item["id"] for item in response.json()]
+    assert len(set(ids)) == 3
+    assert client.get(f"/tarefas/{ids[0]}", headers=headers).json()["titulo"] == "Lote 0"
+
+    response = client.patch(
+        "/tarefas/batch",
+        json=[{"id": ids[0], "estado": "concluída"}, {"id": 0, "titulo": "Inexistente"}],
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [200, 404]
+    tarefa = client.get(f"/tarefas/{ids[0]}", headers=headers).json()
+    assert (tarefa["titulo"], tarefa["estado"]) == ("Lote 0", "concluída")  # Título preservado
+
+    response = client.request("DELETE", "/tarefas/batch", json=ids[:2] + [0], headers=headers)
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [204, 204, 404]
+    assert client.get(f"/tarefas/{ids[0]}", headers=headers).status_code == 404
+    assert client.get(f"/tarefas/{ids[2]}", headers=headers).status_code == 200
+
+
+
+# Teste para o limite de itens por lote
+def test_lote_acima_do_limite(monkeypatch):
+    monkeypatch.setattr("app.lote.LIMITE_LOTE", 2)
+    token = obter_token()
+    response = client.request(
+        "DELETE", "/tarefas/batch", json=[1, 2, 3], headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 413
+
+
+
+# Teste para campos enviados como null no PATCH em lote: recusados com 422, sem alterar a tarefa
+def test_lote_recusa_campos_nulos():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    id = client.post("/tarefas", json={"titulo": "Sem nulos", "estado": "pendente"}, headers=headers).json()["id"]
+    for campo in ("titulo", "estado"):
+        response = client.patch("/tarefas/batch", json=[{"id": id, campo: None}], headers=headers)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][-1] == campo
+    tarefa = client.get(f"/tarefas/{id}", headers=headers).json()
+    assert (tarefa["titulo"], tarefa["estado"]) == ("Sem nulos", "pendente")
+    # A descrição aceita null
+    response = client.patch("/tarefas/batch", json=[{"id": id, "descricao": None}], headers=headers)
+    assert response.json() == [{"id": id, "status": 200, "detail": None}]
+
+
+
+
+# Teste para o GET condicional de uma tarefa (ETag e Last-Modified)
+def test_get_condicional_tarefa():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    uma_hora_atras = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    tarefa = {"titulo": "Condicional", "estado": "pendente", "data_atualizacao": uma_hora_atras}
+    id = client.post("/tarefas", json=tarefa, headers=headers).json()["id"]
+
+    response = client.get(f"/tarefas/{id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    ultima_modificacao = response.headers["last-modified"]
+    assert not etag.startswith("W/")
+
+    response = client.get(f"/tarefas/{id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    response = client.get(f"/tarefas/{id}", headers={**headers, "If-Modified-Since": ultima_modificacao})
+    assert response.status_code == 304
+
+    # Após uma escrita o ETag antigo deixa de valer
+    client.put(f"/tarefas/{id}", json={**tarefa, "estado": "concluída"}, headers=headers)
+    response = client.get(f"/tarefas/{id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["estado"] == "concluída"
+    assert response.headers["etag"] != etag
+
+    # Sem autenticação não há 304
+    assert client.get(f"/tarefas/{id}", headers={"If-None-Match": response.headers["etag"]}).status_code == 401
+
+
+
+
+# Teste para o PUT que repete a data_atualizacao antiga: os validadores anteriores deixam de valer
+def test_get_condicional_put_com_data_repetida():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    uma_hora_atras = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    tarefa = {"titulo": "Repetida", "estado": "pendente", "data_atualizacao": uma_hora_atras}
+    id = client.post("/tarefas", json=tarefa, headers=headers).json()["id"]
+    response = client.get(f"/tarefas/{id}", headers=headers)
+    tarefa, etag, ultima_modificacao = response.json(), response.headers["etag"], response.headers["last-modified"]
+
+    client.put(f"/tarefas/{id}", json={**tarefa, "descricao": "Alterada"}, headers=headers)
+    response = client.get(f"/tarefas/{id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["descricao"] == "Alterada"
+    assert response.json()["data_atualizacao"] != tarefa["data_atualizacao"]
+    response = client.get(f"/tarefas/{id}", headers={**headers, "If-Modified-Since": ultima_modificacao})
+    assert response.status_code == 200
+
+
+
+
+# Teste para o GET condicional da listagem (versão da coleção)
+def test_get_condicional_lista():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    response = client.get("/tarefas?limit=5", headers=headers)
+    etag = response.headers["etag"]
+
+    assert client.get("/tarefas?limit=5", headers={**headers, "If-None-Match": etag}).status_code == 304
+    # Outros parâmetros geram outro ETag
+    assert client.get("/tarefas?limit=6", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    client.post("/tarefas", json={"titulo": "Nova", "estado": "pendente"}, headers=headers)
+    response = client.get("/tarefas?limit=5", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+
+
+# Teste para o If-Modified-Since com uma escrita no mesmo segundo: a listagem não pode responder 304
+def test_get_condicional_escrita_no_mesmo_segundo():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    if_modified_since = format_datetime(datetime.now(timezone.utc), usegmt=True)  # Segundo atual, truncado
+    client.post("/tarefas", json={"titulo": "Mesmo segundo", "estado": "pendente"}, headers=headers)
+    response = client.get("/tarefas?limit=5", headers={**headers, "If-Modified-Since": if_modified_since})
+    assert response.status_code == 200
+    assert "last-modified" not in response.headers  # Alteração recente: só o ETag
+    assert client.get(
+        "/tarefas?limit=5", headers={**headers, "If-None-Match": response.headers["etag"]}
+    ).status_code == 304
+
+
+
+
+
+# Teste para garantir que a serialização rápida gera os mesmos dados que o response_model
+def test_serializacao_rapida_igual_ao_padrao(monkeypatch):
+    headers = {"Authorization": f"Bearer {obter_token()}", "Cache-Control": "no-store"}  # Sem cache
+    for caminho in ("/tarefas?limit=50", "/tarefas?cursor=&limit=5"):
+        monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", True)
+        rapida = client.get(caminho, headers=headers)
+        monkeypatch.setattr(serializacao, "SERIALIZACAO_RAPIDA", False)
+        padrao = client.get(caminho, headers=headers)
+        assert rapida.status_code == padrao.status_code == 200
+        assert rapida.json() == padrao.json()
+
+
+
+
+# Teste para a seleção de campos (fields=) e para a chave de cache que considera a projeção
+def test_listar_tarefas_com_fields():
+    headers = {"Authorization": f"Bearer {obter_token()}"}
+    completa = client.get("/tarefas?limit=5", headers=headers).json()
+
+    response = client.get("/tarefas?limit=5&fields=titulo,estado", headers=headers)
+    assert response.status_code == 200
+    assert [set(tarefa) for tarefa in response.json()] == [{"id", "titulo", "estado"}] * len(completa)
+    assert [t["titulo"] for t in response.json()] == [t["titulo"] for t in completa]
+
+    # A mesma projeção em outra ordem usa a mesma entrada do cache
+    antes = client.get("/cache/estatisticas", headers=headers).json()["acertos"]
+    assert client.get("/tarefas?limit=5&fields=estado,titulo,estado", headers=headers).json() == response.json()
+    assert client.get("/cache/estatisticas", headers=headers).json()["acertos"] == antes + 1
+
+    pagina = client.get("/tarefas?cursor=&limit=2&fields=titulo", headers=headers).json()
+    assert set(pagina["items"][0]) == {"id", "titulo"}
+    assert pagina["next_cursor"]
+
+    response = client.get("/tarefas?fields=titulo,senha", headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,57 @@
+import re
+from fastapi.testclient import TestClient
+from app.auth import criar_token_acesso
+from app.main import app
+from app.metricas import Histograma
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+
+# Lê o valor de uma série do texto do /metrics (0 se ela ainda não existe)
+def valor(texto: str, serie: str) -> float:
+    encontrado = re.search(rf"^{re.escape(serie)} (\S+)$", texto, re.MULTILINE)
+    return float(encontrado.group(1)) if encontrado else 0.0
+
+
+
+# Teste para o formato de texto do histograma (baldes acumulados, +Inf, soma e contagem)
+def test_histograma_formato_prometheus():
+    histograma = Histograma("teste_segundos", "Histograma de teste", ("rota",), (0.1, 1.0))
+    for duracao in (0.05, 0.1, 0.5, 3.0):
+        histograma.observar(duracao, '/a"b')
+    assert histograma.exportar() == [
+        "# HELP teste_segundos Histograma de teste",
+        "# TYPE teste_segundos histogram",
+        'teste_segundos_bucket{rota="/a\\"b",le="0.1"} 2',
+        'teste_segundos_bucket{rota="/a\\"b",le="1.0"} 3',
+        'teste_segundos_bucket{rota="/a\\"b",le="+Inf"} 4',
+        'teste_segundos_sum{rota="/a\\"b"} 3.65',
+        'teste_segundos_count{rota="/a\\"b"} 4',
+    ]
+
+
+
+# Teste para as métricas de requisições, consultas, cache e bcrypt expostas em /metrics
+def test_metricas_das_requisicoes():
+    id = client.post("/tarefas", json={"titulo": "Medida", "estado": "pendente"}, headers=headers).json()["id"]
+    antes = client.get("/metrics").text
+    client.get(f"/tarefas/{id}", headers=headers)  # Falha do cache
+    client.get(f"/tarefas/{id}", headers=headers)  # Acerto do cache
+    client.post("/login", data={"username": "usuario1", "password": "senha_errada"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    depois = response.text
+
+    # A rota aparece como declarada, e não com o id
+    serie = 'http_request_duration_seconds_count{method="GET",route="/tarefas/{id}",status="200"}'
+    assert valor(depois, serie) == valor(antes, serie) + 2
+    consultas = 'db_queries_per_request_sum{method="GET",route="/tarefas/{id}"}'
+    assert valor(depois, consultas) > valor(antes, consultas)
+    assert valor(depois, "cache_hits_total") >= valor(antes, "cache_hits_total") + 1
+    assert valor(depois, "cache_misses_total") >= valor(antes, "cache_misses_total") + 1
+    assert valor(depois, "bcrypt_duration_seconds_count") == valor(antes, "bcrypt_duration_seconds_count") + 1
+    assert valor(depois, "threadpool_threads_limit") > 0
+    assert 'route="/tarefas/' + str(id) not in depois
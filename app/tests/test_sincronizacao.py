@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select, insert
+from app.auth import criar_token_acesso
+from app.database import engine
+from app.main import app
+from app.models import Tarefa, TarefaExterna
+from app.sincronizacao import encerrar_sincronizacao, iniciar_sincronizacao, sincronizar_uma_vez
+
+client = TestClient(app)
+headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+
+
+# Servidor local que imita o JSON Placeholder: paginação por _page/_limit, ETag e 304 com If-None-Match
+def iniciar_fonte(todos: list):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Mantém a conexão aberta entre requisições (keep-alive)
+
+        def do_GET(self):
+            consulta = parse_qs(urlparse(self.path).query)
+            itens = todos
+            if "_page" in consulta:
+                pagina, limite = int(consulta["_page"][0]), int(consulta["_limit"][0])
+                itens = todos[(pagina - 1) * limite:pagina * limite]
+            corpo = json.dumps(itens).encode()
+            etag = f'"{hashlib.md5(corpo).hexdigest()}"'
+            servidor.conexoes.add(self.client_address)
+            if self.headers.get("If-None-Match") == etag:
+                servidor.respostas.append(304)
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            servidor.respostas.append(200)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    servidor.conexoes, servidor.respostas = set(), []
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    servidor.url = f"http://127.0.0.1:{servidor.server_address[1]}/todos"
+    return servidor
+
+
+# Todos com ids e títulos únicos (o banco é compartilhado entre os testes)
+def gerar_todos(quantidade: int) -> list:
+    prefixo = uuid.uuid4().hex
+    base = uuid.uuid4().int % 10**12 * 1000
+    return [
+        {"userId": 1, "id": base + i, "title": f"{prefixo} {i}", "completed": i % 2 == 0} for i in range(quantidade)
+    ]
+
+
+def tarefa_da_origem(id_externo: int) -> Tarefa:
+    with Session(engine) as session:
+        return session.exec(
+            select(Tarefa).join(TarefaExterna, TarefaExterna.tarefa_id == Tarefa.id)
+            .where(TarefaExterna.id_externo == id_externo)
+        ).first()
+
+
+
+# Teste para a sincronização paginada: requisições condicionais e escrita apenas dos itens alterados
+def test_sincronizacao_paginada_incremental():
+    todos = gerar_todos(25)
+    fonte = iniciar_fonte(todos)
+    opcoes = {"url": fonte.url, "tamanho_pagina": 10, "concorrencia": 2}
+    try:
+        primeira = asyncio.run(sincronizar_uma_vez(engine, **opcoes))
+        # Páginas 1 a 4 em janelas de 2: a 3ª (5 itens) é a última, a 4ª já tinha sido pedida na mesma janela
+        assert primeira == {"paginas": 4, "nao_modificadas": 0, "inseridas": 25, "atualizadas": 0, "inalteradas": 0}
+
+        segunda = asyncio.run(sincronizar_uma_vez(engine, **opcoes))
+        assert segunda == {"paginas": 4, "nao_modificadas": 4, "inseridas": 0, "atualizadas": 0, "inalteradas": 0}
+
+        todos[3]["completed"] = not todos[3]["completed"]
+        todos[12]["title"] += " (editada na origem)"
+        terceira = asyncio.run(sincronizar_uma_vez(engine, **opcoes))
+        assert terceira == {"paginas": 4, "nao_modificadas": 2, "inseridas": 0, "atualizadas": 2, "inalteradas": 18}
+    finally:
+        fonte.shutdown()
+
+    assert fonte.respostas.count(304) == 6
+    assert len({porta for _, porta in fonte.conexoes}) <= 2 * 3  # Conexões reaproveitadas dentro de cada execução
+    assert tarefa_da_origem(todos[12]["id"]).titulo == todos[12]["title"]
+    assert tarefa_da_origem(todos[3]["id"]).estado == ("concluída" if todos[3]["completed"] else "pendente")
+
+
+
+# Teste para os vínculos: título já importado é reaproveitado, edições locais ficam e tarefas removidas voltam
+def test_sincronizacao_vinculos_e_edicoes_locais():
+    todos = gerar_todos(3)
+    with Session(engine) as session:
+        # Tarefa importada antes pelo buscar_tarefas_externas (sem vínculo, identificada pelo título)
+        session.execute(insert(Tarefa), [{"titulo": todos[0]["title"], "descricao": "Antiga", "estado": "pendente"}])
+        session.commit()
+    fonte = iniciar_fonte(todos)
+    try:
+        assert asyncio.run(sincronizar_uma_vez(engine, url=fonte.url))["inseridas"] == 2
+        adotada, editada, removida = (tarefa_da_origem(todo["id"]) for todo in todos)
+        assert adotada.descricao == "Antiga"
+
+        client.put(f"/tarefas/{editada.id}", json={"titulo": "Editada aqui", "estado": "em andamento"}, headers=headers)
+        client.delete(f"/tarefas/{removida.id}", headers=headers)
+        todos[2]["title"] += " (nova versão)"
+        resultado = asyncio.run(sincronizar_uma_vez(engine, url=fonte.url))
+    finally:
+        fonte.shutdown()
+
+    assert resultado == {"paginas": 1, "nao_modificadas": 0, "inseridas": 1, "atualizadas": 0, "inalteradas": 2}
+    assert tarefa_da_origem(todos[1]["id"]).titulo == "Editada aqui"  # Não mudou na origem: a edição local fica
+    assert tarefa_da_origem(todos[2]["id"]).titulo == todos[2]["title"]
+
+
+
+# Teste para a sincronização periódica iniciada pelo lifespan
+def test_sincronizacao_periodica():
+    todos = gerar_todos(5)
+    fonte = iniciar_fonte(todos)
+
+    async def cenario():
+        iniciar_sincronizacao(engine, 0.05, url=fonte.url)
+        try:
+            for _ in range(100):
+                if len(fonte.respostas) >= 3:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            encerrar_sincronizacao()
+
+    try:
+        asyncio.run(cenario())
+    finally:
+        fonte.shutdown()
+    assert fonte.respostas[:3] == [200, 304, 304]
+    assert all(tarefa_da_origem(todo["id"]) is not None for todo in todos)
+
+
+
+# Teste para o cache: a tarefa já lida pela API reflete a alteração trazida pela sincronização periódica
+def test_sincronizacao_invalida_tarefa_em_cache():
+    todos = gerar_todos(2)
+    fonte = iniciar_fonte(todos)
+
+    async def sincronizar_ate(respostas: int):
+        iniciar_sincronizacao(engine, 0.05, url=fonte.url)
+        try:
+            for _ in range(100):
+                if len(fonte.respostas) >= respostas:
+                    break
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.1)  # Invalidação depois da gravação
+        finally:
+            encerrar_sincronizacao()
+
+    try:
+        asyncio.run(sincronizar_ate(1))
+        tarefa_id = tarefa_da_origem(todos[0]["id"]).id
+        assert client.get(f"/tarefas/{tarefa_id}", headers=headers).json()["titulo"] == todos[0]["title"]
+        assert client.get(f"/tarefas/{tarefa_id}", headers=headers).json()["titulo"] == todos[0]["title"]  # Do cache
+
+        todos[0]["title"] += " (editada na origem)"
+        antes = len(fonte.respostas)
+        asyncio.run(sincronizar_ate(antes + 1))
+    finally:
+        fonte.shutdown()
+    assert 200 in fonte.respostas[antes:]
+    assert client.get(f"/tarefas/{tarefa_id}", headers=headers).json()["titulo"] == todos[0]["title"]
@@ -0,0 +1,112 @@
+"""Benchmark: assinantes parados no GET /tarefas/changes (SSE) e latência de entrega das alterações.
+
+Sobe um servidor uvicorn, abre N conexões SSE (sockets crus, para o cliente não ser o gargalo),
+mede a memória (RSS) do servidor por assinante e, para cada tarefa criada, o tempo até o evento
+chegar a cada um dos assinantes.
+
+Uso:
+    python -m benchmarks.bench_alteracoes --assinantes 1000,5000 --escritas 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from benchmarks.bench_async import iniciar_servidor
+from benchmarks.bench_login import percentil
+
+
+# Memória residente do processo, lida do /proc (Linux)
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as arquivo:
+        for linha in arquivo:
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024
+    return 0.0
+
+
+# Conexão SSE mínima: registra o instante em que cada evento "criada" chega
+async def assinar(porta: int, token: str, desde: int, chegadas: list, conectado: asyncio.Event):
+    leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+    escritor.write(
+        f"GET /tarefas/changes?since={desde} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n"
+        f"Authorization: Bearer {token}\r\n\r\n".encode()
+    )
+    await escritor.drain()
+    try:
+        await leitor.readuntil(b"retry:")
+        conectado.set()
+        while True:
+            dados = await leitor.read(65536)
+            if not dados:
+                return
+            agora = time.perf_counter()
+            chegadas.extend([agora] * dados.count(b"event: criada"))
+    finally:
+        escritor.close()
+
+
+async def medir(porta: int, pid: int, assinantes: int, escritas: int) -> dict:
+    base = f"http://127.0.0.1:{porta}"
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        login = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+        token = login.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        desde = (await client.get("/tarefas/changes", headers=headers)).json()["ultimo_id"]
+
+        rss_antes = rss_mib(pid)
+        chegadas = [[] for _ in range(assinantes)]
+        conectados = [asyncio.Event() for _ in range(assinantes)]
+        tarefas = []
+        for i in range(assinantes):
+            tarefas.append(asyncio.create_task(assinar(porta, token, desde, chegadas[i], conectados[i])))
+            if i % 200 == 199:
+                await asyncio.sleep(0.05)  # Não estoura a fila de conexões (backlog) do servidor
+        await asyncio.wait_for(asyncio.gather(*(evento.wait() for evento in conectados)), 300)
+        await asyncio.sleep(1)
+        rss_depois = rss_mib(pid)
+
+        latencias, para_todos = [], []
+        for n in range(1, escritas + 1):
+            inicio = time.perf_counter()
+            await client.post("/tarefas", json={"titulo": f"Alteração {n}", "estado": "pendente"}, headers=headers)
+            while any(len(recebidas) < n for recebidas in chegadas):
+                await asyncio.sleep(0.001)
+            momentos = [recebidas[n - 1] - inicio for recebidas in chegadas]
+            latencias += momentos
+            para_todos.append(max(momentos))
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+    return {
+        "kib_por_assinante": (rss_depois - rss_antes) * 1024 / assinantes,
+        "rss": rss_depois,
+        "p50": percentil(latencias, 50) * 1000,
+        "p99": percentil(latencias, 99) * 1000,
+        "todos": percentil(para_todos, 50) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--assinantes", default="1000,5000", help="Quantidades de assinantes, separadas por vírgula")
+    parser.add_argument("--escritas", type=int, default=20)
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'assinantes':>10} {'RSS (MiB)':>10} {'KiB/assin.':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'todos (ms)':>11}")
+    for assinantes in map(int, args.assinantes.split(",")):
+        caminho = os.path.join(tempfile.mkdtemp(), "bench_alteracoes.db")
+        servidor = iniciar_servidor(f"sqlite:///{caminho}", args.porta)
+        try:
+            r = asyncio.run(medir(args.porta, servidor.pid, assinantes, args.escritas))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        print(f"{assinantes:>10} {r['rss']:>10.1f} {r['kib_por_assinante']:>11.1f} {r['p50']:>9.1f} "
+              f"{r['p99']:>9.1f} {r['todos']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
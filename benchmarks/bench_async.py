@@ -0,0 +1,89 @@
+"""Teste de carga: endpoints de tarefas no modo síncrono x assíncrono (aiosqlite).
+
+Sobe um servidor uvicorn para cada modo e dispara requisições com N clientes concorrentes.
+
+Uso:
+    python -m benchmarks.bench_async --clientes 500 --requisicoes 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from sqlmodel import SQLModel, create_engine
+from benchmarks.bench_paginacao import popular_banco
+
+MODOS = {"sync": "sqlite", "async": "sqlite+aiosqlite"}
+
+
+# Sobe o uvicorn apontando para o banco informado e aguarda até responder
+def iniciar_servidor(url_banco: str, porta: int, **variaveis) -> subprocess.Popen:
+    env = {**os.environ, **variaveis, "DATABASE_URL": url_banco}
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning",
+         "--timeout-keep-alive", "120"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{porta}/")
+            return processo
+        except httpx.TransportError:
+            time.sleep(0.1)
+    processo.kill()
+    raise RuntimeError("O servidor não respondeu")
+
+
+# Dispara as requisições com um número fixo de clientes concorrentes
+async def gerar_carga(base: str, clientes: int, requisicoes: int, total_tarefas: int) -> float:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=base, limits=limites, timeout=60) as client:
+        login = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+        headers = {
+            "Authorization": f"Bearer {login.json()['access_token']}",
+            "Cache-Control": "no-cache",  # Força a ida ao banco em toda requisição
+        }
+        restantes = iter(range(requisicoes))
+
+        async def cliente():
+            for _ in restantes:
+                await client.get(f"/tarefas/{random.randint(1, total_tarefas)}", headers=headers)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(clientes)))
+        return requisicoes / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--requisicoes", type=int, default=20_000)
+    parser.add_argument("--tarefas", type=int, default=10_000)
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    popular_banco(engine, args.tarefas)
+
+    # Cada modo usa uma porta própria para não depender da liberação da porta anterior
+    for deslocamento, (modo, driver) in enumerate(MODOS.items()):
+        porta = args.porta + deslocamento
+        processo = iniciar_servidor(f"{driver}:///{caminho}", porta)
+        try:
+            vazao = asyncio.run(gerar_carga(
+                f"http://127.0.0.1:{porta}", args.clientes, args.requisicoes, args.tarefas
+            ))
+        finally:
+            processo.terminate()
+            processo.wait()
+        print(f"{modo:>6}: {vazao:,.0f} req/s com {args.clientes} clientes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: GET /tarefas/search (índice FTS5) x LIKE '%q%' em titulo e descricao.
+
+As tarefas combinam palavras de um vocabulário fixo, então há termos comuns (presentes em muitas
+tarefas) e raros (em poucas). Cada consulta busca a primeira página, como o endpoint.
+
+Uso:
+    python -m benchmarks.bench_busca --linhas 1000000 --limit 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import or_
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.busca import consulta_busca, instalar_busca, termos_busca
+from app.models import Tarefa
+
+COMUNS = ["revisar", "enviar", "relatório", "reunião", "cliente", "projeto", "orçamento", "contrato"]
+RARAS = [f"palavra{i}" for i in range(2000)]
+
+CONSULTAS = {
+    "comum": "relatório",
+    "duas palavras": "cliente contrato",
+    "rara": "palavra1234",
+    "inexistente": "inexistente",
+}
+
+
+# Popula o banco com n tarefas de texto variado; o índice é reconstruído uma vez no final, como na migração
+def popular_banco(engine, n: int, lote: int = 50_000):
+    aleatorio = random.Random(42)
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        for inicio in range(0, n, lote):
+            linhas = [
+                {
+                    "titulo": " ".join(aleatorio.sample(COMUNS, 2)) + f" {aleatorio.choice(RARAS)}",
+                    "descricao": " ".join(aleatorio.choices(COMUNS + RARAS[:50], k=8)),
+                    "estado": "pendente" if i % 3 else "concluida",
+                    "data_criacao": agora,
+                    "data_atualizacao": agora,
+                }
+                for i in range(inicio, min(inicio + lote, n))
+            ]
+            conn.execute(Tarefa.__table__.insert(), linhas)
+        instalar_busca(conn)
+
+
+# Consulta equivalente sem índice: todas as palavras em titulo ou descricao
+def consulta_like(q: str, limit: int):
+    query = select(Tarefa)
+    for palavra in q.split():
+        query = query.where(or_(Tarefa.titulo.like(f"%{palavra}%"), Tarefa.descricao.like(f"%{palavra}%")))
+    return query.order_by(Tarefa.id).limit(limit)
+
+
+# Mede o tempo médio (ms) de uma consulta repetida algumas vezes
+def medir(session, query, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        session.exec(query).all()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_busca.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    inicio = time.perf_counter()
+    popular_banco(engine, args.linhas)
+    print(f"{args.linhas:,} tarefas inseridas e indexadas em {time.perf_counter() - inicio:.1f}s\n")
+
+    print(f"{'consulta':>14} {'LIKE (ms)':>10} {'FTS5 (ms)':>10}")
+    with Session(engine) as session:
+        for nome, q in CONSULTAS.items():
+            like = medir(session, consulta_like(q, args.limit), args.repeticoes)
+            fts = medir(session, consulta_busca(termos_busca(q), None, None, args.limit), args.repeticoes)
+            print(f"{nome:>14} {like:>10.2f} {fts:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: taxa de acerto e memória do cache com chaves em distribuição assimétrica (Zipf).
+
+Simula N workers recebendo requisições em rodízio e compara:
+- cache por worker sem limite;
+- cache por worker com LRU limitado (BackendLRU);
+- cache compartilhado via protocolo Redis (usa fakeredis, se instalado).
+
+Uso:
+    python -m benchmarks.bench_cache --workers 4 --chaves 50000 --requisicoes 200000
+"""
+import argparse
+import asyncio
+import random
+from itertools import accumulate
+from app.cache import BackendLRU
+
+
+# Gera a sequência de chaves acessadas, com probabilidade proporcional a 1/rank^s
+def gerar_acessos(chaves: int, requisicoes: int, s: float, semente: int = 42) -> list:
+    aleatorio = random.Random(semente)
+    pesos = list(accumulate(1 / (rank ** s) for rank in range(1, chaves + 1)))
+    return aleatorio.choices(range(chaves), cum_weights=pesos, k=requisicoes)
+
+
+# Executa os acessos distribuindo as requisições entre os workers; cada falha grava a resposta
+async def simular(backends: list, acessos: list, tamanho_valor: int) -> float:
+    valor = "x" * tamanho_valor
+    acertos = 0
+    for indice, chave in enumerate(acessos):
+        backend = backends[indice % len(backends)]
+        _, cache = await backend.get_with_ttl(f"lista:{chave}")
+        if cache is None:
+            await backend.set(f"lista:{chave}", valor, 3600)
+        else:
+            acertos += 1
+    return acertos / len(acessos)
+
+
+async def main_async(args):
+    acessos = gerar_acessos(args.chaves, args.requisicoes, args.s)
+    cenarios = {
+        "sem limite": [BackendLRU(max_entradas=10 ** 9, max_bytes=10 ** 12) for _ in range(args.workers)],
+        "LRU limitado": [BackendLRU(max_entradas=args.max_entradas, max_bytes=10 ** 12) for _ in range(args.workers)],
+    }
+    try:
+        import fakeredis
+        from fastapi_cache.backends.redis import RedisBackend
+        servidor = fakeredis.FakeServer()
+        cenarios["compartilhado"] = [
+            RedisBackend(fakeredis.FakeAsyncRedis(server=servidor)) for _ in range(args.workers)
+        ]
+    except ImportError:
+        print("fakeredis não instalado: cenário compartilhado ignorado")
+
+    print(f"{'cenário':>14} {'taxa acerto':>12} {'entradas':>10} {'MiB':>8}")
+    for nome, backends in cenarios.items():
+        taxa = await simular(backends, acessos, args.tamanho_valor)
+        if isinstance(backends[0], BackendLRU):
+            entradas = sum(b.entradas for b in backends)
+            mib = sum(b.bytes for b in backends) / 1024 / 1024
+        else:
+            entradas = await backends[0].redis.dbsize()
+            mib = entradas * args.tamanho_valor / 1024 / 1024
+        print(f"{nome:>14} {taxa:>12.1%} {entradas:>10} {mib:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chaves", type=int, default=50_000)
+    parser.add_argument("--requisicoes", type=int, default=200_000)
+    parser.add_argument("--max-entradas", type=int, default=2_000, help="Limite por worker no cenário LRU")
+    parser.add_argument("--tamanho-valor", type=int, default=2048, help="Bytes por resposta em cache")
+    parser.add_argument("--s", type=float, default=1.1, help="Expoente da distribuição Zipf")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: thundering herd na expiração de uma listagem popular do cache.
+
+Sobe um servidor uvicorn com CACHE_TTL_LISTA curto e, a cada rodada, espera a entrada de uma
+listagem vencer e dispara N requisições simultâneas para a mesma chave. Por padrão usa a busca,
+cuja consulta (todas as tarefas casam com o termo) demora mais que o caminho da requisição. Compara:
+- sem agrupamento (CACHE_AGRUPAR=false): cada falha executa a consulta;
+- com agrupamento (single-flight): uma consulta por chave, as demais aguardam o resultado;
+- com agrupamento e CACHE_TTL_OBSOLETO: a entrada vencida é servida enquanto é renovada.
+As consultas ao banco são lidas do /metrics (db_query_duration_seconds_count).
+
+Uso:
+    python -m benchmarks.bench_coalescencia --clientes 300 --rodadas 5 --tarefas 50000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import httpx
+from sqlmodel import SQLModel, create_engine
+from benchmarks.bench_async import iniciar_servidor
+from benchmarks.bench_login import percentil
+from benchmarks.bench_paginacao import popular_banco
+
+CENARIOS = {
+    "sem agrupamento": {"CACHE_AGRUPAR": "false", "CACHE_TTL_OBSOLETO": "0"},
+    "agrupado": {"CACHE_AGRUPAR": "true", "CACHE_TTL_OBSOLETO": "0"},
+    "agrupado + obsoleto": {"CACHE_AGRUPAR": "true", "CACHE_TTL_OBSOLETO": "30"},
+}
+
+
+async def consultas_banco(client: httpx.AsyncClient) -> float:
+    for linha in (await client.get("/metrics")).text.splitlines():
+        if linha.startswith("db_query_duration_seconds_count"):
+            return float(linha.split()[-1])
+    return 0.0
+
+
+async def medir(base: str, clientes: int, rodadas: int, ttl: float, url: str) -> dict:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=base, limits=limites, timeout=60) as client:
+        login = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        # Abre as conexões antes (keep-alive): as requisições de cada rodada chegam juntas ao servidor
+        await asyncio.gather(*(client.get(url, headers=headers) for _ in range(clientes)))
+
+        async def requisicao() -> float:
+            inicio = time.perf_counter()
+            resposta = await client.get(url, headers=headers)
+            resposta.raise_for_status()
+            return time.perf_counter() - inicio
+
+        latencias, consultas = [], 0.0
+        for _ in range(rodadas):
+            await asyncio.sleep(ttl + 0.2)  # A entrada vence
+            antes = await consultas_banco(client)
+            latencias += await asyncio.gather(*(requisicao() for _ in range(clientes)))
+            await asyncio.sleep(0.2)  # Renovações em segundo plano entram na contagem da rodada
+            consultas += await consultas_banco(client) - antes
+    return {
+        "consultas": consultas / rodadas,
+        "p50": percentil(latencias, 50) * 1000,
+        "p99": percentil(latencias, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=300, help="Requisições simultâneas por rodada")
+    parser.add_argument("--rodadas", type=int, default=5)
+    parser.add_argument("--tarefas", type=int, default=50_000)
+    parser.add_argument("--ttl", type=int, default=1, help="CACHE_TTL_LISTA do servidor, em segundos")
+    parser.add_argument("--url", default="/tarefas/search?q=benchmark&limit=100")
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_coalescencia.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    popular_banco(engine, args.tarefas)
+
+    print(f"{'cenário':>20} {'consultas/rodada':>17} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    # Cada cenário usa uma porta própria para não depender da liberação da porta anterior
+    for deslocamento, (nome, variaveis) in enumerate(CENARIOS.items()):
+        porta = args.porta + deslocamento
+        servidor = iniciar_servidor(f"sqlite:///{caminho}", porta, CACHE_TTL_LISTA=str(args.ttl), **variaveis)
+        try:
+            r = asyncio.run(medir(f"http://127.0.0.1:{porta}", args.clientes, args.rodadas, args.ttl, args.url))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        print(f"{nome:>20} {r['consultas']:>17.1f} {r['p50']:>9.1f} {r['p99']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: bytes enviados e CPU do servidor por resposta com compressão e MessagePack.
+
+Gera listagens de tarefas com N itens (o JSON que o endpoint produz) e mede, para cada
+tamanho, os bytes da resposta e o tempo de CPU para produzi-la em cada formato: JSON sem
+compressão, gzip e brotli em alguns níveis (o mesmo Compressor do MiddlewareCompressao),
+MessagePack (conversão do MiddlewareMsgpack) e MessagePack com gzip.
+
+Uso:
+    python -m benchmarks.bench_compressao --itens 10,100,1000 --repeticoes 50
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+import orjson
+from app.codificacao import Compressor, brotli, msgpack
+
+PALAVRAS = "revisar enviar relatório cliente reunião ajustar código testes deploy banco planilha".split()
+
+
+def gerar_listagem(itens: int, semente: int = 42) -> bytes:
+    aleatorio = random.Random(semente)
+    agora = datetime(2024, 1, 1)
+    return orjson.dumps([
+        {
+            "id": i + 1,
+            "titulo": " ".join(aleatorio.choices(PALAVRAS, k=4)).capitalize(),
+            "descricao": " ".join(aleatorio.choices(PALAVRAS, k=aleatorio.randint(10, 40))),
+            "estado": aleatorio.choice(["pendente", "em andamento", "concluída"]),
+            "data_criacao": agora - timedelta(minutes=i),
+            "data_atualizacao": agora,
+        }
+        for i in range(itens)
+    ])
+
+
+def comprimir(corpo: bytes, codificacao: str, nivel: int) -> bytes:
+    compressor = Compressor(codificacao, nivel_gzip=nivel, nivel_brotli=nivel)
+    return compressor.comprimir(corpo) + compressor.finalizar()
+
+
+def formatos() -> dict:
+    resultado = {"json": lambda corpo: corpo}
+    for nivel in (1, 6, 9):
+        resultado[f"gzip {nivel}"] = lambda corpo, nivel=nivel: comprimir(corpo, "gzip", nivel)
+    if brotli is not None:
+        for nivel in (1, 4, 11):
+            resultado[f"brotli {nivel}"] = lambda corpo, nivel=nivel: comprimir(corpo, "br", nivel)
+    else:
+        print("brotli não instalado: formatos brotli ignorados")
+    if msgpack is not None:
+        resultado["msgpack"] = lambda corpo: msgpack.packb(orjson.loads(corpo))
+        resultado["msgpack + gzip 6"] = lambda corpo: comprimir(msgpack.packb(orjson.loads(corpo)), "gzip", 6)
+    else:
+        print("msgpack não instalado: formatos msgpack ignorados")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--itens", default="10,100,1000", help="Itens por resposta, separados por vírgula")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'itens':>6} {'formato':>17} {'bytes':>9} {'% do json':>10} {'CPU (µs)':>10} {'MB/s':>8}")
+    for itens in map(int, args.itens.split(",")):
+        corpo = gerar_listagem(itens)
+        for nome, codificar in formatos().items():
+            saida = codificar(corpo)
+            inicio = time.process_time()
+            for _ in range(args.repeticoes):
+                codificar(corpo)
+            cpu = (time.process_time() - inicio) / args.repeticoes
+            vazao = len(corpo) / cpu / 1e6 if cpu else float("inf")
+            print(f"{itens:>6} {nome:>17} {len(saida):>9} {len(saida) / len(corpo):>10.1%} "
+                  f"{cpu * 1e6:>10.0f} {vazao:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
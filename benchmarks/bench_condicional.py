@@ -0,0 +1,50 @@
+"""Benchmark: polling de GET /tarefas e GET /tarefas/{id} com e sem If-None-Match (em processo, com TestClient).
+
+Uso:
+    python -m benchmarks.bench_condicional --requisicoes 2000 --limit 100
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# O banco temporário precisa ser definido antes de importar a aplicação
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_condicional.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.auth import criar_token_acesso  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+# Repete a mesma requisição, reenviando o ETag recebido quando condicional=True; retorna (req/s, bytes por resposta)
+def medir(client, caminho: str, headers: dict, requisicoes: int, condicional: bool) -> tuple:
+    etag = client.get(caminho, headers=headers).headers["etag"]
+    enviados = 0
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        extras = {"If-None-Match": etag} if condicional else {}
+        enviados += len(client.get(caminho, headers={**headers, **extras}).content)
+    return requisicoes / (time.perf_counter() - inicio), enviados / requisicoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    tarefa = {"titulo": "Benchmark", "descricao": "Tarefa de benchmark " * 10, "estado": "pendente"}
+
+    with TestClient(app) as client:
+        ids = [item["id"] for item in client.post("/tarefas/batch", json=[tarefa] * args.limit, headers=headers).json()]
+        print(f"{'endpoint':>17} {'modo':>13} {'req/s':>8} {'bytes/resp':>11}")
+        for nome, caminho in (("GET /tarefas", f"/tarefas?limit={args.limit}"), ("GET /tarefas/{id}", f"/tarefas/{ids[0]}")):
+            for condicional in (False, True):
+                vazao, tamanho = medir(client, caminho, headers, args.requisicoes, condicional)
+                modo = "If-None-Match" if condicional else "completo"
+                print(f"{nome:>17} {modo:>13} {vazao:>8,.0f} {tamanho:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
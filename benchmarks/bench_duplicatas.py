@@ -0,0 +1,86 @@
+"""Benchmark: remoção de duplicatas pelo ORM (um SELECT por título e um DELETE por tarefa, como o antigo
+remover_duplicatas.py) x remoção em conjunto (app.duplicatas: função de janela e DELETE em lotes).
+
+Os bancos têm os gatilhos do resumo e do índice de busca, como os criados pelo init_db.
+
+Uso:
+    python -m benchmarks.bench_duplicatas --linhas 100000 1000000 --fracao 0.1
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from sqlmodel import SQLModel, Session, create_engine, func, select
+from app.busca import instalar_busca
+from app.duplicatas import DEDUP_TAMANHO_LOTE, remover_duplicatas
+from app.estatisticas import instalar_resumo
+from app.models import Tarefa
+
+
+# Cria um banco com n tarefas, das quais a fração pedida repete o título de outra
+def criar_banco(caminho: str, n: int, fracao: float, lote: int = 50_000):
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    unicos = max(1, int(n * (1 - fracao)))
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        for inicio in range(0, n, lote):
+            conn.execute(Tarefa.__table__.insert(), [
+                {"titulo": f"Tarefa {i % unicos}", "estado": "pendente", "data_criacao": agora, "data_atualizacao": agora}
+                for i in range(inicio, min(inicio + lote, n))
+            ])
+        instalar_resumo(conn)
+        instalar_busca(conn)
+    engine.dispose()
+
+
+# Implementação anterior: um SELECT por título duplicado e session.delete de cada cópia
+def remover_pelo_orm(engine) -> int:
+    removidas = 0
+    with Session(engine) as session:
+        duplicatas = session.exec(
+            select(Tarefa.titulo, func.count(Tarefa.id)).group_by(Tarefa.titulo).having(func.count(Tarefa.id) > 1)
+        ).all()
+        for titulo, _ in duplicatas:
+            tarefas = session.exec(select(Tarefa).where(Tarefa.titulo == titulo)).all()
+            for tarefa in tarefas[1:]:
+                session.delete(tarefa)
+                removidas += 1
+        session.commit()
+    return removidas
+
+
+def remover_em_conjunto(engine, tamanho_lote: int) -> int:
+    with engine.connect() as conn:
+        return remover_duplicatas(conn, tamanho_lote=tamanho_lote)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--fracao", type=float, default=0.1, help="Fração de tarefas duplicadas")
+    parser.add_argument("--tamanho-lote", type=int, default=DEDUP_TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    print(f"{'linhas':>10} {'removidas':>10} {'ORM (s)':>9} {'conjunto (s)':>13}")
+    for n in args.linhas:
+        modelo = os.path.join(pasta, f"modelo_{n}.db")
+        criar_banco(modelo, n, args.fracao)
+        tempos, totais = [], []
+        for remover in (remover_pelo_orm, lambda engine: remover_em_conjunto(engine, args.tamanho_lote)):
+            caminho = os.path.join(pasta, f"bench_duplicatas_{n}.db")
+            shutil.copyfile(modelo, caminho)  # Cada método começa do mesmo banco
+            engine = create_engine(f"sqlite:///{caminho}")
+            inicio = time.perf_counter()
+            totais.append(remover(engine))
+            tempos.append(time.perf_counter() - inicio)
+            engine.dispose()
+        assert totais[0] == totais[1], totais
+        print(f"{n:>10,} {totais[1]:>10,} {tempos[0]:>9.2f} {tempos[1]:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
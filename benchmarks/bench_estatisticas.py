@@ -0,0 +1,52 @@
+"""Benchmark: estatísticas lidas do resumo mantido por gatilhos x agregação (GROUP BY) sobre a tabela de tarefas.
+
+Uso:
+    python -m benchmarks.bench_estatisticas --tamanhos 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import text
+from sqlmodel import SQLModel, Session, create_engine
+from app.estatisticas import calcular_estatisticas, instalar_resumo
+from benchmarks.bench_paginacao import popular_banco
+
+# Consultas equivalentes ao resumo, executadas direto na tabela de tarefas
+AGREGACOES = [
+    "SELECT estado, count(*) FROM tarefa GROUP BY estado",
+    "SELECT date(data_criacao), count(*) FROM tarefa GROUP BY 1",
+    "SELECT date(data_atualizacao), count(*) FROM tarefa GROUP BY 1",
+]
+
+
+# Tempo médio (ms) de uma função repetida algumas vezes
+def medir(funcao, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'tarefas':>10} {'resumo (ms)':>12} {'GROUP BY (ms)':>14}")
+    for tamanho in args.tamanhos:
+        engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_estatisticas.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            instalar_resumo(conn)
+        popular_banco(engine, tamanho)
+
+        with Session(engine) as session:
+            resumo = medir(lambda: calcular_estatisticas(session, dias=30), args.repeticoes)
+            agregacao = medir(lambda: [session.execute(text(sql)).all() for sql in AGREGACOES], args.repeticoes)
+        print(f"{tamanho:>10,} {resumo:>12.2f} {agregacao:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
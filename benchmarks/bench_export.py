@@ -0,0 +1,79 @@
+"""Benchmark: exportação de 1M de tarefas via GET /tarefas/export com acompanhamento do RSS do servidor.
+
+O RSS é lido de /proc/<pid>/status (Linux). O limite vale para a memória anônima (RssAnon): as páginas
+do arquivo mapeadas pelo mmap do SQLite (SQLITE_MMAP_SIZE) entram no RSS total, mas são descartáveis.
+
+Uso:
+    python -m benchmarks.bench_export --tarefas 1000000 --limite-rss-mib 100
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import httpx
+from sqlmodel import SQLModel, create_engine
+from app.auth import criar_token_acesso
+from benchmarks.bench_async import iniciar_servidor
+from benchmarks.bench_paginacao import popular_banco
+
+
+# Lê o RSS total e o anônimo do processo, em MiB
+def rss_mib(pid: int) -> tuple:
+    valores = {}
+    with open(f"/proc/{pid}/status") as arquivo:
+        for linha in arquivo:
+            campo, _, resto = linha.partition(":")
+            if campo in ("VmRSS", "RssAnon"):
+                valores[campo] = int(resto.split()[0]) / 1024
+    return valores.get("VmRSS", 0.0), valores.get("RssAnon", 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tarefas", type=int, default=1_000_000)
+    parser.add_argument("--limite-rss-mib", type=float, default=100)
+    parser.add_argument("--porta", type=int, default=8785)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_export.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    popular_banco(engine, args.tarefas)
+
+    processo = iniciar_servidor(f"sqlite:///{caminho}", args.porta)
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    try:
+        rss_inicial = rss_mib(processo.pid)
+        pico = list(rss_inicial)
+        terminou = threading.Event()
+
+        def amostrar():
+            while not terminou.is_set():
+                pico[:] = map(max, pico, rss_mib(processo.pid))
+                time.sleep(0.05)
+
+        threading.Thread(target=amostrar, daemon=True).start()
+        for formato in ("ndjson", "csv"):
+            inicio = time.perf_counter()
+            linhas = total_bytes = 0
+            with httpx.stream("GET", f"http://127.0.0.1:{args.porta}/tarefas/export?formato={formato}",
+                              headers=headers, timeout=None) as response:
+                for bloco in response.iter_bytes():
+                    total_bytes += len(bloco)
+                    linhas += bloco.count(b"\n")
+            duracao = time.perf_counter() - inicio
+            print(f"{formato:>6}: {linhas:,} linhas, {total_bytes / 1024 / 1024:.0f} MiB em {duracao:.1f}s "
+                  f"({linhas / duracao:,.0f} linhas/s)")
+        terminou.set()
+    finally:
+        processo.terminate()
+        processo.wait()
+
+    print(f"RSS total do servidor: inicial {rss_inicial[0]:.0f} MiB, pico {pico[0]:.0f} MiB")
+    print(f"RSS anônimo: inicial {rss_inicial[1]:.0f} MiB, pico {pico[1]:.0f} MiB "
+          f"(limite {args.limite_rss_mib:.0f} MiB: {'OK' if pico[1] <= args.limite_rss_mib else 'EXCEDIDO'})")
+
+
+if __name__ == "__main__":
+    main()
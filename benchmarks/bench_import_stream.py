@@ -0,0 +1,79 @@
+"""Benchmark: vazão e memória do POST /tarefas/import (importar_corpo) com corpos NDJSON e CSV.
+
+O corpo é entregue em pedaços de 64 KiB, como chegaria pelo request.stream(); o pico de memória
+é medido com tracemalloc e não deve crescer com a quantidade de linhas.
+
+Uso:
+    python -m benchmarks.bench_import_stream --linhas 200000 --tamanho-lote 5000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from sqlmodel import SQLModel, create_engine
+from app.alteracoes import instalar_alteracoes
+from app.busca import instalar_busca
+from app.estatisticas import instalar_resumo
+from app.importacao import importar_corpo
+
+TAMANHO_PEDACO = 64 * 1024
+
+
+# Gera o corpo no formato pedido, sem data (as datas usam o valor padrão do modelo)
+def gerar_corpo(formato: str, linhas: int) -> bytes:
+    if formato == "csv":
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        escritor.writerow(["titulo", "descricao", "estado"])
+        escritor.writerows([f"Tarefa {i}", "Importada em lote", "pendente"] for i in range(linhas))
+        return buffer.getvalue().encode()
+    return "".join(
+        json.dumps({"titulo": f"Tarefa {i}", "descricao": "Importada em lote", "estado": "pendente"}) + "\n"
+        for i in range(linhas)
+    ).encode()
+
+
+async def enviar_em_pedacos(corpo: bytes):
+    for inicio in range(0, len(corpo), TAMANHO_PEDACO):
+        yield corpo[inicio:inicio + TAMANHO_PEDACO]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--tamanho-lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'formato':>8} {'linhas/s':>10} {'pico (MiB)':>11}")
+    for formato in ("ndjson", "csv"):
+        corpo = gerar_corpo(formato, args.linhas)
+        medidas = []
+        # Duas execuções em bancos novos: a vazão é medida sem o tracemalloc, que deixa as alocações mais lentas
+        for rastrear_memoria in (False, True):
+            caminho = os.path.join(tempfile.mkdtemp(), f"bench_import_{formato}.db")
+            engine = create_engine(f"sqlite:///{caminho}")
+            SQLModel.metadata.create_all(engine)
+            with engine.begin() as conn:
+                # Como no init_db: os gatilhos do resumo, do índice de busca e do log de alterações fazem parte
+                # do custo de cada INSERT
+                instalar_resumo(conn)
+                instalar_busca(conn)
+                instalar_alteracoes(conn)
+            if rastrear_memoria:
+                tracemalloc.start()
+            inicio = time.perf_counter()
+            resultado = asyncio.run(importar_corpo(engine, enviar_em_pedacos(corpo), formato, args.tamanho_lote))
+            medidas.append(time.perf_counter() - inicio)
+            assert resultado["aceitas"] == args.linhas, resultado
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{formato:>8} {args.linhas / medidas[0]:>10,.0f} {pico / 1024 / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
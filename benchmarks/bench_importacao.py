@@ -0,0 +1,40 @@
+"""Benchmark: importação em lote de tarefas externas a partir de um array JSON em pedaços.
+
+Uso:
+    python -m benchmarks.bench_importacao --quantidade 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from sqlmodel import SQLModel, create_engine
+from app.importacao import converter_tarefa_externa, importar_tarefas, iterar_array_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quantidade", type=int, default=100_000)
+    parser.add_argument("--tamanho-lote", type=int, default=1000)
+    args = parser.parse_args()
+
+    todos = [{"userId": 1, "id": i, "title": f"Tarefa externa {i}", "completed": i % 2 == 0}
+             for i in range(args.quantidade)]
+    dados = json.dumps(todos).encode()
+    pedacos = [dados[i:i + 64 * 1024] for i in range(0, len(dados), 64 * 1024)]
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_importacao.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        total = importar_tarefas(
+            conn, (converter_tarefa_externa(t) for t in iterar_array_json(pedacos)), args.tamanho_lote
+        )
+    duracao = time.perf_counter() - inicio
+    print(f"{total} tarefas importadas em {duracao:.2f}s ({total / duracao:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
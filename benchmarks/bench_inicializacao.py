@@ -0,0 +1,44 @@
+"""Benchmark: tempo de importação de app.main e de inicialização (lifespan) da aplicação.
+
+Cada medição roda em um processo novo, como no boot de um worker.
+
+Uso:
+    python -m benchmarks.bench_inicializacao --repeticoes 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Código executado em cada processo: mede a importação e a subida do lifespan
+MEDICAO = """
+import json, time
+inicio = time.perf_counter()
+import app.main
+importacao = time.perf_counter() - inicio
+from fastapi.testclient import TestClient
+inicio = time.perf_counter()
+with TestClient(app.main.app):
+    inicializacao = time.perf_counter() - inicio
+print(json.dumps({"importacao": importacao, "inicializacao": inicializacao}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    medicoes = []
+    for _ in range(args.repeticoes):
+        saida = subprocess.run([sys.executable, "-c", MEDICAO], capture_output=True, text=True, check=True)
+        medicoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+
+    for etapa in ("importacao", "inicializacao"):
+        tempos = [m[etapa] * 1000 for m in medicoes]
+        print(f"{etapa:>13}: mediana {statistics.median(tempos):.1f} ms (mín {min(tempos):.1f}, máx {max(tempos):.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Teste de carga: latência de GET /tarefas/{id} durante uma tempestade de logins.
+
+Compara o bcrypt rodando no threadpool (BCRYPT_WORKERS=0) com o pool de processos dedicado.
+
+Uso:
+    python -m benchmarks.bench_login --clientes 20 --logins 50 --segundos 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+import httpx
+from sqlmodel import SQLModel, create_engine
+from benchmarks.bench_async import iniciar_servidor
+from benchmarks.bench_paginacao import popular_banco
+
+CENARIOS = {
+    "threadpool": {"BCRYPT_WORKERS": "0"},
+    "processos": {"BCRYPT_WORKERS": str(os.cpu_count() or 1)},
+}
+
+
+# Calcula o percentil p (0-100) de uma lista de latências
+def percentil(valores: list, p: float) -> float:
+    return statistics.quantiles(valores, n=100)[int(p) - 1] if len(valores) > 1 else valores[0]
+
+
+async def medir(base: str, clientes: int, logins: int, segundos: float, total_tarefas: int):
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        login = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}", "Cache-Control": "no-cache"}
+        fim = time.perf_counter() + segundos
+        latencias = []
+        status_login = Counter()
+
+        async def leitor():
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                await client.get(f"/tarefas/{random.randint(1, total_tarefas)}", headers=headers)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+
+        async def tempestade():
+            while time.perf_counter() < fim:
+                response = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+                status_login[response.status_code] += 1
+
+        await asyncio.gather(*(leitor() for _ in range(clientes)), *(tempestade() for _ in range(logins)))
+        return latencias, status_login
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=20, help="Clientes lendo tarefas")
+    parser.add_argument("--logins", type=int, default=50, help="Clientes fazendo login sem parar")
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--tarefas", type=int, default=10_000)
+    parser.add_argument("--porta", type=int, default=8775)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    popular_banco(engine, args.tarefas)
+
+    print(f"{'cenário':>12} {'tempestade':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}  status do /login")
+    for deslocamento, (nome, variaveis) in enumerate(CENARIOS.items()):
+        porta = args.porta + deslocamento
+        processo = iniciar_servidor(f"sqlite:///{caminho}", porta, **variaveis)
+        try:
+            for logins in (0, args.logins):
+                latencias, status_login = asyncio.run(medir(
+                    f"http://127.0.0.1:{porta}", args.clientes, logins, args.segundos, args.tarefas
+                ))
+                print(f"{nome:>12} {logins:>10} {percentil(latencias, 50):>9.1f} "
+                      f"{percentil(latencias, 99):>9.1f}  {dict(status_login)}")
+        finally:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == "__main__":
+    main()
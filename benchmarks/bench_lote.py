@@ -0,0 +1,78 @@
+"""Benchmark: vazão dos endpoints em lote x endpoints de item único (em processo, com TestClient).
+
+Uso:
+    python -m benchmarks.bench_lote --itens 5000 --tamanho-lote 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# O banco temporário precisa ser definido antes de importar a aplicação
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_lote.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.auth import criar_token_acesso  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+# Executa a função e retorna itens processados por segundo
+def vazao(funcao, itens: int) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return itens / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--itens", type=int, default=5000)
+    parser.add_argument("--tamanho-lote", type=int, default=500)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    tarefa = {"titulo": "Benchmark", "descricao": "Tarefa de benchmark", "estado": "pendente"}
+    lotes = range(0, args.itens, args.tamanho_lote)
+
+    with TestClient(app) as client:
+        ids_unitarios = []
+
+        def criar_unitario():
+            for _ in range(args.itens):
+                ids_unitarios.append(client.post("/tarefas", json=tarefa, headers=headers).json()["id"])
+
+        ids_lote = []
+
+        def criar_lote():
+            for _ in lotes:
+                resposta = client.post("/tarefas/batch", json=[tarefa] * args.tamanho_lote, headers=headers)
+                ids_lote.extend(item["id"] for item in resposta.json())
+
+        def atualizar_unitario():
+            for id in ids_unitarios:
+                client.put(f"/tarefas/{id}", json={**tarefa, "estado": "concluída"}, headers=headers)
+
+        def atualizar_lote():
+            for inicio in lotes:
+                itens = [{"id": id, "estado": "concluída"} for id in ids_lote[inicio:inicio + args.tamanho_lote]]
+                client.patch("/tarefas/batch", json=itens, headers=headers)
+
+        def deletar_unitario():
+            for id in ids_unitarios:
+                client.delete(f"/tarefas/{id}", headers=headers)
+
+        def deletar_lote():
+            for inicio in lotes:
+                client.request("DELETE", "/tarefas/batch", json=ids_lote[inicio:inicio + args.tamanho_lote],
+                               headers=headers)
+
+        print(f"{'operação':>10} {'unitário (itens/s)':>19} {'lote (itens/s)':>15}")
+        for nome, unitario, lote in (
+            ("criar", criar_unitario, criar_lote),
+            ("atualizar", atualizar_unitario, atualizar_lote),
+            ("deletar", deletar_unitario, deletar_lote),
+        ):
+            print(f"{nome:>10} {vazao(unitario, args.itens):>19,.0f} {vazao(lote, args.itens):>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
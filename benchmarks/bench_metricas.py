@@ -0,0 +1,76 @@
+"""Benchmark: custo das métricas (/metrics) no caminho mais usado, com METRICAS_ATIVAS ligado x desligado.
+
+Mede GET /tarefas/{id} (acerto do cache) e GET /tarefas?limit=10 (consulta ao banco, sem cache) chamando a
+aplicação ASGI diretamente (httpx.ASGITransport), sem a thread extra do TestClient, e alterna as rodadas com
+e sem métricas para que as duas sofram o mesmo ruído da máquina.
+
+Uso:
+    python -m benchmarks.bench_metricas --requisicoes 1000 --rodadas 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# O banco temporário precisa ser definido antes de importar a aplicação
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_metricas.db')}"
+
+import httpx  # noqa: E402
+from app import metricas  # noqa: E402
+from app.auth import criar_token_acesso  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+# Retorna o tempo médio por requisição (µs) de uma rodada
+async def medir(client, caminho: str, headers: dict, requisicoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await client.get(caminho, headers=headers)
+    return (time.perf_counter() - inicio) / requisicoes * 1e6
+
+
+async def executar(args):
+    autorizacao = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    tarefa = {"titulo": "Benchmark", "descricao": "Tarefa de benchmark", "estado": "pendente"}
+    transporte = httpx.ASGITransport(app=app)
+
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transporte, base_url="http://bench") as client:
+        ids = [item["id"] for item in (await client.post("/tarefas/batch", json=[tarefa] * 20, headers=autorizacao)).json()]
+        casos = (
+            ("GET /tarefas/{id} (cache)", f"/tarefas/{ids[0]}", autorizacao),
+            ("GET /tarefas?limit=10", "/tarefas?limit=10", {**autorizacao, "Cache-Control": "no-store"}),
+        )
+        print(f"{'endpoint':>26} {'sem (µs/req)':>13} {'com (µs/req)':>13} {'custo':>7}")
+        for nome, caminho, headers in casos:
+            await medir(client, caminho, headers, args.requisicoes // 5)  # Aquecimento
+            tempos = {False: [], True: []}
+            for rodada in range(args.rodadas):
+                # A ordem alterna a cada rodada para não favorecer um dos modos
+                for ativas in (False, True) if rodada % 2 else (True, False):
+                    metricas.METRICAS_ATIVAS = ativas
+                    tempos[ativas].append(await medir(client, caminho, headers, args.requisicoes))
+            sem, com = statistics.median(tempos[False]), statistics.median(tempos[True])
+            print(f"{nome:>26} {sem:>13,.0f} {com:>13,.0f} {(com - sem) / sem:>7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--rodadas", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(executar(args))
+
+    # Custo absoluto das observações feitas a cada requisição (latência, consultas e tempo no banco)
+    repeticoes = 100_000
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        metricas.LATENCIA_REQUISICAO.observar(0.001, "GET", "/tarefas", 200)
+        metricas.CONSULTAS_REQUISICAO.observar(1, "GET", "/tarefas")
+        metricas.TEMPO_BANCO_REQUISICAO.observar(0.0001, "GET", "/tarefas")
+    print(f"\nobservações por requisição: {(time.perf_counter() - inicio) / repeticoes * 1e6:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: paginação por offset (skip/limit) x paginação por cursor.
+
+Uso:
+    python -m benchmarks.bench_paginacao --profundidades 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.models import Tarefa
+from app.paginacao import codificar_cursor, paginar_por_cursor
+
+
+# Popula o banco com n tarefas usando executemany em lotes
+def popular_banco(engine, n: int, lote: int = 50_000):
+    agora = datetime.utcnow()
+    with engine.begin() as conn:
+        for inicio in range(0, n, lote):
+            linhas = [
+                {
+                    "titulo": f"Tarefa {i}",
+                    "descricao": "Tarefa gerada para benchmark",
+                    "estado": "pendente" if i % 3 else "concluida",
+                    "data_criacao": agora,
+                    "data_atualizacao": agora,
+                }
+                for i in range(inicio, min(inicio + lote, n))
+            ]
+            conn.execute(Tarefa.__table__.insert(), linhas)
+
+
+# Mede o tempo médio (ms) de uma consulta repetida algumas vezes
+def medir(session, query, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        session.exec(query).all()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_paginacao.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    SQLModel.metadata.create_all(engine)
+    popular_banco(engine, max(args.profundidades) + args.limit)
+
+    print(f"{'profundidade':>12} {'offset (ms)':>12} {'cursor (ms)':>12}")
+    with Session(engine) as session:
+        for profundidade in args.profundidades:
+            query = select(Tarefa)
+            offset = medir(session, query.offset(profundidade).limit(args.limit), args.repeticoes)
+            por_cursor = paginar_por_cursor(query, codificar_cursor(profundidade), args.limit)
+            cursor = medir(session, por_cursor, args.repeticoes)
+            print(f"{profundidade:>12} {offset:>12.2f} {cursor:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark: itens/s serializados por GET /tarefas no modo padrão (ORM + response_model) x modo rápido (colunas + orjson).
+
+As requisições usam Cache-Control: no-store para medir a consulta e a serialização a cada vez. As últimas
+linhas medem a projeção fields=titulo,estado e os acertos do cache, que devolvem os bytes guardados.
+
+Uso:
+    python -m benchmarks.bench_serializacao --requisicoes 500 --limit 100
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# O banco temporário precisa ser definido antes de importar a aplicação
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_serializacao.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app import serializacao  # noqa: E402
+from app.auth import criar_token_acesso  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.bench_paginacao import popular_banco  # noqa: E402
+
+
+# Repete a listagem e retorna itens serializados por segundo e bytes por resposta
+def medir(client, caminho: str, headers: dict, requisicoes: int, limit: int) -> tuple:
+    tamanho = len(client.get(caminho, headers=headers).content)  # Aquecimento
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        assert len(client.get(caminho, headers=headers).json()) == limit
+    return requisicoes * limit / (time.perf_counter() - inicio), tamanho
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requisicoes", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    autorizacao = {"Authorization": f"Bearer {criar_token_acesso({'sub': 'usuario1'})}"}
+    caminho = f"/tarefas?limit={args.limit}"
+
+    with TestClient(app) as client:
+        popular_banco(engine, args.limit * 10)
+        sem_cache = {**autorizacao, "Cache-Control": "no-store"}
+        print(f"{'modo':>30} {'itens/s':>10} {'bytes/resp':>11}")
+        for nome, rapida, extra, headers in (
+            ("padrão", False, "", sem_cache),
+            ("rápido", True, "", sem_cache),
+            ("rápido, fields=titulo,estado", True, "&fields=titulo,estado", sem_cache),
+            ("rápido (cache)", True, "", autorizacao),
+        ):
+            serializacao.SERIALIZACAO_RAPIDA = rapida
+            vazao, tamanho = medir(client, caminho + extra, headers, args.requisicoes, args.limit)
+            print(f"{nome:>30} {vazao:>10,.0f} {tamanho:>11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark: importação completa (buscar_tarefas_externas) x sincronização incremental da fonte externa.
+
+Sobe uma fonte local com N todos (paginação _page/_limit, ETag e uma latência fixa por requisição)
+e mede, em um banco novo, o tempo de cada execução: a primeira carga, uma nova execução sem
+mudanças na origem e uma execução com uma fração dos itens alterados. A sincronização paginada
+é medida com 1 e com --concorrencia páginas simultâneas.
+
+Uso:
+    python -m benchmarks.bench_sincronizacao --todos 20000 --tamanho-pagina 500 --latencia 0.05
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import requests
+
+# A aplicação lê o banco ao ser importada: cada execução usa um banco novo nesta pasta
+PASTA = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(PASTA, 'inicial.db')}"
+
+from sqlmodel import SQLModel  # noqa: E402
+from app.alteracoes import instalar_alteracoes  # noqa: E402
+from app.busca import instalar_busca  # noqa: E402
+from app.database import criar_engine  # noqa: E402
+from app.estatisticas import instalar_resumo  # noqa: E402
+from app.importacao import importar_tarefas, converter_tarefa_externa, iterar_array_json  # noqa: E402
+from app.sincronizacao import sincronizar_uma_vez  # noqa: E402
+
+
+def iniciar_fonte(todos: list, latencia: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latencia)  # Tempo de rede e de resposta da API
+            consulta = parse_qs(urlparse(self.path).query)
+            itens = todos
+            if "_page" in consulta:
+                pagina, limite = int(consulta["_page"][0]), int(consulta["_limit"][0])
+                itens = todos[(pagina - 1) * limite:pagina * limite]
+            corpo = json.dumps(itens).encode()
+            etag = f'"{hashlib.md5(corpo).hexdigest()}"'
+            nao_mudou = self.headers.get("If-None-Match") == etag
+            self.send_response(304 if nao_mudou else 200)
+            self.send_header("ETag", etag)
+            if not nao_mudou:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if not nao_mudou:
+                self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def novo_engine(nome: str):
+    engine = criar_engine(f"sqlite:///{os.path.join(PASTA, nome)}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Como no init_db: os gatilhos fazem parte do custo de cada escrita
+        instalar_resumo(conn)
+        instalar_busca(conn)
+        instalar_alteracoes(conn)
+    return engine
+
+
+# Implementação anterior: baixa o array inteiro e insere os títulos que ainda não existem
+def importacao_completa(engine, url: str) -> int:
+    with requests.get(url, stream=True, timeout=30) as resposta:
+        tarefas = iterar_array_json(resposta.iter_content(chunk_size=64 * 1024))
+        with engine.begin() as conn:
+            return importar_tarefas(conn, (converter_tarefa_externa(tarefa) for tarefa in tarefas))
+
+
+def medir(funcao) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=20_000)
+    parser.add_argument("--tamanho-pagina", type=int, default=500)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Segundos de espera da fonte por requisição")
+    parser.add_argument("--fracao-alterada", type=float, default=0.01)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(1)
+    todos = [
+        {"userId": i % 10, "id": i + 1, "title": f"todo {i}", "completed": aleatorio.random() < 0.5}
+        for i in range(args.todos)
+    ]
+    fonte = iniciar_fonte(todos, args.latencia)
+    url = f"http://127.0.0.1:{fonte.server_address[1]}/todos"
+    estrategias = {
+        "completa": lambda engine: importacao_completa(engine, url),
+        "incremental": lambda engine: asyncio.run(sincronizar_uma_vez(engine, url=url)),
+        "paginada (1)": lambda engine: asyncio.run(
+            sincronizar_uma_vez(engine, url=url, tamanho_pagina=args.tamanho_pagina, concorrencia=1)
+        ),
+        f"paginada ({args.concorrencia})": lambda engine: asyncio.run(
+            sincronizar_uma_vez(engine, url=url, tamanho_pagina=args.tamanho_pagina, concorrencia=args.concorrencia)
+        ),
+    }
+
+    print(f"{'estratégia':>14} {'carga (s)':>10} {'sem mudança (s)':>16} {'alterados (s)':>14}  gravadas na última")
+    for indice, (nome, executar) in enumerate(estrategias.items()):
+        for todo in todos:  # Cada estratégia começa da mesma origem
+            todo["title"] = todo["title"].split(" *")[0]
+        engine = novo_engine(f"bench_sincronizacao_{indice}.db")
+        carga, _ = medir(lambda: executar(engine))
+        sem_mudanca, _ = medir(lambda: executar(engine))
+        for todo in aleatorio.sample(todos, int(len(todos) * args.fracao_alterada)):
+            todo["title"] += " *"
+        alterados, resultado = medir(lambda: executar(engine))
+        gravadas = resultado if isinstance(resultado, int) else resultado["inseridas"] + resultado["atualizadas"]
+        print(f"{nome:>14} {carga:>10.2f} {sem_mudanca:>16.2f} {alterados:>14.2f}  {gravadas}")
+        engine.dispose()
+    fonte.shutdown()
+
+
+if __name__ == "__main__":
+    main()
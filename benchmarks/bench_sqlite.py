@@ -0,0 +1,88 @@
+"""Benchmark: leituras e escritas concorrentes no SQLite, padrão x WAL/PRAGMAs do app.database.
+
+Uso:
+    python -m benchmarks.bench_sqlite --leitores 8 --segundos 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, select, insert
+from app.database import PRAGMAS_SQLITE, criar_engine
+from app.models import Tarefa
+from benchmarks.bench_paginacao import popular_banco
+
+# Configuração padrão do SQLite (journal DELETE, synchronous FULL) x configuração do projeto
+CONFIGURACOES = {
+    "padrao": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "otimizada": PRAGMAS_SQLITE,
+}
+
+
+# Executa leitores e um escritor em paralelo durante o tempo informado
+def executar(engine, leitores: int, segundos: float, total_tarefas: int) -> dict:
+    contadores = {"leituras": 0, "escritas": 0, "erros": 0}
+    trava = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def contar(chave):
+        with trava:
+            contadores[chave] += 1
+
+    def leitor():
+        with Session(engine) as session:
+            while time.perf_counter() < fim:
+                try:
+                    session.exec(select(Tarefa).where(Tarefa.id == random.randint(1, total_tarefas))).first()
+                    session.rollback()  # Encerra a transação de leitura
+                    contar("leituras")
+                except OperationalError:
+                    session.rollback()
+                    contar("erros")
+
+    def escritor():
+        while time.perf_counter() < fim:
+            agora = datetime.utcnow()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(Tarefa), {
+                        "titulo": "Escrita concorrente", "estado": "pendente",
+                        "data_criacao": agora, "data_atualizacao": agora,
+                    })
+                contar("escritas")
+            except OperationalError:
+                contar("erros")
+
+    threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads.append(threading.Thread(target=escritor))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {chave: valor / segundos for chave, valor in contadores.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--tarefas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'configuração':>12} {'leituras/s':>12} {'escritas/s':>12} {'erros/s':>10}")
+    for nome, pragmas in CONFIGURACOES.items():
+        caminho = os.path.join(tempfile.mkdtemp(), f"bench_sqlite_{nome}.db")
+        engine = criar_engine(f"sqlite:///{caminho}", pragmas=pragmas)
+        SQLModel.metadata.create_all(engine)
+        popular_banco(engine, args.tarefas)
+        resultado = executar(engine, args.leitores, args.segundos, args.tarefas)
+        print(f"{nome:>12} {resultado['leituras']:>12,.0f} {resultado['escritas']:>12,.0f} {resultado['erros']:>10,.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Microbenchmark: validação de tokens JWT com e sem o cache de tokens validados.
+
+Uso:
+    python -m benchmarks.bench_token --tokens 2000 --validacoes 200000
+"""
+import argparse
+import random
+import time
+from app.auth import criar_token_acesso, validar_token_acesso, validar_token_acesso_cache
+
+
+# Mede o custo médio (µs) de validar os tokens sorteados
+def medir(funcao, tokens: list, validacoes: int) -> float:
+    sorteados = random.Random(42).choices(tokens, k=validacoes)
+    inicio = time.perf_counter()
+    for token in sorteados:
+        funcao(token)
+    return (time.perf_counter() - inicio) / validacoes * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000, help="Quantidade de tokens distintos em uso")
+    parser.add_argument("--validacoes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    tokens = [criar_token_acesso({"sub": f"usuario{i}"}) for i in range(args.tokens)]
+    sem_cache = medir(validar_token_acesso, tokens, args.validacoes)
+    com_cache = medir(validar_token_acesso_cache, tokens, args.validacoes)
+    print(f"sem cache: {sem_cache:.1f} µs/validação")
+    print(f"com cache: {com_cache:.1f} µs/validação ({sem_cache / com_cache:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Suíte de carga reproduzível: vazão e latências (p50/p95/p99) dos principais endpoints, com resultados em JSON.
+
+Cada tamanho de banco (--linhas) é criado uma vez pela migração do Alembic (mesmo esquema, gatilhos e usuário
+de demonstração do tarefas.db) e preenchido com dados gerados a partir de uma semente fixa. Cada modo roda em um
+processo próprio sobre uma cópia desse banco:
+    processo: a aplicação ASGI é chamada diretamente (httpx.ASGITransport), sem rede;
+    uvicorn:  um servidor uvicorn real recebe as requisições por HTTP.
+
+Uso:
+    python -m benchmarks.carga executar --linhas 10000 1000000 --modos processo uvicorn --concorrencia 1 32
+    python -m benchmarks.carga comparar benchmarks/resultados/antes.json benchmarks/resultados/depois.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# A aplicação lê o banco ao ser importada; os processos filhos recebem o banco certo pelo ambiente
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'carga.db')}")
+
+import httpx  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from app.alteracoes import GATILHOS_ALTERACOES, instalar_alteracoes  # noqa: E402
+from app.busca import GATILHOS_BUSCA, instalar_busca  # noqa: E402
+from app.estatisticas import GATILHOS_RESUMO, instalar_resumo  # noqa: E402
+from app.models import Tarefa  # noqa: E402
+from benchmarks.bench_async import iniciar_servidor  # noqa: E402
+from benchmarks.bench_login import percentil  # noqa: E402
+
+SEMENTE = 20240101
+PALAVRAS = ["revisar", "enviar", "relatório", "reunião", "cliente", "projeto", "orçamento", "contrato", "deploy", "teste"]
+ESTADOS = ["pendente", "em andamento", "concluída"]
+PASTA_DADOS = os.path.join(tempfile.gettempdir(), "bench_carga")
+PASTA_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+
+
+# Cenários: nome -> (fração de --requisicoes, função que monta (método, url, argumentos do httpx) a partir do
+# gerador aleatório e do total de tarefas). As leituras enviam Cache-Control: no-store para medir o caminho até
+# o banco; "listar_cache" mede os acertos do cache
+SEM_CACHE = {"Cache-Control": "no-store"}
+
+
+def cenario_listar(aleatorio, total):
+    return "GET", f"/tarefas?limit=20&estado={aleatorio.choice(ESTADOS)}", {"headers": SEM_CACHE}
+
+
+def cenario_listar_cache(aleatorio, total):
+    return "GET", "/tarefas?limit=20", {}
+
+
+def cenario_obter(aleatorio, total):
+    return "GET", f"/tarefas/{aleatorio.randint(1, total)}", {"headers": SEM_CACHE}
+
+
+def cenario_buscar(aleatorio, total):
+    return "GET", f"/tarefas/search?q={aleatorio.choice(PALAVRAS)}&limit=20", {"headers": SEM_CACHE}
+
+
+def cenario_criar(aleatorio, total):
+    tarefa = {"titulo": f"Carga {aleatorio.random()}", "estado": aleatorio.choice(ESTADOS)}
+    return "POST", "/tarefas", {"json": tarefa}
+
+
+def cenario_login(aleatorio, total):
+    return "POST", "/login", {"data": {"username": "usuario1", "password": "senha123"}}
+
+
+# A ordem importa: as escritas ficam por último para não alterar os dados lidos pelos outros cenários
+CENARIOS = {
+    "listar": (1.0, cenario_listar),
+    "listar_cache": (1.0, cenario_listar_cache),
+    "obter": (1.0, cenario_obter),
+    "buscar": (0.5, cenario_buscar),
+    "criar": (0.5, cenario_criar),
+    "login": (0.02, cenario_login),  # bcrypt: centenas de ms por requisição
+}
+
+
+# Cria (uma vez por tamanho) o banco migrado e preenchido; os gatilhos são recriados no final, como no init_db
+def semear_banco(linhas: int, pasta: str = PASTA_DADOS, lote: int = 50_000) -> str:
+    caminho = os.path.join(pasta, f"tarefas_{linhas}.db")
+    if os.path.exists(caminho):
+        return caminho
+    os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    engine = create_engine(f"sqlite:///{temporario}")
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini"))
+    aleatorio = random.Random(SEMENTE)
+    agora = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "head")
+        # Sem gatilhos durante a carga: resumo e índice de busca são calculados uma vez no final e o log começa vazio
+        for nome in [*GATILHOS_RESUMO, *GATILHOS_BUSCA, *GATILHOS_ALTERACOES]:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {nome}"))
+        for inicio in range(0, linhas, lote):
+            tarefas = []
+            for _ in range(inicio, min(inicio + lote, linhas)):
+                criacao = agora - timedelta(minutes=aleatorio.randint(0, 365 * 24 * 60))
+                tarefas.append({
+                    "titulo": " ".join(aleatorio.sample(PALAVRAS, 3)),
+                    "descricao": " ".join(aleatorio.choices(PALAVRAS, k=8)),
+                    "estado": aleatorio.choice(["pendente", "em_andamento", "concluida"]),
+                    "data_criacao": criacao,
+                    "data_atualizacao": criacao,
+                })
+            conn.execute(Tarefa.__table__.insert(), tarefas)
+        instalar_resumo(conn)
+        instalar_busca(conn)
+        instalar_alteracoes(conn)
+    engine.dispose()
+    os.replace(temporario, caminho)
+    return caminho
+
+
+# Executa um cenário com um número fixo de clientes concorrentes e retorna vazão, percentis e erros
+async def medir_cenario(client, nome: str, requisicoes: int, concorrencia: int, total: int, token: str) -> dict:
+    _, montar = CENARIOS[nome]
+    aleatorio = random.Random(f"{SEMENTE}:{nome}")
+    pedidos = iter([montar(aleatorio, total) for _ in range(requisicoes)])
+    latencias, erros = [], 0
+    autorizacao = {"Authorization": f"Bearer {token}"}
+
+    async def cliente():
+        nonlocal erros
+        for metodo, url, opcoes in pedidos:
+            headers = {**autorizacao, **opcoes.get("headers", {})} if url != "/login" else {}
+            inicio = time.perf_counter()
+            response = await client.request(metodo, url, **{**opcoes, "headers": headers})
+            latencias.append(time.perf_counter() - inicio)
+            erros += response.status_code >= 400
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    return {
+        "cenario": nome,
+        "concorrencia": concorrencia,
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "vazao": round(requisicoes / duracao, 1),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+    }
+
+
+async def medir_cenarios(client, args, total: int) -> list:
+    login = await client.post("/login", data={"username": "usuario1", "password": "senha123"})
+    token = login.json()["access_token"]
+    resultados = []
+    for nome in args.cenarios:
+        fracao, _ = CENARIOS[nome]
+        requisicoes = max(int(args.requisicoes * fracao), 10)
+        for concorrencia in args.concorrencia:
+            await medir_cenario(client, nome, max(requisicoes // 10, 1), concorrencia, total, token)  # Aquecimento
+            resultados.append(await medir_cenario(client, nome, requisicoes, concorrencia, total, token))
+    return resultados
+
+
+# Processo filho: mede um modo sobre um banco já copiado e escreve os resultados em JSON na saída padrão
+def executar_modo(args):
+    total = args.linhas[0]
+    limites = httpx.Limits(max_connections=max(args.concorrencia), max_keepalive_connections=max(args.concorrencia))
+    if args.modo == "processo":
+        from app.main import app  # O DATABASE_URL deste processo já aponta para a cópia do banco
+
+        async def rodar():
+            transporte = httpx.ASGITransport(app=app)
+            async with app.router.lifespan_context(app), httpx.AsyncClient(
+                transport=transporte, base_url="http://carga", limits=limites, timeout=120
+            ) as client:
+                return await medir_cenarios(client, args, total)
+
+        resultados = asyncio.run(rodar())
+    else:
+        processo = iniciar_servidor(os.environ["DATABASE_URL"], args.porta)
+        try:
+            async def rodar():
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.porta}", limits=limites, timeout=120) as client:
+                    return await medir_cenarios(client, args, total)
+
+            resultados = asyncio.run(rodar())
+        finally:
+            processo.terminate()
+            processo.wait()
+    print(json.dumps(resultados))  # Última linha da saída, lida pelo processo principal
+
+
+def versao_git() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def executar(args):
+    commit = versao_git()
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"{commit}.json")
+    relatorio = {
+        "commit": commit,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {
+            "requisicoes": args.requisicoes, "concorrencia": args.concorrencia, "cenarios": args.cenarios,
+            "semente": SEMENTE,
+        },
+        "resultados": [],
+    }
+
+    print(f"{'modo':>9} {'linhas':>9} {'cenário':>13} {'conc.':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'erros':>6}")
+    for linhas in args.linhas:
+        modelo = semear_banco(linhas, args.dados)
+        for deslocamento, modo in enumerate(args.modos):
+            # Cópia nova a cada modo: as escritas de uma execução não afetam a seguinte
+            pasta = tempfile.mkdtemp()
+            copia = os.path.join(pasta, "tarefas.db")
+            shutil.copyfile(modelo, copia)
+            comando = [
+                sys.executable, "-m", "benchmarks.carga", "_modo", "--modo", modo, "--linhas", str(linhas),
+                "--requisicoes", str(args.requisicoes), "--porta", str(args.porta + deslocamento),
+                "--concorrencia", *map(str, args.concorrencia), "--cenarios", *args.cenarios,
+            ]
+            ambiente = {**os.environ, "DATABASE_URL": f"sqlite:///{copia}"}
+            filho = subprocess.run(comando, env=ambiente, capture_output=True, text=True)
+            shutil.rmtree(pasta, ignore_errors=True)
+            if filho.returncode != 0:
+                raise RuntimeError(f"Falha no modo {modo} com {linhas} linhas:\n{filho.stderr}")
+            for resultado in json.loads(filho.stdout.strip().splitlines()[-1]):
+                resultado = {"modo": modo, "linhas": linhas, **resultado}
+                relatorio["resultados"].append(resultado)
+                print(f"{modo:>9} {linhas:>9,} {resultado['cenario']:>13} {resultado['concorrencia']:>5} "
+                      f"{resultado['vazao']:>9,.0f} {resultado['p50_ms']:>8.2f} {resultado['p95_ms']:>8.2f} "
+                      f"{resultado['p99_ms']:>8.2f} {resultado['erros']:>6}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {saida}")
+
+
+# Compara dois arquivos de resultados; termina com código 1 se alguma medida piorou além da tolerância
+def comparar(args):
+    with open(args.antes, encoding="utf-8") as arquivo:
+        antes = json.load(arquivo)
+    with open(args.depois, encoding="utf-8") as arquivo:
+        depois = json.load(arquivo)
+
+    def chave(resultado):
+        return resultado["modo"], resultado["linhas"], resultado["cenario"], resultado["concorrencia"]
+
+    anteriores = {chave(resultado): resultado for resultado in antes["resultados"]}
+    print(f"{antes['commit']} -> {depois['commit']}")
+    print(f"{'modo':>9} {'linhas':>9} {'cenário':>13} {'conc.':>5} {'req/s':>8} {'p95':>8} {'p99':>8}")
+    regressoes = 0
+    for resultado in depois["resultados"]:
+        anterior = anteriores.get(chave(resultado))
+        if anterior is None:
+            continue
+        variacoes = {
+            "vazao": resultado["vazao"] / anterior["vazao"] - 1,
+            "p95_ms": resultado["p95_ms"] / anterior["p95_ms"] - 1,
+            "p99_ms": resultado["p99_ms"] / anterior["p99_ms"] - 1,
+        }
+        # Menos vazão ou mais latência acima da tolerância conta como regressão
+        piorou = variacoes["vazao"] < -args.tolerancia or variacoes["p95_ms"] > args.tolerancia
+        regressoes += piorou
+        modo, linhas, cenario, concorrencia = chave(resultado)
+        print(f"{modo:>9} {linhas:>9,} {cenario:>13} {concorrencia:>5} {variacoes['vazao']:>+8.1%} "
+              f"{variacoes['p95_ms']:>+8.1%} {variacoes['p99_ms']:>+8.1%}{'  <- regressão' if piorou else ''}")
+    print(f"\n{regressoes} regressões acima de {args.tolerancia:.0%}")
+    sys.exit(1 if regressoes else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parametros = argparse.ArgumentParser(add_help=False)
+    parametros.add_argument("--linhas", type=int, nargs="+", default=[10_000, 1_000_000])
+    parametros.add_argument("--requisicoes", type=int, default=2000, help="Requisições por cenário (login usa 2%%)")
+    parametros.add_argument("--concorrencia", type=int, nargs="+", default=[1, 32])
+    parametros.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parametros.add_argument("--porta", type=int, default=8790)
+
+    executar_parser = comandos.add_parser("executar", parents=[parametros], help="Executa a suíte")
+    executar_parser.add_argument("--modos", nargs="+", choices=["processo", "uvicorn"], default=["processo", "uvicorn"])
+    executar_parser.add_argument("--dados", default=PASTA_DADOS, help="Pasta dos bancos semeados (reaproveitados)")
+    executar_parser.add_argument("--saida", help="Arquivo JSON (padrão: benchmarks/resultados/<commit>.json)")
+
+    modo_parser = comandos.add_parser("_modo", parents=[parametros])  # Uso interno: um modo em um processo filho
+    modo_parser.add_argument("--modo", choices=["processo", "uvicorn"], required=True)
+
+    comparar_parser = comandos.add_parser("comparar", help="Compara dois arquivos de resultados")
+    comparar_parser.add_argument("antes")
+    comparar_parser.add_argument("depois")
+    comparar_parser.add_argument("--tolerancia", type=float, default=0.1, help="Variação aceita (padrão: 10%%)")
+
+    args = parser.parse_args()
+    {"executar": executar, "_modo": executar_modo, "comparar": comparar}[args.comando](args)
+
+
+if __name__ == "__main__":
+    main()
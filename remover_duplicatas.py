@@ -1,28 +1,38 @@
-from sqlmodel import Session, select, func
+"""Encontra e remove tarefas com títulos duplicados, mantendo a de menor id de cada grupo.
+
+Uso:
+    python remover_duplicatas.py --dry-run          # Apenas lista as duplicatas
+    python remover_duplicatas.py --normalizar       # Compara em minúsculas (só ASCII) e sem espaços nas pontas
+    python remover_duplicatas.py --tamanho-lote 10000
+"""
+import argparse
 from app.database import engine
-from app.models import Tarefa
+from app.duplicatas import DEDUP_TAMANHO_LOTE, relatorio_duplicatas, remover_duplicatas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Mostra as duplicatas sem remover nada")
+    parser.add_argument("--normalizar", action="store_true", help="Compara os títulos normalizados")
+    parser.add_argument("--tamanho-lote", type=int, default=DEDUP_TAMANHO_LOTE, help="Tarefas removidas por transação")
+    parser.add_argument("--exemplos", type=int, default=20, help="Grupos listados no modo --dry-run")
+    args = parser.parse_args()
 
-with Session(engine) as session:
-    # Identificar títulos duplicados
-    duplicatas = session.exec(
-        select(Tarefa.titulo, func.count(Tarefa.id))
-        .group_by(Tarefa.titulo)
-        .having(func.count(Tarefa.id) > 1)
-    ).all()
+    with engine.connect() as conn:
+        if args.dry_run:
+            relatorio = relatorio_duplicatas(conn, args.normalizar, args.exemplos)
+            if not relatorio["grupos"]:
+                print("Nenhuma duplicata encontrada!")
+                return
+            print("Tarefas Duplicadas Encontradas:")
+            for grupo in relatorio["exemplos"]:
+                print(f"Título: {grupo['titulo']} - Quantidade: {grupo['quantidade']} - Mantida: {grupo['manter']}")
+            print(f"{relatorio['grupos']} grupos, {relatorio['removiveis']} tarefas seriam removidas.")
+            return
 
-    if duplicatas:
-        print("Removendo tarefas duplicadas...")
-        for titulo, count in duplicatas:
-            # Buscar todas as tarefas com o título duplicado
-            tarefas = session.exec(
-                select(Tarefa).where(Tarefa.titulo == titulo)
-            ).all()
+        removidas = remover_duplicatas(conn, args.normalizar, args.tamanho_lote)
+        print(f"{removidas} tarefas duplicadas removidas." if removidas else "Nenhuma duplicata encontrada!")
 
-            # Mantém a primeira ocorrência e remove as outras
-            for tarefa in tarefas[1:]:
-                session.delete(tarefa)
 
-        session.commit()
-        print("Duplicatas removidas com sucesso!")
-    else:
-        print("Nenhuma duplicata encontrada!")
+if __name__ == "__main__":
+    main()